@@ -0,0 +1,108 @@
+"""Per-turn latency of `chat.summarize_text` with a fresh vs. shared client.
+
+Starts a local stand-in for the OpenAI chat completions endpoint (plain
+HTTP/1.1 with keep-alive) and times N calls two ways:
+
+- ``fresh``: the client is reset before every call, as before pooling, so
+  each turn builds a new client and opens a new connection;
+- ``pooled``: the process-wide client from `chat.openai_client()` is reused.
+
+Every call bypasses the response cache, and the data directory points at a
+temporary one for the run, so nothing is written under ``final_project/data``.
+The stand-in has no TLS, so real-world savings are larger (no repeated
+handshake). Run from the repository root:
+
+    python final_project/benchmarks/bench_chat_client.py --turns 50
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import chat, metrics, storage  # noqa: E402
+
+_REPLY = json.dumps(
+    {
+        "id": "chatcmpl-local",
+        "object": "chat.completion",
+        "created": 0,
+        "model": chat.OPENAI_MODEL,
+        "choices": [
+            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Do the report first."}}
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+).encode("utf-8")
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        StandIn.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_REPLY)))
+        self.end_headers()
+        self.wfile.write(_REPLY)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def run(mode: str, turns: int) -> dict:
+    StandIn.connections = set()
+    chat.reset_client()
+    samples = []
+    for _ in range(turns):
+        if mode == "fresh":
+            chat.reset_client()
+        start = time.perf_counter()
+        chat.summarize_text("Plan my week", kind="chat", use_cache=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    chat.reset_client()
+    return {
+        "mode": mode,
+        "turns": turns,
+        "p50_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "first_ms": round(samples[0], 3),
+        "connections": len(StandIn.connections),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_API_KEY"] = "sk-local-benchmark"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    storage.DATA_DIR = Path(tempfile.mkdtemp(prefix="fp_bench_chat_"))
+    # Keep the metrics log's file appends out of the timings
+    metrics.METRICS_ENABLED = False
+    try:
+        for mode in ("fresh", "pooled"):
+            print(json.dumps(run(mode, args.turns)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(storage.DATA_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Benchmark suite for the task/note stores over seeded synthetic datasets.
+
+Generates the same tasks and notes for a given ``--seed`` and size, then
+times the storage and query paths of `final_project` and of `tasks5`:
+
+- ``final_project.save_json`` / ``load_json`` / ``iter_tasks``: a full
+  snapshot write, load and streamed scan of the tasks file
+- ``final_project.list_tasks.pending`` / ``.tag``: filtered listings
+- ``final_project.mark_done`` / ``_next_id``: per-call cost (``per_op_us``)
+- ``final_project.search_notes``: substring search over the notes (at most
+  ``_MAX_NOTES``; capped results record the note count in ``notes``)
+- ``tasks5.save_tasks`` / ``load_tasks`` / ``list_tasks`` / ``update_task``
+
+Each case runs once cold (``first_ms``) and then ``--repeat`` times warm
+(``median_ms``, ``min_ms``); results are written as JSON (``--output``,
+default stdout). ``--compare OLD.json`` matches cases by name and size and
+exits with status 1 if any median got slower by more than ``--threshold``
+(default 0.2, i.e. 20%) and by at least ``--min-delta-ms``, so two commits
+can be compared on one machine.
+Run from the repository root:
+
+    python final_project/benchmarks/bench_suite.py --sizes 1k,100k --output before.json
+    python final_project/benchmarks/bench_suite.py --sizes 1k,100k --compare before.json
+
+``1m`` is supported but needs several GB of memory and a few minutes.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+sys.path.insert(0, str(root / "tasks5"))
+
+from final_project import notes, storage, tasks  # noqa: E402
+from final_project.store import store_for  # noqa: E402
+from tasks5 import storage as t5_storage  # noqa: E402
+from tasks5 import tasks as t5_tasks  # noqa: E402
+
+_WORDS = (
+    "report budget review meeting draft email plan design test deploy invoice "
+    "call client update fix migrate backup release notes research write read "
+    "garden groceries dentist gym travel book tickets refactor index cache"
+).split()
+_TAGS = ["work", "home", "urgent", "later", "errand", "health", "finance", "learning"]
+_SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Notes generated per size; 1m notes would add gigabytes for one case
+_MAX_NOTES = 100_000
+# Calls timed per run for the per-call cases
+_OPS = 1_000
+# Target length of one sample of a fast case, and the loop cap to get there
+_SAMPLE_MS = 20.0
+_MAX_LOOPS = 1_000
+
+
+def _phrase(rng, lo, hi):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi)))
+
+
+def make_tasks(n, seed=0):
+    """Return ``n`` tasks in the final_project format, identical for equal seeds.
+
+    About 30% are completed and 60% have a due date; creation times span two
+    years so month-based layouts see realistic shards.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    out = []
+    for i in range(1, n + 1):
+        created = start + timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600))
+        due = None
+        if rng.random() < 0.6:
+            due = (created + timedelta(days=rng.randrange(-30, 120))).strftime("%Y-%m-%d")
+        done = rng.random() < 0.3
+        out.append({
+            "id": str(i),
+            "title": _phrase(rng, 2, 6),
+            "description": _phrase(rng, 0, 12),
+            "created_at": created.isoformat(),
+            "due": due,
+            "completed": done,
+            "completed_at": (created + timedelta(days=1)).isoformat() if done else None,
+            "tags": rng.sample(_TAGS, rng.randint(0, 3)),
+        })
+    return out
+
+
+def make_notes(n, seed=0):
+    """Return ``n`` notes in the final_project format, identical for equal seeds."""
+    rng = random.Random(seed + 1)
+    return [
+        {
+            "id": str(i),
+            "title": _phrase(rng, 2, 5),
+            "body": _phrase(rng, 20, 80),
+            "tags": rng.sample(_TAGS, rng.randint(0, 2)),
+            "created_at": "2024-01-01T00:00:00+00:00",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def _as_tasks5(items):
+    # tasks5 uses the same fields minus the final_project-only ones
+    return {"tasks": [{k: t[k] for k in ("id", "title", "description", "created_at", "due", "completed", "completed_at", "tags")} for t in items]}
+
+
+def _run(fn, loops):
+    gc.collect()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return (time.perf_counter() - t0) * 1000 / loops
+    finally:
+        gc.enable()
+
+
+def _time(fn, repeat, setup=None):
+    """Return the cold first run and `repeat` warm runs of `fn`, in ms.
+
+    The first call pays for lazily built indexes, so it is reported apart.
+    As in `timeit`, the collector is paused while timing, and calls without
+    `setup` are looped until a sample takes about ``_SAMPLE_MS``, averaging
+    out timer noise on fast cases.
+    """
+    if setup is not None:
+        setup()
+    first = _run(fn, 1)
+    loops = 1
+    if setup is None:
+        loops = max(1, min(_MAX_LOOPS, int(_SAMPLE_MS / max(_run(fn, 1), 1e-3))))
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        samples.append(_run(fn, loops))
+    return first, samples
+
+
+def run_size(n, seed, repeat, only, workdir):
+    """Yield one result dict per case for datasets of `n` records."""
+    storage.DATA_DIR = workdir
+    storage.TASKS_FILE = workdir / "tasks.json"
+    storage.NOTES_FILE = workdir / "notes.json"
+    task_list = make_tasks(n, seed)
+    rng = random.Random(seed)
+
+    data = {"tasks": [dict(t) for t in task_list], "next_id": n + 1}
+    n_notes = min(n, _MAX_NOTES)
+    note_data = {"notes": make_notes(n_notes, seed), "next_id": n_notes + 1}
+    pending = [t["id"] for t in task_list if not t["completed"]]
+    to_finish = rng.sample(pending, min(len(pending), _OPS))
+    store = store_for(data, "tasks")
+
+    def reopen():
+        # Undo the previous run so every run marks pending tasks
+        for tid in to_finish:
+            store.update(tid, {"completed": False, "completed_at": None})
+
+    t5_path = str(workdir / "tasks5.json")
+    t5_data = _as_tasks5(task_list)
+    # tasks5 looks ids up with a linear scan, so fewer calls
+    t5_sample = [rng.choice(task_list)["id"] for _ in range(min(n, 100))]
+
+    # name, timed call, calls per run, untimed setup before each run
+    cases = [
+        ("final_project.save_json", lambda: storage.save_json(storage.TASKS_FILE, {"tasks": task_list, "next_id": n + 1}), 1, None),
+        ("final_project.load_json", lambda: storage.load_json(storage.TASKS_FILE, "tasks"), 1, None),
+        ("final_project.iter_tasks", lambda: sum(1 for _ in storage.iter_tasks()), 1, None),
+        ("final_project.list_tasks.pending", lambda: tasks.list_tasks(data, status="pending"), 1, None),
+        ("final_project.list_tasks.tag", lambda: tasks.list_tasks(data, tags=["urgent"]), 1, None),
+        ("final_project.mark_done", lambda: [tasks.mark_done(data, tid) for tid in to_finish], len(to_finish), reopen),
+        ("final_project._next_id", lambda: [tasks._next_id(data) for _ in range(_OPS)], _OPS, None),
+        ("final_project.search_notes", lambda: notes.search_notes(note_data, "budget review"), 1, None),
+        ("tasks5.save_tasks", lambda: t5_storage.save_tasks(t5_path, t5_data), 1, None),
+        ("tasks5.load_tasks", lambda: t5_storage.load_tasks(t5_path), 1, None),
+        ("tasks5.list_tasks", lambda: t5_tasks.list_tasks(t5_data, completed=False, tag="urgent"), 1, None),
+        (
+            "tasks5.update_task",
+            lambda: [t5_tasks.update_task(t5_data, tid, completed=True) for tid in t5_sample],
+            len(t5_sample),
+            lambda: [t5_tasks.update_task(t5_data, tid, completed=False) for tid in t5_sample],
+        ),
+    ]
+    for name, fn, ops, setup in cases:
+        if only and not any(o in name for o in only):
+            continue
+        first, samples = _time(fn, repeat, setup)
+        result = {
+            "case": name,
+            "size": n,
+            "median_ms": round(statistics.median(samples), 3),
+            "min_ms": round(min(samples), 3),
+            "first_ms": round(first, 3),
+        }
+        if name == "final_project.search_notes" and n_notes != n:
+            result["notes"] = n_notes
+        if ops > 1:
+            result["per_op_us"] = round(statistics.median(samples) * 1000 / ops, 3)
+        yield result
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Print case-by-case ratios against `baseline`; return the regressed cases.
+
+    A case regresses when its median is more than `threshold` slower and
+    also at least `min_delta_ms` slower, so timer noise on sub-millisecond
+    cases does not fail a comparison.
+    """
+    old = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressed = []
+    for r in results:
+        before = old.get((r["case"], r["size"]))
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = r["median_ms"] / before["median_ms"]
+        flag = ""
+        if ratio > 1 + threshold and r["median_ms"] - before["median_ms"] >= min_delta_ms:
+            flag = "  REGRESSION"
+            regressed.append(r)
+        print(f"{r['case']:<36} {r['size']:>8}  {before['median_ms']:>10.3f} -> {r['median_ms']:>10.3f} ms  x{ratio:.2f}{flag}", file=sys.stderr)
+    return regressed
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1k,100k", help=f"comma-separated, from {', '.join(_SIZES)} or plain numbers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", help="run only cases whose name contains this (repeatable)")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown of the median (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    sizes = [_SIZES.get(s.strip().lower()) or int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for n in sizes:
+        workdir = Path(tempfile.mkdtemp(prefix="fp_bench_"))
+        try:
+            for result in run_size(n, args.seed, args.repeat, args.only, workdir):
+                capped = f"  ({result['notes']} notes)" if "notes" in result else ""
+                print(f"{result['case']:<36} {n:>8}  {result['median_ms']:>10.3f} ms{capped}", file=sys.stderr)
+                results.append(result)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressed = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressed:
+            print(f"{len(regressed)} case(s) slower than {args.compare} by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import cache, chat, storage
+
+
+class FakeClient:
+    """Stands in for the OpenAI client and counts completion calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f" reply {self.calls} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path(tempfile.mkdtemp(prefix="fp_cache_"))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir)
+
+    def test_memory_and_disk_tiers(self):
+        c = cache.ResponseCache(self.tmpdir, memory_entries=1)
+        c.put("a", "A")
+        c.put("b", "B")  # evicts "a" from memory, still on disk
+        self.assertEqual(c.get("a"), "A")
+        self.assertIsNone(c.get("zzz"))
+        self.assertEqual(c.stats()["hits"], 1)
+        self.assertEqual(c.stats()["misses"], 1)
+
+        # A new process only has the disk tier
+        self.assertEqual(cache.ResponseCache(self.tmpdir).get("b"), "B")
+
+    def test_ttl_and_size_eviction(self):
+        expired = cache.ResponseCache(self.tmpdir, ttl_seconds=0)
+        expired.put("k", "v")
+        self.assertIsNone(expired.get("k"))
+
+        small = cache.ResponseCache(self.tmpdir, disk_bytes=150)
+        for i in range(5):
+            small.put(f"k{i}", "x" * 40)
+        self.assertLessEqual(sum(p.stat().st_size for p in self.tmpdir.glob("*.json")), 150)
+
+    def test_disk_is_listed_once(self):
+        cache.ResponseCache(self.tmpdir).put("old", "x" * 40)
+        globs = []
+        original = Path.glob
+
+        def counting_glob(path, pattern):
+            globs.append(pattern)
+            return original(path, pattern)
+
+        Path.glob = counting_glob
+        self.addCleanup(setattr, Path, "glob", original)
+        small = cache.ResponseCache(self.tmpdir, disk_bytes=200)
+        for i in range(20):
+            small.put(f"k{i}", "x" * 40)
+        self.assertEqual(len(globs), 1)
+        names = sorted(p.stem for p in self.tmpdir.glob("*.json"))
+        self.assertEqual(names, ["k18", "k19"])
+
+    def test_key_depends_on_every_part(self):
+        self.assertEqual(cache.cache_key("m", [1, 2]), cache.cache_key("m", [1, 2]))
+        self.assertNotEqual(cache.cache_key("m", [1, 2]), cache.cache_key("m2", [1, 2]))
+
+
+class ChatCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_chat_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        chat._cache = None
+        self.client = chat._client = FakeClient()
+
+    def tearDown(self) -> None:
+        chat._client = None
+        chat._cache = None
+        shutil.rmtree(self.tmpdir)
+
+    def test_repeated_summaries_hit_cache(self):
+        self.assertEqual(chat.summarize_text("read ch. 4", kind="note"), "reply 1")
+        self.assertEqual(chat.summarize_text("read ch. 4", kind="note"), "reply 1")
+        self.assertEqual(chat.summarize_text("read ch. 4", kind="task"), "reply 2")
+        self.assertEqual(chat.summarize_text("read ch. 4", kind="note", use_cache=False), "reply 3")
+        self.assertEqual(self.client.calls, 3)
+        self.assertEqual(chat.response_cache().stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
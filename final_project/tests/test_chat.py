@@ -0,0 +1,190 @@
+import asyncio
+import builtins
+import io
+import sys
+import unittest
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import chat, storage
+
+
+class FakeStream:
+    """Iterable of streamed chunks; raises KeyboardInterrupt after `stop_after`."""
+
+    def __init__(self, tokens, stop_after=None) -> None:
+        self.tokens = tokens
+        self.stop_after = stop_after
+        self.closed = False
+
+    def __iter__(self):
+        for i, tok in enumerate(self.tokens):
+            if self.stop_after is not None and i == self.stop_after:
+                raise KeyboardInterrupt
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=tok))])
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeStreamingClient:
+    def __init__(self, streams) -> None:
+        self.streams = list(streams)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        assert kwargs.get("stream") is True
+        self.requests.append(kwargs["messages"])
+        return self.streams.pop(0)
+
+
+class FakeAsyncClient:
+    """Async stand-in that tracks how many requests are in flight."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        text = kwargs["messages"][-1]["content"]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later items finish first to prove results keep input order
+            await asyncio.sleep(0.01 / (len(text) + 1))
+            if "boom" in text:
+                raise RuntimeError("server exploded")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"sum:{text}"))])
+        finally:
+            self.in_flight -= 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class SummarizeManyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_many_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        chat._cache = None
+        self.client = FakeAsyncClient()
+        self._factory = chat._new_async_client
+        chat._new_async_client = lambda concurrency: self.client
+
+    def tearDown(self) -> None:
+        chat._new_async_client = self._factory
+        chat._cache = None
+        shutil.rmtree(self.tmpdir)
+
+    def test_bounded_concurrency_order_and_errors(self):
+        texts = ["a" * i for i in range(1, 9)] + ["boom"]
+        results = chat.summarize_many(texts, concurrency=3)
+        self.assertEqual([r.summary for r in results[:-1]], [f"sum:{t}" for t in texts[:-1]])
+        self.assertIsNone(results[-1].summary)
+        self.assertIn("server exploded", results[-1].error)
+        self.assertEqual(self.client.max_in_flight, 3)
+        self.assertTrue(self.client.closed)
+
+    def test_cached_items_skip_the_api(self):
+        chat.summarize_many(["x", "y"])
+        self.client.max_in_flight = 0
+        results = chat.summarize_many(["x", "y"])
+        self.assertEqual([r.summary for r in results], ["sum:x", "sum:y"])
+        self.assertEqual(self.client.max_in_flight, 0)
+
+
+class TaskPromptTests(unittest.TestCase):
+    def _tasks(self, n):
+        return [
+            {"id": str(i), "title": f"task {i}", "description": "", "completed": i % 2 == 0,
+             "created_at": "2025-01-01T00:00:00+00:00", "due": f"2025-02-{28 - i:02d}" if i < 20 else None,
+             "tags": ["school"] if i % 3 == 0 else []}
+            for i in range(1, 41)
+        ]
+
+    def test_drops_completed_and_ranks_by_due(self):
+        prompt = chat.build_task_prompt(self._tasks(40), token_budget=10_000)
+        lines = prompt.messages[1]["content"].splitlines()[1:]
+        self.assertEqual(prompt.pending, 20)
+        self.assertEqual(prompt.included, 20)
+        self.assertEqual(len(lines), 20)
+        # Dated tasks first, latest id has the earliest due date; undated last
+        self.assertTrue(lines[0].startswith("#19 task 19 | due 2025-02-09"))
+        self.assertEqual(lines[9], "#1 task 1 | due 2025-02-27")
+        self.assertEqual(lines[10], "#21 task 21 | tags school")
+        self.assertNotIn("created_at", prompt.messages[1]["content"])
+
+    def test_truncates_to_budget(self):
+        full = chat.build_task_prompt(self._tasks(40), token_budget=10_000)
+        prompt = chat.build_task_prompt(self._tasks(40), token_budget=full.tokens // 2)
+        self.assertLessEqual(prompt.tokens, full.tokens // 2)
+        self.assertGreater(prompt.included, 0)
+        self.assertLess(prompt.included, prompt.pending)
+        self.assertTrue(prompt.messages[1]["content"].endswith(
+            f"(+{prompt.pending - prompt.included} more pending tasks not shown)"))
+
+
+class StreamingChatTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_chat_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        chat._cache = None
+        self._input = builtins.input
+
+    def tearDown(self) -> None:
+        builtins.input = self._input
+        chat._client = None
+        chat._cache = None
+        shutil.rmtree(self.tmpdir)
+
+    def _run_loop(self, lines, **kwargs):
+        feed = iter(lines)
+        builtins.input = lambda prompt="": next(feed)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            turns = chat.chat_loop(**kwargs)
+        return turns, out.getvalue()
+
+    def test_stream_prints_tokens_and_records_timing(self):
+        chat._client = FakeStreamingClient([FakeStream(["Start ", "with ", "math."])])
+        turns, out = self._run_loop(["what first?", "exit"], show_timing=True)
+        self.assertIn("AI: Start with math.", out)
+        self.assertEqual(len(turns), 1)
+        self.assertEqual(turns[0].reply, "Start with math.")
+        self.assertLessEqual(turns[0].first_token_s, turns[0].total_s)
+        self.assertIn("first token", out)
+
+    def test_ctrl_c_cancels_reply_but_keeps_loop(self):
+        cancelled = FakeStream(["Long ", "answer ", "never ", "finishes"], stop_after=2)
+        chat._client = FakeStreamingClient([cancelled, FakeStream(["ok"])])
+        turns, out = self._run_loop(["first", "second", "exit"])
+        self.assertTrue(cancelled.closed)
+        self.assertIn("(cancelled)", out)
+        self.assertEqual([t.reply for t in turns], ["ok"])
+        # The cancelled partial reply must not be cached
+        self.assertEqual(chat.response_cache().stats()["memory_entries"], 1)
+
+    def test_later_turns_carry_history_and_session_is_saved(self):
+        client = FakeStreamingClient([FakeStream(["Start ", "with math."]), FakeStream(["Then ", "history."])])
+        chat._client = client
+        self._run_loop(["what first?", "and then?", "exit"], session="week")
+        second = client.requests[1]
+        self.assertEqual(
+            [m["content"] for m in second[1:]], ["what first?", "Start with math.", "and then?"]
+        )
+        saved = storage.load_json(Path(self.tmpdir) / "sessions" / "week.json", "turns")
+        self.assertEqual([t["user"] for t in saved["turns"]], ["what first?", "and then?"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import io
+import os
+import signal
+import sys
+import time
+import unittest
+import tempfile
+import shutil
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import cli, storage
+from final_project.shell import run_shell
+from final_project.store import store_for
+from final_project.workspace import MemoryWorkspace
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Temporary data dir; records the file name of every snapshot write."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_batch_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        storage.TASKS_FILE = storage.DATA_DIR / "tasks.json"
+        storage.NOTES_FILE = storage.DATA_DIR / "notes.json"
+        storage.ensure_data_dir()
+        self.saves = []
+        self._commit_snapshot = storage._commit_snapshot
+
+        def counting_commit(path, payload):
+            self.saves.append(Path(path).name)
+            self._commit_snapshot(path, payload)
+
+        storage._commit_snapshot = counting_commit
+
+    def tearDown(self) -> None:
+        storage._commit_snapshot = self._commit_snapshot
+        shutil.rmtree(self.tmpdir)
+
+
+class BatchTests(DataDirTestCase):
+    def _batch(self, lines, **kwargs):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            code = cli.run_batch(cli.build_parser(), lines, **kwargs)
+        return code, out.getvalue(), err.getvalue()
+
+    def test_many_commands_one_save(self):
+        lines = [f'task add "Task {i}" --tag import' for i in range(200)]
+        lines += ["# comment", "", "task done 7", "task remove 8", "note add idea --body 'quoted body'", "task list --tag import --limit 2"]
+        code, out, err = self._batch(lines)
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(sorted(self.saves), ["notes.json", "tasks.json"])
+        self.assertIn("Created task 200: Task 199", out)
+        # Reads inside the batch see the unsaved changes
+        self.assertTrue(out.rstrip().endswith("1: Task 0 [PENDING] due=\n2: Task 1 [PENDING] due="))
+        self.assertIn("batch: 204 ok, 0 failed", err)
+
+        data = storage.load_tasks()
+        self.assertEqual(len(data["tasks"]), 199)
+        self.assertTrue(next(t for t in data["tasks"] if t["id"] == "7")["completed"])
+        self.assertEqual(storage.load_notes()["notes"][0]["body"], "quoted body")
+
+    def test_errors_are_reported_per_line(self):
+        lines = ["task add ok", "task done 42", "chat loop", 'task add "open', "task add fine"]
+        code, out, err = self._batch(lines)
+        self.assertEqual(code, cli.EXIT_USER_ERROR)
+        for n in (2, 3, 4):
+            self.assertIn(f"line {n}: exit 2:", err)
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["ok", "fine"])
+
+        self.saves.clear()
+        code, _out, err = self._batch(["task add a", "task done 999", "task add b"], stop_on_error=True)
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]][-1], "a")
+        self.assertEqual(self.saves, ["tasks.json"])
+
+    def test_interrupt_propagates_after_saving_finished_lines(self):
+        def lines():
+            yield "task add a"
+            yield "task add b"
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            self._batch(lines())
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["a", "b"])
+
+    def test_tag_listing_uses_the_tag_index(self):
+        ws = MemoryWorkspace()
+        lines = [f"task add t{i}" + (" --tag rare" if i % 50 == 0 else "") for i in range(200)]
+        code, out, _err = self._batch(lines + ["task list --tag RARE"], workspace=ws)
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(out.splitlines()[-4:], [f"{i + 1}: t{i} [PENDING] due=" for i in (0, 50, 100, 150)])
+        index = store_for(ws.load("tasks"), "tasks").index("tags")
+        self.assertEqual(index.lookup(["rare"]), {"1", "51", "101", "151"})
+
+    def test_every_n_flushes_periodically(self):
+        self._batch([f"task add t{i}" for i in range(10)], every=4)
+        self.assertEqual(self.saves, ["tasks.json"] * 3)
+        self.assertEqual(len(storage.load_tasks()["tasks"]), 10)
+
+
+class ProfileTests(DataDirTestCase):
+    def _main(self, argv):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            code = cli.main(argv)
+        return code, out.getvalue(), err.getvalue()
+
+    def test_phases_are_reported_on_stderr(self):
+        code, out, err = self._main(["--profile", "task", "add", "x"])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(out, "Created task 1: x\n")
+        phases = [line.split()[0] for line in err.splitlines()[1:]]
+        self.assertEqual(phases, ["import", "argparse", "load", "operation", "save", "total"])
+
+    def test_batch_counts_every_save(self):
+        batch = Path(self.tmpdir) / "cmds.txt"
+        batch.write_text("task add a\ntask add b\ntask add c\n", encoding="utf-8")
+        code, _out, err = self._main(["--profile", "batch", str(batch), "--every", "1"])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertRegex(err, r"save +[\d.]+ ms  \(4 calls\)")
+
+    def test_cprofile_dump_and_memory_peak(self):
+        import pstats
+
+        prof = Path(self.tmpdir) / "run.prof"
+        code, _out, err = self._main(["--profile-out", str(prof), "--profile-memory", "task", "list"])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertIn("peak memory", err)
+        self.assertIn(str(prof), err)
+        self.assertTrue(pstats.Stats(str(prof)).total_calls > 0)
+
+    def test_disabled_by_default(self):
+        code, _out, err = self._main(["task", "list"])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(err, "")
+
+
+class ShellTests(DataDirTestCase):
+    def _shell(self, lines, **kwargs):
+        feed = iter(lines)
+
+        def fake_input(prompt=""):
+            line = next(feed, None)
+            if line is None:
+                raise EOFError
+            return line() if callable(line) else line
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = run_shell(cli.build_parser(), input_fn=fake_input, **kwargs)
+        return code, out.getvalue()
+
+    def test_commands_run_in_memory_and_flush_on_exit(self):
+        code, out = self._shell(
+            ["task add one", "task add two", "task done 1", "task list --status pending", "note add n --body hello",
+             "note search hello", "shell", "exit", "task add never"],
+            flush_interval=0,
+        )
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertIn("2: two [PENDING]", out)
+        self.assertIn("1: n", out)
+        self.assertIn("cannot run here", out)
+        self.assertEqual(sorted(self.saves), ["notes.json", "tasks.json"])
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["one", "two"])
+
+    def test_background_flush(self):
+        def wait_for_save():
+            deadline = time.time() + 5
+            while not self.saves and time.time() < deadline:
+                time.sleep(0.01)
+            return "task list"
+
+        self._shell(["task add bg", wait_for_save], flush_interval=0.05)
+        self.assertEqual(self.saves[0], "tasks.json")
+
+    def test_sigterm_flushes_before_exiting(self):
+        def terminate():
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(1)  # the handler raises before this returns
+            return "exit"
+
+        before = signal.getsignal(signal.SIGTERM)
+        with self.assertRaises(SystemExit):
+            self._shell(["task add pending", terminate], flush_interval=0)
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["pending"])
+        self.assertIs(signal.getsignal(signal.SIGTERM), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
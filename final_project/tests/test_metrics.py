@@ -0,0 +1,130 @@
+import io
+import json
+import sys
+import time
+import unittest
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import chat, cli, metrics, storage
+
+
+def _usage(prompt, completion):
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion)
+
+
+class FakeClient:
+    """Non-streaming and streaming completions with usage; fails on demand."""
+
+    def __init__(self) -> None:
+        self.fail = False
+        self.kwargs = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.kwargs.append(kwargs)
+        if self.fail:
+            raise TimeoutError("request timed out")
+        if kwargs.get("stream"):
+            return FakeStream(["hi", " there"], _usage(30, 2))
+        message = SimpleNamespace(content="reply")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=_usage(12, 5))
+
+
+class FakeStream:
+    def __init__(self, tokens, usage) -> None:
+        self.tokens = tokens
+        self.usage = usage
+
+    def __iter__(self):
+        for tok in self.tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=tok))], usage=None)
+        # With include_usage the last chunk has no choices, only usage
+        yield SimpleNamespace(choices=[], usage=self.usage)
+
+    def close(self) -> None:
+        pass
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_metrics_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        chat._cache = None
+        self.client = FakeClient()
+        chat._client = self.client
+
+    def tearDown(self) -> None:
+        chat._client = None
+        chat._cache = None
+        shutil.rmtree(self.tmpdir)
+
+    def test_calls_record_usage_cache_and_errors(self):
+        self.assertEqual(chat.summarize_text("x"), "reply")
+        chat.summarize_text("x")
+        self.client.fail = True
+        with self.assertRaises(TimeoutError):
+            chat.summarize_text("y")
+
+        calls = metrics.load_calls()
+        self.assertEqual([(c["kind"], c["cached"]) for c in calls], [("summary", False), ("summary", True), ("summary", False)])
+        self.assertEqual((calls[0]["prompt_tokens"], calls[0]["completion_tokens"]), (12, 5))
+        self.assertEqual(calls[0]["model"], chat.OPENAI_MODEL)
+        self.assertIsNone(calls[0]["error"])
+        self.assertEqual(calls[2]["error"], "TimeoutError: request timed out")
+
+    def test_stream_usage_comes_from_last_chunk(self):
+        turn = chat.stream_summary("x", use_cache=False, write=lambda tok: None)
+        self.assertEqual(turn.reply, "hi there")
+        self.assertEqual(self.client.kwargs[0]["stream_options"], {"include_usage": True})
+        [call] = metrics.load_calls()
+        self.assertEqual((call["prompt_tokens"], call["completion_tokens"]), (30, 2))
+        self.assertIn("first_token_ms", call)
+
+    def test_summarize_and_window(self):
+        now = time.time()
+        path = metrics.metrics_path()
+        lines = [
+            {"ts": now - 10 * 86400, "kind": "suggest", "latency_ms": 1.0},
+            *({"ts": now, "kind": "suggest", "latency_ms": float(ms), "prompt_tokens": 10, "completion_tokens": 1} for ms in range(1, 21)),
+            {"ts": now, "kind": "suggest", "latency_ms": 0.1, "cached": True},
+            {"ts": now, "kind": "suggest", "latency_ms": 9000.0, "error": "RateLimitError"},
+        ]
+        path.write_text("".join(json.dumps(e) + "\n" for e in lines) + "not json\n", encoding="utf-8")
+
+        stats = metrics.summarize(metrics.load_calls(since=now - 86400))["suggest"]
+        self.assertEqual((stats.calls, stats.errors, stats.cached), (22, 1, 1))
+        self.assertEqual((stats.p50_ms, stats.p95_ms), (10.0, 19.0))
+        self.assertEqual((stats.prompt_tokens, stats.completion_tokens), (200, 20))
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(cli.main(["chat", "stats", "--since", "1d"]), cli.EXIT_OK)
+        row = out.getvalue().splitlines()[-1].split()
+        self.assertEqual(row, ["suggest", "22", "1", "1", "10", "19", "200", "20"])
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.main(["chat", "stats", "--since", "soon"]), cli.EXIT_USER_ERROR)
+
+    def test_log_rotates(self):
+        original = metrics.MAX_BYTES
+        metrics.MAX_BYTES = 200
+        self.addCleanup(setattr, metrics, "MAX_BYTES", original)
+        # Each line is over 100 bytes, so the third write starts a new file
+        for _ in range(3):
+            metrics.record("chat", model="m", latency_s=0.1, cached=False)
+        rotated = metrics.metrics_path().with_name(metrics.METRICS_FILE + ".1")
+        self.assertTrue(rotated.exists())
+        self.assertLessEqual(metrics.metrics_path().stat().st_size, 200)
+        self.assertEqual(len(metrics.load_calls()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,42 @@ class NotesTests(unittest.TestCase):
         data = notes.remove_note(data, n["id"])
         self.assertIsNone(notes.get_note(data, n["id"]))
 
+    def test_indexed_search_matches_full_scan(self):
+        plain = {"notes": []}
+        indexed = {"notes": []}
+        notes.enable_search_index(indexed)
+        for d in (plain, indexed):
+            notes.create_note(d, title="Grocery List", body="Milk, eggs and BREAD")
+            notes.create_note(d, title="Lecture 3", body="Trigram indexes speed up substring search")
+            notes.create_note(d, title="Misc", body="bread crumbs")
+            notes.edit_note(d, "1", body="Milk and eggs only")
+            notes.remove_note(d, "2")
+            notes.create_note(d, title="Bread recipe", body="")
+        for q in ("bread", "BREAD", "milk and", "tri", "ea", "", "nothing here"):
+            expected = [n["id"] for n in notes.search_notes(plain, q)]
+            got = [n["id"] for n in notes.search_notes(indexed, q)]
+            self.assertEqual(got, expected, q)
+
+    def test_search_index_sidecar_invalidated_by_notes_change(self):
+        data = {"notes": []}
+        notes.create_note(data, title="Alpha", body="first")
+        storage.save_notes(data)
+        storage.save_search_index(notes.enable_search_index(data))
+        loaded = storage.load_search_index()
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.candidates("alp"), {"1"})
+
+        notes.create_note(data, title="Beta", body="second")
+        storage.save_notes(data)
+        self.assertIsNone(storage.load_search_index())
+
+    def test_list_notes_multi_tag(self):
+        data = {"notes": []}
+        notes.create_note(data, title="a", body="", tags=["School", "ideas"])
+        notes.create_note(data, title="b", body="", tags=["school"])
+        self.assertEqual([n["id"] for n in notes.list_notes(data, tag="school")], ["1", "2"])
+        self.assertEqual([n["id"] for n in notes.list_notes(data, tags=["school", "IDEAS"], match_all=True)], ["1"])
+
 
 if __name__ == "__main__":
     unittest.main()
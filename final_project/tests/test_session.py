@@ -0,0 +1,72 @@
+import sys
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import storage
+from final_project.session import ChatSession, load_session, save_session, session_path
+
+
+class ChatSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_session_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        self.folds = []
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir)
+
+    def _summarize(self, previous, turns):
+        self.folds.append([t["user"] for t in turns])
+        # Like the model, keep the summary short
+        return f"{len(self.folds)} folds, last: {turns[-1]['user'][:20]}"
+
+    def test_history_stays_within_window(self):
+        convo = ChatSession("sys", window=200)
+        for i in range(50):
+            convo.record(f"question {i} " + "x" * 80, "answer " + "y" * 80, self._summarize)
+            self.assertLessEqual(convo.history_tokens(), 200)
+        self.assertTrue(self.folds[0][0].startswith("question 0"))
+        # The latest turn is always kept verbatim; older ones live in the summary
+        self.assertTrue(convo.turns[-1]["user"].startswith("question 49"))
+
+        msgs = convo.messages("next?")
+        self.assertEqual(msgs[0], {"role": "system", "content": "sys"})
+        self.assertIn(convo.summary, msgs[1]["content"])
+        self.assertEqual(msgs[-1], {"role": "user", "content": "next?"})
+
+    def test_failed_fold_keeps_turns(self):
+        convo = ChatSession("sys", window=40)
+        convo.record("a" * 100, "b" * 100, self._summarize)
+
+        def boom(previous, turns):
+            raise RuntimeError("offline")
+
+        with self.assertRaises(RuntimeError):
+            convo.record("c" * 100, "d" * 100, boom)
+        self.assertEqual(len(convo.turns), 2)
+
+    def test_named_session_round_trip(self):
+        convo = ChatSession("sys", window=500, name="study")
+        convo.record("hi", "hello", self._summarize)
+        convo.summary = "earlier stuff"
+        save_session(convo)
+        self.assertTrue(session_path("study").exists())
+
+        loaded = load_session("study", "sys", window=500)
+        self.assertEqual(loaded.summary, "earlier stuff")
+        self.assertEqual(loaded.turns, [{"user": "hi", "assistant": "hello"}])
+        self.assertEqual(load_session("other", "sys", window=500).turns, [])
+
+    def test_rejects_path_like_names(self):
+        with self.assertRaises(ValueError):
+            session_path("../escape")
+
+
+if __name__ == "__main__":
+    unittest.main()
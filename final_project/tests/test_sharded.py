@@ -0,0 +1,144 @@
+import sys
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import storage, tasks
+from final_project.sharded import ShardedBackend
+
+
+def _task(tid, month, **fields):
+    t = {"id": tid, "title": f"t{tid}", "completed": False, "created_at": f"{month}-05T10:00:00+00:00", "tags": []}
+    t.update(fields)
+    return t
+
+
+class ShardedBackendTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_sharded_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        storage.TASKS_FILE = storage.DATA_DIR / "tasks.json"
+        storage.NOTES_FILE = storage.DATA_DIR / "notes.json"
+        storage.ensure_data_dir()
+        storage.BACKEND = "sharded"
+        self.shards = storage.DATA_DIR / "tasks"
+        self.reads = []
+        original = ShardedBackend._read_shard
+
+        def counting_read(backend, name):
+            self.reads.append(name)
+            return original(backend, name)
+
+        ShardedBackend._read_shard = counting_read
+        self.addCleanup(setattr, ShardedBackend, "_read_shard", original)
+
+    def tearDown(self) -> None:
+        storage.BACKEND = "json"
+        shutil.rmtree(self.tmpdir)
+
+    def _seed(self):
+        storage.save_tasks({
+            "tasks": [
+                _task("1", "2025-01", completed=True),
+                _task("2", "2025-02", due="2025-03-01", tags=["work"]),
+                _task("3", "2025-02", due="2025-09-01"),
+                {"id": "4", "title": "legacy", "completed": False},
+            ],
+            "next_id": 5,
+        })
+        self.reads.clear()
+
+    def test_full_save_splits_by_month(self):
+        self._seed()
+        self.assertEqual(sorted(p.name for p in self.shards.glob("*.json")), ["2025-01.json", "2025-02.json", "manifest.json", "undated.json"])
+        loaded = storage.load_tasks()
+        self.assertEqual([t["id"] for t in loaded["tasks"]], ["4", "1", "2", "3"])
+        self.assertEqual(loaded["next_id"], 5)
+
+    def test_mutations_rewrite_only_their_shard(self):
+        self._seed()
+        before = (self.shards / "2025-01.json").stat().st_mtime_ns
+        one = storage.load_tasks(ids=["3"])
+        self.assertEqual([t["id"] for t in one["tasks"]], ["3"])
+        self.assertEqual(self.reads, ["2025-02"])
+        storage.save_tasks(tasks.mark_done(one, "3"), changed=[tasks.get_task(one, "3")])
+        storage.save_tasks(storage.load_tasks(ids=[]), removed=["2"])
+        self.assertEqual((self.shards / "2025-01.json").stat().st_mtime_ns, before)
+
+        new = tasks.create_task(storage.load_tasks(ids=[]), title="new")
+        storage.save_tasks(new, changed=[new["tasks"][-1]])
+        loaded = storage.load_tasks()
+        self.assertEqual([(t["id"], t["completed"]) for t in loaded["tasks"]], [("4", False), ("1", True), ("3", True), ("5", False)])
+        self.assertEqual(loaded["next_id"], 6)
+
+    def test_manifest_does_not_grow_with_tasks(self):
+        self._seed()
+        small = (self.shards / "manifest.json").stat().st_size
+        data = storage.load_tasks()
+        for i in range(500):
+            tasks.create_task(data, title=f"bulk {i}")["tasks"][-1]["created_at"] = "2025-02-06T10:00:00+00:00"
+        storage.save_tasks(data)
+        # Only counters got longer; no per-task entries
+        self.assertLess((self.shards / "manifest.json").stat().st_size, small + 32)
+
+        # Ids are found through the shards' id ranges
+        self.reads.clear()
+        self.assertEqual([t["title"] for t in storage.load_tasks(ids=["300"])["tasks"]], ["bulk 295"])
+        self.assertEqual(self.reads, ["2025-02"])
+        one = storage.load_tasks(ids=["300"])
+        storage.save_tasks(tasks.mark_done(one, "300"), changed=[tasks.get_task(one, "300")])
+        self.assertTrue(tasks.get_task(storage.load_tasks(), "300")["completed"])
+
+    def test_emptied_shard_is_removed(self):
+        self._seed()
+        storage.save_tasks(storage.load_tasks(ids=[]), removed=["1"])
+        self.assertFalse((self.shards / "2025-01.json").exists())
+
+    def test_queries_skip_shards(self):
+        self._seed()
+        pending = storage.query_tasks(status="pending")
+        self.assertEqual([t["id"] for t in pending], ["4", "2", "3"])
+        self.assertNotIn("2025-01", self.reads)
+
+        self.reads.clear()
+        self.assertEqual([t["id"] for t in storage.query_tasks(status="completed")], ["1"])
+        self.assertEqual(self.reads, ["2025-01"])
+
+        self.reads.clear()
+        start = tasks.due_key({"due": "2025-02-15"})[1]
+        due = storage.query_due_tasks(start, None)
+        self.assertEqual([t["id"] for t in due], ["2", "3"])
+        self.assertEqual(self.reads, ["2025-02"])
+
+    def test_partial_full_save_is_refused(self):
+        self._seed()
+        with self.assertRaises(storage.StorageError):
+            storage.save_tasks(storage.load_tasks(ids=["2"]))
+
+    def test_stale_writers_both_land(self):
+        self._seed()
+        a, b = storage.load_tasks(ids=[]), storage.load_tasks(ids=[])
+        ta = tasks.create_task(a, title="a")["tasks"][-1]
+        tb = tasks.create_task(b, title="b")["tasks"][-1]
+        storage.save_tasks(a, changed=[ta])
+        storage.save_tasks(b, changed=[tb])
+        self.assertEqual((ta["id"], tb["id"]), ("5", "6"))
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]][-2:], ["a", "b"])
+
+    def test_migrate_from_json(self):
+        storage.BACKEND = "json"
+        data = tasks.create_task({"tasks": []}, title="A", due="2030-01-01")
+        storage.save_tasks(data)
+        self.assertEqual(storage.migrate_to_sharded(), 1)
+        storage.BACKEND = "sharded"
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["A"])
+        self.assertEqual([t["title"] for t in storage.query_due_tasks(None, None)], ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import subprocess
+import sys
+import unittest
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import cli, storage, tasks
+
+
+class SQLiteBackendTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp(prefix="fp_sqlite_")
+        storage.DATA_DIR = Path(self.tmpdir)
+        storage.TASKS_FILE = storage.DATA_DIR / "tasks.json"
+        storage.NOTES_FILE = storage.DATA_DIR / "notes.json"
+        storage.DB_FILE = storage.DATA_DIR / "final_project.db"
+        storage.ensure_data_dir()
+
+    def tearDown(self) -> None:
+        storage.BACKEND = "json"
+        for backend in storage._SQLITE_BACKENDS.values():
+            backend.close()
+        storage._SQLITE_BACKENDS.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def test_migrate_then_single_record_operations(self):
+        data = {"tasks": []}
+        data = tasks.create_task(data, title="A", tags=["Work"])
+        data = tasks.create_task(data, title="B", due="2025-12-01")
+        storage.save_tasks(data)
+        counts = storage.migrate_to_sqlite()
+        self.assertEqual(counts, {"tasks": 2, "notes": 0})
+
+        storage.BACKEND = "sqlite"
+        # Only the requested record is fetched, plus the id counter
+        one = storage.load_tasks(ids=["2"])
+        self.assertEqual([t["title"] for t in one["tasks"]], ["B"])
+        self.assertEqual(one["next_id"], 3)
+
+        one = tasks.mark_done(one, "2")
+        storage.save_tasks(one, changed=[tasks.get_task(one, "2")])
+        new = tasks.create_task(storage.load_tasks(ids=[]), title="C", tags=["work"])
+        storage.save_tasks(new, changed=[new["tasks"][-1]])
+        storage.save_tasks({"tasks": []}, removed=["1"])
+
+        everything = storage.load_tasks()
+        self.assertEqual([(t["id"], t["completed"]) for t in everything["tasks"]], [("2", True), ("3", False)])
+        self.assertEqual(everything["next_id"], 4)
+
+    def test_filtered_queries(self):
+        storage.BACKEND = "sqlite"
+        data = {"tasks": []}
+        for title, tags in (("A", ["x", "Y"]), ("B", ["x"]), ("C", ["y"])):
+            data = tasks.create_task(data, title=title, tags=tags)
+        data = tasks.mark_done(data, "2")
+        storage.save_tasks(data)
+
+        titles = lambda items: [t["title"] for t in items]
+        self.assertEqual(titles(storage.query_tasks(status="pending")), ["A", "C"])
+        self.assertEqual(titles(storage.query_tasks(tags=["X"])), ["A", "B"])
+        self.assertEqual(titles(storage.query_tasks(tags=["x", "y"], match_all=True)), ["A"])
+        self.assertEqual(titles(storage.query_tasks(status="completed", tags=["x"])), ["B"])
+
+    def test_json_backend_does_not_filter(self):
+        self.assertIsNone(storage.query_tasks(status="pending"))
+
+    def test_search_index_sidecar_tracks_database_changes(self):
+        storage.BACKEND = "sqlite"
+        storage.SEARCH_INDEX = True
+        self.addCleanup(setattr, storage, "SEARCH_INDEX", False)
+
+        def search(query):
+            out = io.StringIO()
+            with redirect_stdout(out):
+                cli.main(["note", "search", query])
+            return out.getvalue().splitlines()
+
+        with redirect_stdout(io.StringIO()):
+            cli.main(["note", "add", "alpha", "--body", "bread"])
+        self.assertEqual(search("bread"), ["1: alpha"])
+        self.assertTrue(storage.search_index_path().exists())
+        with redirect_stdout(io.StringIO()):
+            cli.main(["note", "add", "beta", "--body", "more bread"])
+        self.assertEqual(search("bread"), ["1: alpha", "2: beta"])
+
+    def test_stale_writers_merge_like_json(self):
+        storage.BACKEND = "sqlite"
+        storage.save_tasks(tasks.create_task(storage.load_tasks(), title="base"))
+        a, b = storage.load_tasks(), storage.load_tasks()
+        storage.save_tasks(tasks.create_task(a, title="from a"), changed=[a["tasks"][-1]])
+        storage.save_tasks(tasks.remove_task(a, "1"), removed=["1"])
+        new = tasks.create_task(b, title="from b")["tasks"][-1]
+        storage.save_tasks(b, changed=[new])
+        # b's task was renumbered and its update to the deleted task dropped
+        self.assertEqual(new["id"], "3")
+        storage.save_tasks(tasks.mark_done(b, "1"), changed=[tasks.get_task(b, "1")])
+        loaded = storage.load_tasks()
+        self.assertEqual([(t["id"], t["title"]) for t in loaded["tasks"]], [("2", "from a"), ("3", "from b")])
+        # b no longer holds everything stored, so it cannot replace it
+        with self.assertRaises(storage.StorageError):
+            storage.save_tasks(b)
+
+    def test_stale_or_partial_full_save_is_refused(self):
+        storage.BACKEND = "sqlite"
+        a, b = storage.load_tasks(), storage.load_tasks()
+        storage.save_tasks(tasks.create_task(a, title="a"))
+        with self.assertRaises(storage.ConflictError):
+            storage.save_tasks(tasks.create_task(b, title="b"))
+        with self.assertRaises(storage.StorageError):
+            storage.save_tasks(tasks.create_task(storage.load_tasks(ids=[]), title="c"))
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["a"])
+
+    def test_concurrent_processes_lose_no_writes(self):
+        script = "\n".join([
+            "import sys",
+            "from pathlib import Path",
+            "sys.path.insert(0, sys.argv[1])",
+            "from final_project import storage, tasks",
+            "storage.BACKEND = 'sqlite'",
+            "storage.DB_FILE = Path(sys.argv[2])",
+            "for _ in range(50):",
+            "    data = tasks.create_task(storage.load_tasks(ids=[]), title=sys.argv[3])",
+            "    storage.save_tasks(data, changed=[data['tasks'][-1]])",
+        ])
+        storage.BACKEND = "sqlite"
+        storage.load_tasks(ids=[])
+        procs = [
+            subprocess.Popen([sys.executable, "-c", script, str(root / "src"), str(storage.DB_FILE), f"w{n}"])
+            for n in range(4)
+        ]
+        for proc in procs:
+            self.assertEqual(proc.wait(timeout=60), 0)
+        loaded = storage.load_tasks()
+        self.assertEqual(len(loaded["tasks"]), 200)
+        self.assertEqual(len({t["id"] for t in loaded["tasks"]}), 200)
+        self.assertEqual(loaded["next_id"], 201)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Cold-start budget for the CLI, measured with ``python -X importtime``."""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+
+# Generous enough for slow CI machines; importing the OpenAI SDK alone
+# blows through it. Modules a bare interpreter imports (``site`` and the
+# like) do not count against it.
+IMPORT_BUDGET_US = 100_000
+
+
+def _import_times(*args: str):
+    """Run Python with `args` under -X importtime; return the process and {module: self_us}."""
+    env = dict(os.environ, PYTHONPATH=str(root / "src"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(root),
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return proc, times
+
+
+class StartupTests(unittest.TestCase):
+    def test_task_list_skips_chat_dependencies_and_stays_in_budget(self):
+        proc, times = _import_times("-m", "final_project", "task", "list")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("final_project.cli", times)
+        for heavy in ("openai", "httpx", "pydantic", "final_project.chat", "sqlite3", "final_project.profiling", "cProfile"):
+            self.assertNotIn(heavy, times)
+        _, baseline = _import_times("-c", "pass")
+        total = sum(us for name, us in times.items() if name not in baseline)
+        self.assertLess(total, IMPORT_BUDGET_US, f"imports took {total / 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,6 @@
+import gzip
+import json
+import subprocess
 import sys
 import unittest
 import tempfile
@@ -8,7 +11,7 @@ from pathlib import Path
 root = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(root / "src"))
 
-from final_project import storage
+from final_project import codec, storage, tasks
 
 
 class StorageTests(unittest.TestCase):
@@ -20,6 +23,8 @@ class StorageTests(unittest.TestCase):
         storage.ensure_data_dir()
 
     def tearDown(self) -> None:
+        storage.JOURNAL_MODE = False
+        storage.STORAGE_FORMAT = "compact"
         shutil.rmtree(self.tmpdir)
 
     def test_load_missing_returns_empty(self):
@@ -35,6 +40,182 @@ class StorageTests(unittest.TestCase):
         self.assertIn("tasks", loaded)
         self.assertIsInstance(loaded["tasks"], list)
 
+    def test_journal_appends_and_replays(self):
+        storage.JOURNAL_MODE = True
+        storage.save_json(storage.TASKS_FILE, {"tasks": [{"id": "1", "title": "a"}, {"id": "2", "title": "b"}]})
+        snapshot = storage.TASKS_FILE.read_text(encoding="utf-8")
+
+        storage.save_tasks({}, changed=[{"id": "1", "title": "a2"}, {"id": "3", "title": "c"}])
+        storage.save_tasks({}, removed=["2"])
+
+        # Snapshot untouched, mutations live in the log
+        self.assertEqual(storage.TASKS_FILE.read_text(encoding="utf-8"), snapshot)
+        self.assertEqual(len(storage.journal_path(storage.TASKS_FILE).read_text(encoding="utf-8").splitlines()), 3)
+        loaded = storage.load_tasks()
+        self.assertEqual([(t["id"], t["title"]) for t in loaded["tasks"]], [("1", "a2"), ("3", "c")])
+
+    def test_legacy_file_gets_next_id_backfilled(self):
+        storage.save_json(storage.TASKS_FILE, {"tasks": [{"id": "4", "title": "a"}, {"id": "x", "title": "b"}]})
+        self.assertEqual(storage.load_tasks()["next_id"], 5)
+
+    def test_journal_next_id_survives_removed_highest(self):
+        storage.JOURNAL_MODE = True
+        storage.save_tasks({}, changed=[{"id": "1", "title": "a"}, {"id": "2", "title": "b"}])
+        storage.save_tasks({}, removed=["2"])
+        self.assertEqual(storage.load_tasks()["next_id"], 3)
+
+    def test_journal_compacts_past_threshold(self):
+        storage.JOURNAL_MODE = True
+        old_limit = storage.JOURNAL_COMPACT_BYTES
+        storage.JOURNAL_COMPACT_BYTES = 1
+        try:
+            storage.save_notes({}, changed=[{"id": "1", "title": "n"}])
+        finally:
+            storage.JOURNAL_COMPACT_BYTES = old_limit
+        self.assertFalse(storage.journal_path(storage.NOTES_FILE).exists())
+        loaded = storage.load_json(storage.NOTES_FILE, "notes")
+        self.assertEqual(loaded["notes"], [{"id": "1", "title": "n"}])
+
+    def test_formats_round_trip_and_autodetect(self):
+        d = {"tasks": [{"id": str(i), "title": f"tâche {i}", "tags": ["a", "b"]} for i in range(50)], "next_id": 50}
+        sizes = {}
+        for fmt in codec.FORMATS:
+            storage.STORAGE_FORMAT = fmt
+            storage.save_json(storage.TASKS_FILE, d)
+            sizes[fmt] = storage.TASKS_FILE.stat().st_size
+            # Reading never depends on the configured format
+            storage.STORAGE_FORMAT = "compact"
+            self.assertEqual(storage.load_json(storage.TASKS_FILE, "tasks"), d)
+        self.assertLess(sizes["compact"], sizes["pretty"])
+        self.assertLess(sizes["gzip"], sizes["compact"])
+        self.assertEqual(storage.TASKS_FILE.read_bytes()[:2], codec.GZIP_MAGIC)
+        self.assertEqual(json.loads(gzip.decompress(storage.TASKS_FILE.read_bytes())), d)
+
+    def test_legacy_pretty_file_loads(self):
+        d = {"notes": [{"id": "1", "title": "old"}]}
+        storage.NOTES_FILE.write_text(json.dumps(d, indent=2, ensure_ascii=False), encoding="utf-8")
+        self.assertEqual(storage.load_json(storage.NOTES_FILE, "notes")["notes"], d["notes"])
+
+    def test_stdlib_fallback_matches_orjson(self):
+        d = {"tasks": [{"id": "1", "title": "ünïcode", "due": None, "completed": False}]}
+        fast = codec.encode(d)
+        saved = codec._orjson
+        codec._orjson = None
+        try:
+            self.assertEqual(codec.encode(d), fast)
+            self.assertEqual(codec.decode(fast), d)
+        finally:
+            codec._orjson = saved
+
+    def test_unknown_format_is_a_storage_error(self):
+        storage.STORAGE_FORMAT = "yaml"
+        with self.assertRaises(storage.StorageError):
+            storage.save_json(storage.TASKS_FILE, {"tasks": []})
+
+    def test_iter_records_matches_load_json(self):
+        old_chunk = codec.READ_CHARS
+        codec.READ_CHARS = 16  # force records to span many reads
+        try:
+            d = {"tasks": [{"id": str(i), "title": "t" + str(i) + " ]},", "completed": i % 2 == 0} for i in range(1, 30)]}
+            for fmt in codec.FORMATS:
+                storage.STORAGE_FORMAT = fmt
+                storage.save_json(storage.TASKS_FILE, dict(d))
+                storage.append_journal(
+                    storage.TASKS_FILE,
+                    [
+                        {"op": "put", "record": {"id": "3", "title": "edited"}},
+                        {"op": "del", "id": "5"},
+                        {"op": "put", "record": {"id": "30", "title": "new"}},
+                        {"op": "put", "record": {"id": "5", "title": "back"}},
+                    ],
+                )
+                expected = storage.load_json(storage.TASKS_FILE, "tasks")["tasks"]
+                self.assertEqual(list(storage.iter_tasks()), expected)
+                self.assertEqual(
+                    list(storage.iter_tasks(predicate=lambda t: not t.get("completed"))),
+                    [t for t in expected if not t.get("completed")],
+                )
+        finally:
+            codec.READ_CHARS = old_chunk
+
+    def test_iter_records_falls_back_to_backup(self):
+        storage.save_json(storage.NOTES_FILE, {"notes": [{"id": "1", "title": "a"}]})
+        storage.save_json(storage.NOTES_FILE, {"notes": [{"id": "1", "title": "b"}]})
+        storage.NOTES_FILE.write_text("{not json", encoding="utf-8")
+        self.assertEqual(list(storage.iter_notes()), [{"id": "1", "title": "a"}])
+        self.assertEqual(list(storage.iter_notes(storage.DATA_DIR / "missing.json")), [])
+
+    def test_version_is_written_first_and_bumped(self):
+        data = storage.load_tasks()
+        storage.save_tasks(tasks.create_task(data, title="a"), changed=[data["tasks"][-1]])
+        storage.save_tasks(data, changed=[data["tasks"][-1]])
+        with codec.open_text(storage.TASKS_FILE) as fh:
+            self.assertEqual(codec.read_key(fh, "version"), 2)
+        self.assertEqual(storage.TASKS_FILE.read_bytes()[:12], b'{"version":2')
+        self.assertNotIn(storage.LOADED_KEY.encode(), storage.TASKS_FILE.read_bytes())
+
+    def _stale_writers(self):
+        storage.save_tasks(tasks.create_task(storage.load_tasks(), title="base"))
+        a, b = storage.load_tasks(), storage.load_tasks()
+        tasks.create_task(a, title="from a")
+        storage.save_tasks(a, changed=[a["tasks"][-1]])
+        tasks.create_task(b, title="from b")
+        tasks.mark_done(b, "1")
+        new_b = b["tasks"][-1]
+        storage.save_tasks(b, changed=[new_b, tasks.get_task(b, "1")])
+        return a, b, new_b
+
+    def test_stale_writer_merges_instead_of_overwriting(self):
+        _a, b, new_b = self._stale_writers()
+        loaded = storage.load_tasks()
+        self.assertEqual([(t["id"], t["title"]) for t in loaded["tasks"]], [("1", "base"), ("2", "from a"), ("3", "from b")])
+        self.assertTrue(tasks.get_task(loaded, "1")["completed"])
+        self.assertEqual(loaded["next_id"], 4)
+        # The caller's record and mapping reflect the merge
+        self.assertEqual(new_b["id"], "3")
+        self.assertEqual(len(b["tasks"]), 3)
+        self.assertIsNotNone(tasks.get_task(b, "2"))
+
+    def test_stale_writer_merges_in_journal_mode(self):
+        storage.JOURNAL_MODE = True
+        self._stale_writers()
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["base", "from a", "from b"])
+
+    def test_merge_drops_updates_to_deleted_records(self):
+        storage.save_tasks(tasks.create_task(storage.load_tasks(), title="base"))
+        a, b = storage.load_tasks(), storage.load_tasks()
+        storage.save_tasks(tasks.remove_task(a, "1"), removed=["1"])
+        storage.save_tasks(tasks.mark_done(b, "1"), changed=[tasks.get_task(b, "1")])
+        self.assertEqual(storage.load_tasks()["tasks"], [])
+
+    def test_stale_full_save_is_a_conflict(self):
+        a, b = storage.load_tasks(), storage.load_tasks()
+        storage.save_tasks(tasks.create_task(a, title="a"))
+        with self.assertRaises(storage.ConflictError):
+            storage.save_tasks(tasks.create_task(b, title="b"))
+        self.assertEqual([t["title"] for t in storage.load_tasks()["tasks"]], ["a"])
+
+    def test_concurrent_processes_lose_no_writes(self):
+        script = "\n".join([
+            "import sys",
+            "from pathlib import Path",
+            "sys.path.insert(0, sys.argv[1])",
+            "from final_project import storage, tasks",
+            "storage.TASKS_FILE = Path(sys.argv[2])",
+            "for _ in range(20):",
+            "    data = tasks.create_task(storage.load_tasks(), title=sys.argv[3])",
+            "    storage.save_tasks(data, changed=[data['tasks'][-1]])",
+        ])
+        procs = [
+            subprocess.Popen([sys.executable, "-c", script, str(root / "src"), str(storage.TASKS_FILE), f"w{n}"])
+            for n in range(4)
+        ]
+        for proc in procs:
+            self.assertEqual(proc.wait(timeout=60), 0)
+        loaded = storage.load_tasks()
+        self.assertEqual(len(loaded["tasks"]), 80)
+        self.assertEqual(len({t["id"] for t in loaded["tasks"]}), 80)
+
 
 if __name__ == "__main__":
     unittest.main()
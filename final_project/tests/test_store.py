@@ -0,0 +1,85 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure package import works from src
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root / "src"))
+
+from final_project import store, tasks
+
+
+class StoreTests(unittest.TestCase):
+    def _data(self, n: int) -> dict:
+        return {"tasks": [{"id": str(i), "title": f"t{i}"} for i in range(1, n + 1)]}
+
+    def test_get_update_remove(self):
+        data = self._data(5)
+        s = store.RecordStore(data, "tasks")
+        self.assertEqual(s.get("3")["title"], "t3")
+        s.update("3", {"title": "x"})
+        self.assertEqual(data["tasks"][2]["title"], "x")
+        self.assertIsNotNone(s.remove("2"))
+        self.assertIsNone(s.remove("2"))
+        self.assertEqual([t["id"] for t in data["tasks"]], ["1", "3", "4", "5"])
+        self.assertEqual(s.get("5")["title"], "t5")
+        with self.assertRaises(KeyError):
+            s.update("2", {"title": "gone"})
+
+    def test_batch_removal_defers_compaction_and_keeps_order(self):
+        data = self._data(10)
+        s = store.RecordStore(data, "tasks")
+        with s.batch():
+            for rid in ("2", "4", "6"):
+                s.remove(rid)
+            self.assertIn(None, data["tasks"])
+            self.assertEqual(s.get("7")["title"], "t7")
+            self.assertEqual(len(s.records()), 7)
+        self.assertEqual([t["id"] for t in data["tasks"]], ["1", "3", "5", "7", "8", "9", "10"])
+
+    def test_bulk_removal_does_not_rebuild_per_call(self):
+        data = self._data(20_000)
+        s = store.store_for(data, "tasks")
+        rebuilds = []
+        original = store.RecordStore._index
+
+        def counting_index(st):
+            if st._pos is None:
+                rebuilds.append(1)
+            return original(st)
+
+        store.RecordStore._index = counting_index
+        self.addCleanup(setattr, store.RecordStore, "_index", original)
+        for i in range(1, 20_001, 2):
+            tasks.remove_task(data, str(i))
+            self.assertEqual(s.get(str(i + 1))["title"], f"t{i + 1}")
+        tasks.create_task(data, title="new")
+        self.assertLess(len(rebuilds), 40)
+        self.assertEqual([t["id"] for t in data["tasks"][:3]], ["2", "4", "6"])
+        self.assertEqual(len(data["tasks"]), 10_001)
+        self.assertEqual(s.get("19998")["title"], "t19998")
+        self.assertEqual(s.get(data["tasks"][-1]["id"])["title"], "new")
+        self.assertEqual([r["id"] for r in s.ordered(["20000", "2"])], ["2", "20000"])
+
+    def test_resyncs_after_external_changes(self):
+        data = self._data(3)
+        s = store.store_for(data, "tasks")
+        data["tasks"].insert(0, {"id": "99", "title": "front"})
+        self.assertEqual(s.get("1")["title"], "t1")
+        data["tasks"] = [{"id": "7", "title": "new"}]
+        self.assertIsNone(s.get("1"))
+        self.assertEqual(s.get("7")["title"], "new")
+
+    def test_pure_functions_share_cached_store(self):
+        data = {"tasks": []}
+        for i in range(5):
+            tasks.create_task(data, title=f"T{i}")
+        self.assertIs(store.store_for(data, "tasks"), store.store_for(data, "tasks"))
+        tasks.remove_task(data, "2")
+        tasks.mark_done(data, "4")
+        self.assertTrue(tasks.get_task(data, "4")["completed"])
+        self.assertEqual([t["id"] for t in data["tasks"]], ["1", "3", "4", "5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import sys
 import unittest
 import tempfile
 import shutil
+from datetime import datetime
 from pathlib import Path
 
 # Ensure package import works from src
@@ -9,6 +10,7 @@ root = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(root / "src"))
 
 from final_project import tasks, storage
+from final_project.utils import due_epoch, parse_duration
 
 
 class TaskTests(unittest.TestCase):
@@ -50,6 +52,105 @@ class TaskTests(unittest.TestCase):
         data = tasks.remove_task(data, tid1)
         self.assertFalse(any(t["id"] == tid1 for t in data["tasks"]))
 
+    def test_ids_not_reused_after_removing_highest(self):
+        data = {"tasks": []}
+        for title in ("A", "B", "C"):
+            data = tasks.create_task(data, title=title)
+        self.assertEqual(data["next_id"], 4)
+        data = tasks.remove_task(data, "3")
+        data = tasks.create_task(data, title="D")
+        self.assertEqual(data["tasks"][-1]["id"], "4")
+
+        # legacy mappings without a counter are backfilled from existing ids
+        legacy = {"tasks": [{"id": "7", "title": "old"}]}
+        legacy = tasks.create_task(legacy, title="new")
+        self.assertEqual(legacy["tasks"][-1]["id"], "8")
+
+    def test_tag_filters_use_index_and_follow_edits(self):
+        data = {"tasks": []}
+        data = tasks.create_task(data, title="A", tags=["Work", "urgent"])  # 1
+        data = tasks.create_task(data, title="B", tags=["work"])  # 2
+        data = tasks.create_task(data, title="C", tags=["home"])  # 3
+        ids = lambda items: [t["id"] for t in items]
+
+        self.assertEqual(ids(tasks.list_tasks(data, tag="WORK")), ["1", "2"])
+        self.assertEqual(ids(tasks.list_tasks(data, tags=["urgent", "home"])), ["1", "3"])
+        self.assertEqual(ids(tasks.list_tasks(data, tags=["work", "urgent"], match_all=True)), ["1"])
+
+        data = tasks.edit_task(data, "2", tags=["home"])
+        data = tasks.remove_task(data, "1")
+        data = tasks.mark_done(data, "3")
+        self.assertEqual(ids(tasks.list_tasks(data, tag="work")), [])
+        self.assertEqual(ids(tasks.list_tasks(data, status="pending", tag="home")), ["2"])
+
+    def test_task_filter_matches_list_tasks(self):
+        data = {"tasks": []}
+        for i, tg in enumerate([["Work"], ["home"], ["work", "home"], []]):
+            data = tasks.create_task(data, title=f"t{i}", tags=tg)
+        data = tasks.mark_done(data, "3")
+        self.assertIsNone(tasks.task_filter())
+        for status in ("all", "pending", "completed"):
+            for tags, match_all in (([], False), (["work"], False), (["WORK", "home"], True), (["home", "x"], False)):
+                pred = tasks.task_filter(status=status, tags=tags, match_all=match_all) or (lambda t: True)
+                self.assertEqual(
+                    [t for t in data["tasks"] if pred(t)],
+                    tasks.list_tasks(data, status=status, tags=tags, match_all=match_all),
+                )
+
+    def test_page_tasks_top_k_matches_full_sort(self):
+        import random
+
+        rng = random.Random(7)
+        data = {"tasks": []}
+        for i in range(200):
+            due = None if i % 5 == 0 else f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            data = tasks.create_task(data, title=rng.choice(["b", "A", "c", "a"]) + str(i % 7), due=due)
+        items = data["tasks"]
+        for sort in tasks.SORT_FIELDS:
+            full = tasks.page_tasks(items, sort=sort)
+            self.assertEqual(len(full), 200)
+            self.assertEqual(tasks.page_tasks(iter(items), sort=sort, limit=10), full[:10])
+            self.assertEqual(tasks.page_tasks(iter(items), sort=sort, limit=10, offset=25), full[25:35])
+        self.assertIsNone(tasks.page_tasks(items, sort="due")[-1]["due"])
+        self.assertEqual(tasks.page_tasks(iter(items), limit=3, offset=5), items[5:8])
+        with self.assertRaises(ValueError):
+            tasks.page_tasks(items, limit=-1)
+
+    def test_due_index_tracks_create_edit_done_remove(self):
+        now = due_epoch("2025-03-10T12:00:00+00:00")
+        data = {"tasks": []}
+        for title, due in [
+            ("past", "2025-03-01T09:00:00+00:00"),
+            ("soon", "2025-03-12T09:00:00+00:00"),
+            ("later", "2025-04-20T09:00:00+00:00"),
+            ("undated", None),
+            ("bad", "next tuesday"),
+            ("sooner", "2025-03-11T09:00:00+00:00"),
+        ]:
+            data = tasks.create_task(data, title=title, due=due)
+        titles = lambda items: [t["title"] for t in items]
+        week = parse_duration("7d")
+        self.assertEqual(titles(tasks.overdue_tasks(data, now=now)), ["past"])
+        self.assertEqual(titles(tasks.upcoming_tasks(data, week, now=now)), ["sooner", "soon"])
+
+        data = tasks.edit_task(data, "3", due="2025-03-10T13:00:00+00:00")
+        data = tasks.mark_done(data, "6")
+        data = tasks.remove_task(data, "1")
+        self.assertEqual(tasks.overdue_tasks(data, now=now), [])
+        self.assertEqual(titles(tasks.upcoming_tasks(data, week, now=now)), ["later", "soon"])
+        self.assertEqual(tasks.get_task(data, "3")["due_epoch"], now + 3600)
+
+    def test_due_index_handles_records_without_epoch(self):
+        data = {"tasks": [
+            {"id": "1", "title": "old", "due": "2000-01-01", "completed": False},
+            {"id": "2", "title": "done", "due": "2000-01-01", "completed": True},
+        ]}
+        self.assertEqual([t["id"] for t in tasks.overdue_tasks(data)], ["1"])
+        # A bare date is due at the end of that day (local time)
+        noon = datetime(2000, 1, 1, 12).timestamp()
+        self.assertEqual([t["id"] for t in tasks.upcoming_tasks(data, 3600 * 24, now=noon)], ["1"])
+        self.assertEqual(tasks.overdue_tasks(data, now=noon), [])
+
 
 if __name__ == "__main__":
     unittest.main()
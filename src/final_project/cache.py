@@ -0,0 +1,165 @@
+"""Two-tier cache for AI responses in final_project.
+
+Responses are keyed by a SHA-256 hash of everything that determines the
+completion (model, messages, token limit). Lookups check a small in-memory
+LRU first and then an on-disk tier with one JSON file per entry under
+``<data dir>/cache/``. Entries expire after a TTL, and the disk tier drops its
+oldest files once it grows past a size limit. The sizes of the files on disk
+are listed once, on the first write, and tracked in memory afterwards; files
+other processes add meanwhile are only counted by the next process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = float(os.getenv("FINAL_PROJECT_AI_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_DISK_BYTES = int(os.getenv("FINAL_PROJECT_AI_CACHE_BYTES", str(10 * 1024 * 1024)))
+
+
+def cache_key(*parts: Any) -> str:
+    """Return a stable content hash for the JSON-serializable `parts`."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU in front of a directory of cached responses."""
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_bytes: int = DEFAULT_DISK_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Size of each file in the disk tier, oldest first; None until scanned
+        self._disk: "Optional[OrderedDict[str, int]]" = None
+        self._disk_total = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, created: float) -> bool:
+        return time.time() - created < self.ttl_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"  # type: ignore[operator]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._fresh(entry[0]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str) -> None:
+        """Store `value` under `key` in both tiers."""
+        entry = (time.time(), value)
+        with self._lock:
+            self._remember(key, entry)
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(key).with_suffix(".tmp")
+            raw = json.dumps({"created": entry[0], "value": value}, ensure_ascii=False).encode("utf-8")
+            tmp.write_bytes(raw)
+            os.replace(str(tmp), str(self._path(key)))
+            with self._lock:
+                self._track(key, len(raw))
+                self._evict_disk()
+        except OSError:
+            # The cache is an optimization; never fail a call because of it
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._disk = OrderedDict()
+            self._disk_total = 0
+        if self.directory is not None and self.directory.exists():
+            for p in self.directory.glob("*.json"):
+                p.unlink(missing_ok=True)
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        if self.directory is None:
+            return None
+        p = self._path(key)
+        try:
+            raw: Dict[str, Any] = json.loads(p.read_text(encoding="utf-8"))
+            entry = (float(raw["created"]), str(raw["value"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not self._fresh(entry[0]):
+            p.unlink(missing_ok=True)
+            with self._lock:
+                self._untrack(key)
+            return None
+        return entry
+
+    def _scan_disk(self) -> "OrderedDict[str, int]":
+        """List the disk tier's files once; later writes keep the index current."""
+        if self._disk is None:
+            files = []
+            for p in self.directory.glob("*.json"):  # type: ignore[union-attr]
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, p.stem, st.st_size))
+            self._disk = OrderedDict((key, size) for _mtime, key, size in sorted(files))
+            self._disk_total = sum(self._disk.values())
+        return self._disk
+
+    def _track(self, key: str, size: int) -> None:
+        disk = self._scan_disk()
+        self._disk_total += size - disk.pop(key, 0)
+        disk[key] = size
+
+    def _untrack(self, key: str) -> None:
+        if self._disk is not None:
+            self._disk_total -= self._disk.pop(key, 0)
+
+    def _evict_disk(self) -> None:
+        disk = self._scan_disk()
+        while self._disk_total > self.disk_bytes and disk:
+            key, size = disk.popitem(last=False)
+            self._path(key).unlink(missing_ok=True)
+            self._disk_total -= size
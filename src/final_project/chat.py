@@ -1,88 +1,525 @@
+"""OpenAI helpers and the interactive chat loop for final_project.
+
+The `openai` SDK (and its httpx/pydantic dependencies) is imported only when
+a client is actually created, so importing this module stays cheap. The
+client is created once per process and shared, so its HTTP connection pool
+(and TLS sessions) are reused across calls.
+
+Completions are cached (see `cache.py`) under the data directory, so asking
+the same question about unchanged data is answered locally. Pass
+``use_cache=False`` (CLI: ``--no-cache``) or set ``FINAL_PROJECT_AI_CACHE=0``
+to always call the API.
+
+`chat_loop` streams replies token by token and records time-to-first-token
+and total time for every turn; Ctrl-C cancels the reply in flight without
+leaving the loop.
+
+`summarize_many` summarizes many texts concurrently with `AsyncOpenAI`, at
+most ``concurrency`` requests in flight at a time.
+
+`chat_loop` keeps a real conversation: recent turns are resent verbatim and
+older ones are folded into a rolling summary once the history passes
+``FINAL_PROJECT_CHAT_TOKENS`` (see `session.py`). Named sessions are saved
+under the data directory and can be resumed.
+
+Every call is also recorded in the local metrics log (see `metrics.py`):
+latency, token usage, cache hit or miss and errors, per call kind.
+
+`suggest_next_tasks` sends only pending tasks, soonest due first, one compact
+line each, and stops adding lines once the prompt would exceed a token budget
+(``FINAL_PROJECT_SUGGEST_TOKENS``). `build_task_prompt` exposes that prompt
+together with how many tasks made it in.
+"""
+
+import asyncio
 import os
-from typing import List, Dict, Any
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, NamedTuple, Optional
+
+from . import metrics, storage
+from .tasks import due_key
+from .session import ChatSession, Turn, load_session, save_session
+from .utils import estimate_tokens
+from .cache import ResponseCache, cache_key
 
-from openai import OpenAI
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from openai import AsyncOpenAI, OpenAI
 
 # Model for your project
 OPENAI_MODEL = "gpt-5-mini"
 
+# Connection pool of the shared client
+POOL_SIZE = int(os.getenv("FINAL_PROJECT_OPENAI_POOL_SIZE", "10"))
+KEEPALIVE_SECONDS = float(os.getenv("FINAL_PROJECT_OPENAI_KEEPALIVE", "60"))
 
-def openai_client() -> OpenAI:
-    """
-    Create an OpenAI client using the OPENAI_API_KEY environment variable.
-    """
+# Requests in flight at once for summarize_many
+DEFAULT_CONCURRENCY = int(os.getenv("FINAL_PROJECT_AI_CONCURRENCY", "8"))
+
+# Estimated prompt tokens allowed for suggest_next_tasks (system prompt included)
+SUGGEST_TOKEN_BUDGET = int(os.getenv("FINAL_PROJECT_SUGGEST_TOKENS", "1500"))
+TITLE_CHARS = 80
+
+# Estimated history tokens chat_loop resends before folding old turns
+CHAT_WINDOW_TOKENS = int(os.getenv("FINAL_PROJECT_CHAT_TOKENS", "2000"))
+CHAT_SYSTEM_PROMPT = (
+    "You are a helpful assistant inside a task and note app for a busy college student. "
+    "Answer briefly and practically."
+)
+
+CACHE_ENABLED = os.getenv("FINAL_PROJECT_AI_CACHE", "1").lower() not in {"0", "false", "no", "off"}
+
+_client: Optional["OpenAI"] = None
+_client_lock = threading.Lock()
+_cache: Optional[ResponseCache] = None
+
+
+def _api_key() -> str:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError(
             "OPENAI_API_KEY is not set. Please set it in your environment."
         )
-    return OpenAI(api_key=api_key)
+    return api_key
+
+
+def _limits(size: int) -> Any:
+    import httpx
+
+    return httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=KEEPALIVE_SECONDS,
+    )
 
 
-def summarize_text(text: str, kind: str = "task") -> str:
+def _new_client() -> "OpenAI":
+    api_key = _api_key()
+    from openai import DefaultHttpxClient, OpenAI
+
+    return OpenAI(api_key=api_key, http_client=DefaultHttpxClient(limits=_limits(POOL_SIZE)))
+
+
+def _new_async_client(concurrency: int) -> "AsyncOpenAI":
+    """Create an async client for one event loop, pooled for `concurrency`."""
+    api_key = _api_key()
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    return AsyncOpenAI(api_key=api_key, http_client=DefaultAsyncHttpxClient(limits=_limits(concurrency)))
+
+
+def openai_client() -> "OpenAI":
     """
-    Summarize the given text into a short actionable suggestion or title.
+    Return the process-wide OpenAI client, creating it on first use.
 
-    kind is used only to tailor the system prompt (e.g., 'task', 'note', 'chat').
+    Uses the OPENAI_API_KEY environment variable (and OPENAI_BASE_URL if set).
+    Creation is guarded by a lock so concurrent callers share one client.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _new_client()
+    return _client
+
+
+def reset_client() -> None:
+    """Close and forget the shared client (e.g. after changing settings)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def response_cache() -> ResponseCache:
+    """Return the process-wide response cache stored under the data dir."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(storage.DATA_DIR / "cache")
+    return _cache
+
+
+def _complete(messages: List[Dict[str, str]], max_completion_tokens: int, use_cache: bool, kind: str) -> str:
+    """Run a chat completion, answering from the cache when possible.
+
+    `kind` labels the call in the metrics log.
+    """
+    use_cache = use_cache and CACHE_ENABLED
+    key = cache_key(OPENAI_MODEL, messages, max_completion_tokens)
+    start = time.perf_counter()
+    if use_cache:
+        cached = response_cache().get(key)
+        if cached is not None:
+            metrics.record(kind, model=OPENAI_MODEL, latency_s=time.perf_counter() - start, cached=True)
+            return cached
+
+    try:
+        response = openai_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            reasoning_effort="minimal",
+            max_completion_tokens=max_completion_tokens,
+        )
+    except Exception as exc:
+        metrics.record(
+            kind, model=OPENAI_MODEL, latency_s=time.perf_counter() - start, cached=False, error=metrics.error_text(exc)
+        )
+        raise
+    metrics.record(
+        kind,
+        model=OPENAI_MODEL,
+        latency_s=time.perf_counter() - start,
+        cached=False,
+        **metrics.usage_tokens(getattr(response, "usage", None)),
+    )
+
+    content = response.choices[0].message.content
+    if not content:
+        return "(no response)"
+    reply = content.strip()
+    if use_cache:
+        response_cache().put(key, reply)
+    return reply
+
+
+class TurnTiming(NamedTuple):
+    """Outcome of one streamed reply."""
+
+    reply: str
+    first_token_s: Optional[float]  # None if no token arrived
+    total_s: float
+    cached: bool
+
+
+def _stream_complete(
+    messages: List[Dict[str, str]],
+    max_completion_tokens: int,
+    use_cache: bool,
+    write: Callable[[str], None],
+    kind: str,
+) -> TurnTiming:
+    """Stream a chat completion through `write` as tokens arrive.
+
+    A KeyboardInterrupt closes the HTTP stream (cancelling the request) and
+    propagates; partial replies are not cached. Token usage comes from the
+    final chunk (``stream_options.include_usage``).
     """
-    client = openai_client()
+    use_cache = use_cache and CACHE_ENABLED
+    key = cache_key(OPENAI_MODEL, messages, max_completion_tokens)
+    start = time.perf_counter()
+    if use_cache:
+        cached = response_cache().get(key)
+        if cached is not None:
+            write(cached)
+            elapsed = time.perf_counter() - start
+            metrics.record(kind, model=OPENAI_MODEL, latency_s=elapsed, cached=True, first_token_s=elapsed)
+            return TurnTiming(cached, elapsed, elapsed, True)
+
+    first: Optional[float] = None
+    parts: List[str] = []
+    usage = None
+    try:
+        stream = openai_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            reasoning_effort="minimal",
+            max_completion_tokens=max_completion_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first is None:
+                    first = time.perf_counter() - start
+                parts.append(delta)
+                write(delta)
+        finally:
+            stream.close()
+    except BaseException as exc:
+        # Includes Ctrl-C, recorded as a KeyboardInterrupt error
+        metrics.record(
+            kind,
+            model=OPENAI_MODEL,
+            latency_s=time.perf_counter() - start,
+            cached=False,
+            error=metrics.error_text(exc),
+            first_token_s=first,
+        )
+        raise
+
+    total = time.perf_counter() - start
+    metrics.record(kind, model=OPENAI_MODEL, latency_s=total, cached=False, first_token_s=first, **metrics.usage_tokens(usage))
+    reply = "".join(parts).strip()
+    if reply and use_cache:
+        response_cache().put(key, reply)
+    return TurnTiming(reply or "(no response)", first, total, False)
 
+
+def _summary_messages(text: str, kind: str) -> List[Dict[str, str]]:
     system_prompt = (
         f"You help summarize a {kind}. "
         "Given the user's message, respond with a short, clear suggestion or summary "
         "in 1–2 sentences, suitable for a busy student."
     )
 
-    response = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": text},
-        ],
-        reasoning_effort="minimal",
-        max_completion_tokens=256,
-    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": text},
+    ]
 
-    content = response.choices[0].message.content
-    return content.strip() if content else "(no response)"
 
+def summarize_text(text: str, kind: str = "task", *, use_cache: bool = True) -> str:
+    """
+    Summarize the given text into a short actionable suggestion or title.
+
+    kind is used only to tailor the system prompt (e.g., 'task', 'note', 'chat').
+    Identical requests are answered from the response cache unless
+    `use_cache` is false.
+    """
+    return _complete(_summary_messages(text, kind), 256, use_cache, "summary")
+
+
+def stream_summary(
+    text: str, kind: str = "task", *, use_cache: bool = True, write: Optional[Callable[[str], None]] = None
+) -> TurnTiming:
+    """
+    Like `summarize_text`, but pass tokens to `write` (default: stdout) as
+    they arrive and return the reply with its timing.
+    """
+    return _stream_complete(_summary_messages(text, kind), 256, use_cache, write or _write_stdout, "summary")
+
+
+def _write_stdout(token: str) -> None:
+    sys.stdout.write(token)
+    sys.stdout.flush()
+
+
+class SummaryResult(NamedTuple):
+    """One entry of `summarize_many`: a summary or the error that prevented it."""
+
+    summary: Optional[str]
+    error: Optional[str]
+
+
+def summarize_many(
+    texts: List[str],
+    kind: str = "note",
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+) -> List[SummaryResult]:
+    """
+    Summarize every text in `texts` concurrently.
+
+    At most `concurrency` requests are in flight at once, so N texts take
+    about N / concurrency round trips. Results are returned in input order;
+    a failing item records its error instead of aborting the batch.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    return asyncio.run(_summarize_many(list(texts), kind, concurrency, use_cache))
+
+
+async def _summarize_many(texts: List[str], kind: str, concurrency: int, use_cache: bool) -> List[SummaryResult]:
+    use_cache = use_cache and CACHE_ENABLED
+    client = None
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text: str) -> SummaryResult:
+        nonlocal client
+        messages = _summary_messages(text, kind)
+        key = cache_key(OPENAI_MODEL, messages, 256)
+        if use_cache:
+            start = time.perf_counter()
+            cached = response_cache().get(key)
+            if cached is not None:
+                metrics.record("summary", model=OPENAI_MODEL, latency_s=time.perf_counter() - start, cached=True)
+                return SummaryResult(cached, None)
+        async with semaphore:
+            # Timed from here so waiting for a slot does not count as latency
+            start = time.perf_counter()
+            try:
+                if client is None:
+                    client = _new_async_client(concurrency)
+                response = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    reasoning_effort="minimal",
+                    max_completion_tokens=256,
+                )
+            except Exception as exc:
+                metrics.record(
+                    "summary",
+                    model=OPENAI_MODEL,
+                    latency_s=time.perf_counter() - start,
+                    cached=False,
+                    error=metrics.error_text(exc),
+                )
+                return SummaryResult(None, str(exc))
+        metrics.record(
+            "summary",
+            model=OPENAI_MODEL,
+            latency_s=time.perf_counter() - start,
+            cached=False,
+            **metrics.usage_tokens(getattr(response, "usage", None)),
+        )
+        content = response.choices[0].message.content
+        if not content:
+            return SummaryResult("(no response)", None)
+        reply = content.strip()
+        if use_cache:
+            response_cache().put(key, reply)
+        return SummaryResult(reply, None)
+
+    try:
+        return list(await asyncio.gather(*(one(t) for t in texts)))
+    finally:
+        if client is not None:
+            await client.close()
 
-def suggest_next_tasks(tasks: List[Dict[str, Any]]) -> str:
+
+SUGGEST_SYSTEM_PROMPT = (
+    "You are a task-prioritization assistant for a college student. "
+    "Given their pending tasks (one per line: id, title, due date, tags), "
+    "suggest what they should focus on next and why, in 2–4 sentences."
+)
+
+
+class TaskPrompt(NamedTuple):
+    """Messages for `suggest_next_tasks` and what went into them."""
+
+    messages: List[Dict[str, str]]
+    included: int
+    pending: int
+    tokens: int
+
+
+def _task_line(task: Dict[str, Any]) -> str:
+    title = " ".join(str(task.get("title") or "").split())
+    if len(title) > TITLE_CHARS:
+        title = title[:TITLE_CHARS - 1] + "…"
+    parts = [f"#{task.get('id')} {title}"]
+    if task.get("due"):
+        parts.append(f"due {task['due']}")
+    tags = [tg for tg in task.get("tags") or [] if tg]
+    if tags:
+        parts.append("tags " + ",".join(tags))
+    return " | ".join(parts)
+
+
+def build_task_prompt(tasks: List[Dict[str, Any]], *, token_budget: Optional[int] = None) -> TaskPrompt:
+    """
+    Build the `suggest_next_tasks` prompt for `tasks`.
+
+    Completed tasks are dropped and pending ones are ranked by due date
+    (undated last). Lines are added until the estimated size of the whole
+    prompt would exceed `token_budget` (default ``SUGGEST_TOKEN_BUDGET``); a
+    trailing line says how many pending tasks were left out.
+    """
+    budget = SUGGEST_TOKEN_BUDGET if token_budget is None else token_budget
+    pending = sorted((t for t in tasks if t and not t.get("completed")), key=due_key)
+    header = f"Today is {time.strftime('%Y-%m-%d')}. My pending tasks, soonest due first:"
+    if not pending:
+        header = f"Today is {time.strftime('%Y-%m-%d')}. I have no pending tasks."
+
+    # Reserve room for the "left out" note so adding it never breaks the budget
+    used = estimate_tokens(SUGGEST_SYSTEM_PROMPT) + estimate_tokens(header)
+    reserve = estimate_tokens(f"(+{len(pending)} more pending tasks not shown)")
+    lines = [header]
+    for i, task in enumerate(pending):
+        line = _task_line(task)
+        cost = estimate_tokens(line) + 1
+        last = i == len(pending) - 1
+        if used + cost + (0 if last else reserve) > budget:
+            break
+        lines.append(line)
+        used += cost
+    included = len(lines) - 1
+    if included < len(pending):
+        lines.append(f"(+{len(pending) - included} more pending tasks not shown)")
+
+    user_message = "\n".join(lines)
+    messages = [
+        {"role": "system", "content": SUGGEST_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
+    tokens = estimate_tokens(SUGGEST_SYSTEM_PROMPT) + estimate_tokens(user_message)
+    return TaskPrompt(messages, included, len(pending), tokens)
+
+
+def suggest_next_tasks(
+    tasks: List[Dict[str, Any]],
+    *,
+    use_cache: bool = True,
+    token_budget: Optional[int] = None,
+) -> str:
     """
     Given a list of task dicts, ask the model what the user should work on next.
+
+    The prompt is built by `build_task_prompt`. An unchanged task list is
+    answered from the response cache unless `use_cache` is false.
     """
-    client = openai_client()
+    return suggest_from_prompt(build_task_prompt(tasks, token_budget=token_budget), use_cache=use_cache)
 
-    system_prompt = (
-        "You are a task-prioritization assistant for a college student. "
-        "Given their task list (with titles, due dates, and completion status), "
-        "suggest what they should focus on next and why, in 2–4 sentences."
-    )
 
-    user_message = f"Here are my tasks (as JSON-like dicts):\n{tasks}"
+def suggest_from_prompt(prompt: TaskPrompt, *, use_cache: bool = True) -> str:
+    """Send a prompt from `build_task_prompt` and return the suggestion."""
+    return _complete(prompt.messages, 512, use_cache, "suggest")
 
-    response = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message},
-        ],
-        reasoning_effort="minimal",
-        max_completion_tokens=512,
-    )
 
-    content = response.choices[0].message.content
-    return content.strip() if content else "(no response)"
+def _fold_summary(previous: str, turns: List[Turn], use_cache: bool) -> str:
+    """Ask the model to merge `turns` into the running summary `previous`."""
+    transcript = "\n".join(f"User: {t['user']}\nAssistant: {t['assistant']}" for t in turns)
+    messages = [
+        {
+            "role": "system",
+            "content": "Update the running summary of a conversation with the new exchanges. "
+            "Keep facts, decisions and open questions; at most 120 words.",
+        },
+        {"role": "user", "content": f"Summary so far: {previous or '(none)'}\n\nNew exchanges:\n{transcript}"},
+    ]
+    return _complete(messages, 256, use_cache, "fold")
 
 
-def chat_loop() -> None:
+def chat_loop(
+    *,
+    use_cache: bool = True,
+    stream: bool = True,
+    show_timing: bool = False,
+    session: Optional[str] = None,
+    window: Optional[int] = None,
+) -> List[TurnTiming]:
     """
     Simple terminal REPL for chatting with the AI.
 
     Your CLI calls this when you run:
         python -m final_project.cli chat loop
+
+    Earlier turns are sent along with each message; once they exceed
+    `window` estimated tokens (default ``CHAT_WINDOW_TOKENS``) the oldest are
+    folded into a summary. With a `session` name the conversation is loaded
+    from and saved to ``<data dir>/sessions/<name>.json``.
+
+    Replies are streamed as they are generated unless `stream` is false.
+    Pressing Ctrl-C while a reply is streaming cancels it and returns to the
+    prompt. Returns the timing of every completed streamed turn; with
+    `show_timing` it is also printed after each reply and summarized on exit.
     """
+    window = CHAT_WINDOW_TOKENS if window is None else window
+    if session:
+        convo = load_session(session, CHAT_SYSTEM_PROMPT, window=window)
+    else:
+        convo = ChatSession(CHAT_SYSTEM_PROMPT, window=window)
     print("Welcome to final_project chat. Type 'exit' to quit.")
+    if convo.turns or convo.summary:
+        print(f"(resuming session '{session}' with {len(convo.turns)} recent turns)")
+    turns: List[TurnTiming] = []
 
     while True:
         try:
@@ -96,7 +533,37 @@ def chat_loop() -> None:
             continue
 
         try:
-            reply = summarize_text(msg, kind="chat")
-            print("AI:", reply)
+            messages = convo.messages(msg)
+            if not stream:
+                reply = _complete(messages, 512, use_cache, "chat")
+                print("AI:", reply)
+            else:
+                print("AI: ", end="", flush=True)
+                turn = _stream_complete(messages, 512, use_cache, _write_stdout, "chat")
+                print()
+                turns.append(turn)
+                reply = turn.reply
+                if show_timing:
+                    print(f"[{_format_timing(turn)}]")
+            convo.record(msg, reply, lambda prev, old: _fold_summary(prev, old, use_cache))
+            save_session(convo)
+        except KeyboardInterrupt:
+            print("\n(cancelled)")
         except Exception as e:
             print("AI error:", e)
+
+    if show_timing and turns:
+        ttfts = sorted(t.first_token_s for t in turns if t.first_token_s is not None)
+        totals = sorted(t.total_s for t in turns)
+        median_ttft = f"{ttfts[len(ttfts) // 2] * 1000:.0f} ms" if ttfts else "n/a"
+        print(
+            f"{len(turns)} turns: median first token {median_ttft}, "
+            f"median total {totals[len(totals) // 2] * 1000:.0f} ms"
+        )
+    return turns
+
+
+def _format_timing(turn: TurnTiming) -> str:
+    first = "n/a" if turn.first_token_s is None else f"{turn.first_token_s * 1000:.0f} ms"
+    source = ", cached" if turn.cached else ""
+    return f"first token {first}, total {turn.total_s * 1000:.0f} ms{source}"
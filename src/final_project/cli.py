@@ -1,23 +1,45 @@
 """Command-line interface for the final_project package.
 
 This module provides a `main()` entrypoint that implements subcommands for
-tasks and notes using `argparse`. It loads and saves JSON data via
-`storage.py` and delegates operations to the pure functions in `tasks.py` and
-`notes.py`.
+tasks and notes using `argparse`. It loads and saves data through a
+workspace (see `workspace.py`) backed by `storage.py` and delegates
+operations to the pure functions in `tasks.py` and `notes.py`. The AI helpers
+in `chat.py` are imported only when a ``chat`` subcommand runs, so task and
+note commands never pay for the OpenAI SDK.
+
+``batch`` reads one command per line (the same grammar as the command line)
+from a file or stdin and applies them all to data loaded once, saving at the
+end or every ``--every`` mutations. ``shell`` does the same interactively
+(see `shell.py`).
+
+``--profile`` (or ``FINAL_PROJECT_PROFILE=1``) reports the time spent per
+phase on stderr; see `profiling.py`, which is not imported otherwise.
 """
 
 from __future__ import annotations
 
+import time
+
+# Start of the CLI's own imports, reported by --profile
+_IMPORT_STARTED = time.perf_counter()
+
 import argparse
+import os
+import shlex
 import sys
-from typing import List, Optional
+from typing import Callable, List, Optional
+
+from . import storage, tasks, notes
+from .utils import parse_duration
+from .workspace import DirectWorkspace, MemoryWorkspace
 
-from . import storage, tasks, notes, chat
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 
 EXIT_OK = 0
 EXIT_USER_ERROR = 2
 EXIT_STORAGE_ERROR = 3
+EXIT_AI_ERROR = 4
 
 
 def _print_task(t: dict) -> None:
@@ -30,12 +52,76 @@ def _print_note(n: dict) -> None:
     print(f"{n.get('id')}: {n.get('title')}")
 
 
-def main(argv: Optional[List[str]] = None) -> int:
-    """Parse CLI arguments and perform requested action.
+def _note_text(n: dict) -> str:
+    return f"{n.get('title') or ''}\n\n{n.get('body') or ''}".strip()
 
-    Returns an exit code integer.
-    """
+
+def _summarize_notes(data: dict, args: argparse.Namespace) -> int:
+    """Handle `note summarize <id>` and `note summarize --all`."""
+    from . import chat
+
+    if args.all_notes == bool(args.id):
+        print("Error: give a note id or --all")
+        return EXIT_USER_ERROR
+    if args.id:
+        n = notes.get_note(data, args.id)
+        if not n:
+            print(f"Error: note id {args.id} not found")
+            return EXIT_USER_ERROR
+        print(f"{n['id']}: {chat.summarize_text(_note_text(n), kind='note', use_cache=args.use_cache)}")
+        return EXIT_OK
+
+    items = notes.list_notes(data)
+    results = chat.summarize_many(
+        [_note_text(n) for n in items],
+        kind="note",
+        concurrency=args.concurrency or chat.DEFAULT_CONCURRENCY,
+        use_cache=args.use_cache,
+    )
+    failed = 0
+    for n, res in zip(items, results):
+        if res.error is not None:
+            failed += 1
+            print(f"{n['id']}: error: {res.error}")
+        else:
+            print(f"{n['id']}: {res.summary}")
+    return EXIT_AI_ERROR if failed else EXIT_OK
+
+
+def _chat_stats(args: argparse.Namespace) -> int:
+    """Handle `chat stats`: per-kind summary of the AI metrics log."""
+    from . import metrics
+
+    window = parse_duration(args.since)
+    if window is None:
+        print(f"Error: invalid duration {args.since!r} (try 12h, 7d or 2w)")
+        return EXIT_USER_ERROR
+    calls = metrics.load_calls(since=time.time() - window)
+    if args.kind:
+        calls = [c for c in calls if c.get("kind") == args.kind]
+    if not calls:
+        print(f"No AI calls recorded in the last {args.since} ({metrics.metrics_path()})")
+        return EXIT_OK
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    print(f"AI calls in the last {args.since}; latency over uncached successful calls")
+    print(f"{'kind':<10} {'calls':>6} {'errors':>6} {'cached':>6} {'p50 ms':>8} {'p95 ms':>8} {'prompt tok':>11} {'compl tok':>10}")
+    for kind, st in metrics.summarize(calls).items():
+        print(
+            f"{kind:<10} {st.calls:>6} {st.errors:>6} {st.cached:>6} {ms(st.p50_ms):>8} {ms(st.p95_ms):>8} "
+            f"{st.prompt_tokens:>11} {st.completion_tokens:>10}"
+        )
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for every subcommand."""
     parser = argparse.ArgumentParser(prog="final_project")
+    parser.add_argument("--profile", action="store_true", help="report time per phase on stderr (FINAL_PROJECT_PROFILE=1)")
+    parser.add_argument("--profile-out", metavar="FILE", help="also write a cProfile dump to FILE (implies --profile)")
+    parser.add_argument("--profile-memory", action="store_true", help="also report peak memory via tracemalloc (implies --profile)")
     subparsers = parser.add_subparsers(dest="cmd")
 
     # Task subcommands
@@ -52,7 +138,16 @@ def main(argv: Optional[List[str]] = None) -> int:
     # task list
     t_list = task_sub.add_parser("list", help="list tasks")
     t_list.add_argument("--status", choices=["all", "pending", "completed"], default="all")
-    t_list.add_argument("--tag", dest="tag", default=None)
+    t_list.add_argument("--tag", dest="tags", action="append", default=None)
+    t_list.add_argument("--all-tags", action="store_true", help="require every --tag instead of any")
+    t_list.add_argument("--sort", choices=tasks.SORT_FIELDS, default=None, help="order by due date, creation or title")
+    t_list.add_argument("--limit", type=int, default=None, help="show at most this many tasks")
+    t_list.add_argument("--offset", type=int, default=0, help="skip this many tasks first")
+
+    # task upcoming / overdue
+    t_upcoming = task_sub.add_parser("upcoming", help="list pending tasks due soon")
+    t_upcoming.add_argument("--within", default="7d", help="time window, e.g. 12h, 7d, 2w (default 7d)")
+    task_sub.add_parser("overdue", help="list pending tasks past their due date")
 
     # task done
     t_done = task_sub.add_parser("done", help="mark task done")
@@ -80,7 +175,8 @@ def main(argv: Optional[List[str]] = None) -> int:
     n_add.add_argument("--tag", dest="tags", action="append", default=[])
 
     n_list = note_sub.add_parser("list", help="list notes")
-    n_list.add_argument("--tag", default=None)
+    n_list.add_argument("--tag", dest="tags", action="append", default=None)
+    n_list.add_argument("--all-tags", action="store_true", help="require every --tag instead of any")
 
     n_show = note_sub.add_parser("show", help="show a note")
     n_show.add_argument("id")
@@ -97,36 +193,89 @@ def main(argv: Optional[List[str]] = None) -> int:
     n_remove = note_sub.add_parser("remove", help="remove a note")
     n_remove.add_argument("id")
 
+    n_summarize = note_sub.add_parser("summarize", help="summarize a note (or all notes) with AI")
+    n_summarize.add_argument("id", nargs="?", default=None)
+    n_summarize.add_argument("--all", dest="all_notes", action="store_true", help="summarize every note concurrently")
+    n_summarize.add_argument("--concurrency", type=int, default=None, help="requests in flight with --all")
+    n_summarize.add_argument("--no-cache", dest="use_cache", action="store_false", help="always call the API")
+
     # Chat subcommands (basic)
     chat_parser = subparsers.add_parser("chat", help="chat with AI helpers")
     chat_sub = chat_parser.add_subparsers(dest="subcmd")
     chat_loop = chat_sub.add_parser("loop", help="start interactive chat loop")
     chat_suggest = chat_sub.add_parser("suggest", help="suggest next tasks")
-
-    args = parser.parse_args(argv)
-
-    # Dispatch
+    for p in (chat_loop, chat_suggest):
+        p.add_argument("--no-cache", dest="use_cache", action="store_false", help="always call the API")
+    chat_suggest.add_argument("--budget", type=int, default=None, help="prompt token budget (estimated)")
+    chat_loop.add_argument("--no-stream", dest="stream", action="store_false", help="print replies only when complete")
+    chat_loop.add_argument("--timing", action="store_true", help="show time to first token and total per turn")
+    chat_loop.add_argument("--session", default=None, help="save the conversation under this name and resume it later")
+    chat_loop.add_argument("--window", type=int, default=None, help="history tokens kept before older turns are summarized")
+    chat_stats = chat_sub.add_parser("stats", help="latency, tokens and call counts from the local AI metrics log")
+    chat_stats.add_argument("--since", default="7d", help="time window, e.g. 12h, 7d or 2w (default: 7d)")
+    chat_stats.add_argument("--kind", default=None, help="only this call kind (summary, suggest, chat, fold)")
+
+    # Storage maintenance
+    migrate = subparsers.add_parser("migrate", help="copy the JSON data files into another backend")
+    migrate.add_argument("--to", choices=["sqlite", "sharded"], default="sqlite", help="target backend (default: sqlite)")
+
+    # Many commands against one load/save
+    batch = subparsers.add_parser("batch", help="run one command per line from a file or stdin")
+    batch.add_argument("file", nargs="?", default="-", help="command file (default: stdin)")
+    batch.add_argument("--every", type=int, default=0, help="also save after every N changes (default: only at the end)")
+    batch.add_argument("--stop-on-error", action="store_true", help="stop at the first failing line")
+
+    # Interactive session keeping data in memory
+    shell = subparsers.add_parser("shell", help="interactive prompt that keeps tasks and notes loaded")
+    shell.add_argument("--flush-interval", type=float, default=2.0, help="seconds between background saves (0: only on exit)")
+    shell.add_argument("--timing", action="store_true", help="print how long each command took")
+
+    return parser
+
+
+def dispatch(parser: argparse.ArgumentParser, args: argparse.Namespace, ws) -> int:
+    """Run one parsed command against workspace `ws` and return its exit code."""
     try:
         if args.cmd == "task":
-            # load tasks
-            data = storage.load_tasks()
+            if args.subcmd == "list":
+                items = ws.list_tasks(status=args.status, tags=args.tags, match_all=args.all_tags)
+                try:
+                    page = tasks.page_tasks(items, sort=args.sort, limit=args.limit, offset=args.offset)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    return EXIT_USER_ERROR
+                for it in page:
+                    _print_task(it)
+                return EXIT_OK
+
+            if args.subcmd in ("upcoming", "overdue"):
+                now = time.time()
+                if args.subcmd == "overdue":
+                    start, end = None, now
+                else:
+                    within = parse_duration(args.within)
+                    if within is None:
+                        print(f"Error: invalid duration {args.within!r} (try 12h, 7d or 2w)")
+                        return EXIT_USER_ERROR
+                    start, end = now, now + within
+                for it in ws.due_tasks(start, end):
+                    _print_task(it)
+                return EXIT_OK
+
+            # Mutations only need the target task (and next_id); backends
+            # that can fetch single records skip loading the rest
+            data = ws.load("tasks", ids=[args.id] if getattr(args, "id", None) else [])
             if args.subcmd == "add":
                 data = tasks.create_task(data, title=args.title, description=args.description, due=args.due, tags=args.tags)
-                storage.save_tasks(data)
                 t = data["tasks"][-1]
+                ws.save("tasks", data, changed=[t])
                 print(f"Created task {t['id']}: {t['title']}")
                 return EXIT_OK
 
-            if args.subcmd == "list":
-                items = tasks.list_tasks(data, status=args.status, tag=args.tag)
-                for it in items:
-                    _print_task(it)
-                return EXIT_OK
-
             if args.subcmd == "done":
                 try:
                     data = tasks.mark_done(data, args.id)
-                    storage.save_tasks(data)
+                    ws.save("tasks", data, changed=[tasks.get_task(data, args.id)])
                     print(f"Marked {args.id} done")
                     return EXIT_OK
                 except KeyError:
@@ -136,7 +285,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             if args.subcmd == "remove":
                 try:
                     data = tasks.remove_task(data, args.id)
-                    storage.save_tasks(data)
+                    ws.save("tasks", data, removed=[args.id])
                     print(f"Removed {args.id}")
                     return EXIT_OK
                 except KeyError:
@@ -146,7 +295,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             if args.subcmd == "edit":
                 try:
                     data = tasks.edit_task(data, args.id, title=args.title, description=args.description, due=args.due, tags=args.tags)
-                    storage.save_tasks(data)
+                    ws.save("tasks", data, changed=[tasks.get_task(data, args.id)])
                     print(f"Edited {args.id}")
                     return EXIT_OK
                 except KeyError:
@@ -157,20 +306,24 @@ def main(argv: Optional[List[str]] = None) -> int:
             return EXIT_USER_ERROR
 
         elif args.cmd == "note":
-            data = storage.load_notes()
+            if args.subcmd == "list":
+                items = ws.list_notes(tags=args.tags, match_all=args.all_tags)
+                for it in items:
+                    _print_note(it)
+                return EXIT_OK
+
+            # Search and summarize --all read every note; the rest touch at most one
+            if args.subcmd == "search" or getattr(args, "all_notes", False):
+                data = ws.load("notes")
+            else:
+                data = ws.load("notes", ids=[args.id] if getattr(args, "id", None) else [])
             if args.subcmd == "add":
                 data = notes.create_note(data, title=args.title, body=args.body, tags=args.tags)
-                storage.save_notes(data)
                 n = data["notes"][-1]
+                ws.save("notes", data, changed=[n])
                 print(f"Created note {n['id']}: {n['title']}")
                 return EXIT_OK
 
-            if args.subcmd == "list":
-                items = notes.list_notes(data, tag=args.tag)
-                for it in items:
-                    _print_note(it)
-                return EXIT_OK
-
             if args.subcmd == "show":
                 n = notes.get_note(data, args.id)
                 if not n:
@@ -180,15 +333,19 @@ def main(argv: Optional[List[str]] = None) -> int:
                 return EXIT_OK
 
             if args.subcmd == "search":
+                ws.prepare_search(data)
                 results = notes.search_notes(data, args.query)
                 for r in results:
                     _print_note(r)
                 return EXIT_OK
 
+            if args.subcmd == "summarize":
+                return _summarize_notes(data, args)
+
             if args.subcmd == "edit":
                 try:
                     data = notes.edit_note(data, args.id, title=args.title, body=args.body, tags=args.tags)
-                    storage.save_notes(data)
+                    ws.save("notes", data, changed=[notes.get_note(data, args.id)])
                     print(f"Edited note {args.id}")
                     return EXIT_OK
                 except KeyError:
@@ -198,7 +355,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             if args.subcmd == "remove":
                 try:
                     data = notes.remove_note(data, args.id)
-                    storage.save_notes(data)
+                    ws.save("notes", data, removed=[args.id])
                     print(f"Removed note {args.id}")
                     return EXIT_OK
                 except KeyError:
@@ -209,18 +366,47 @@ def main(argv: Optional[List[str]] = None) -> int:
             return EXIT_USER_ERROR
 
         elif args.cmd == "chat":
+            if args.subcmd == "stats":
+                return _chat_stats(args)
+            from . import chat
+
             if args.subcmd == "loop":
-                chat.chat_loop()
+                try:
+                    chat.chat_loop(
+                        use_cache=args.use_cache,
+                        stream=args.stream,
+                        show_timing=args.timing,
+                        session=args.session,
+                        window=args.window,
+                    )
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    return EXIT_USER_ERROR
                 return EXIT_OK
             if args.subcmd == "suggest":
-                # load tasks and call suggest_next_tasks
-                data = storage.load_tasks()
-                out = chat.suggest_next_tasks(data.get("tasks", []))
+                # load tasks, build the compact prompt and ask for suggestions
+                data = ws.load("tasks")
+                prompt = chat.build_task_prompt(data.get("tasks", []), token_budget=args.budget)
+                print(
+                    f"(sending {prompt.included} of {prompt.pending} pending tasks, ~{prompt.tokens} tokens)",
+                    file=sys.stderr,
+                )
+                out = chat.suggest_from_prompt(prompt, use_cache=args.use_cache)
                 print(out)
                 return EXIT_OK
             parser.print_help()
             return EXIT_USER_ERROR
 
+        elif args.cmd == "migrate":
+            if args.to == "sharded":
+                count = storage.migrate_to_sharded()
+                print(f"Migrated {count} tasks to {storage.DATA_DIR / 'tasks'}")
+            else:
+                counts = storage.migrate_to_sqlite()
+                print(f"Migrated {counts['tasks']} tasks and {counts['notes']} notes to {storage.DB_FILE}")
+            print(f"Set FINAL_PROJECT_BACKEND={args.to} to use it.")
+            return EXIT_OK
+
         else:
             parser.print_help()
             return EXIT_USER_ERROR
@@ -230,5 +416,122 @@ def main(argv: Optional[List[str]] = None) -> int:
         return EXIT_STORAGE_ERROR
 
 
+# Commands that make no sense inside a batch
+_NOT_IN_BATCH = {("batch", None), ("shell", None), ("chat", "loop")}
+
+
+def run_line(parser: argparse.ArgumentParser, line: str, ws, not_allowed=_NOT_IN_BATCH) -> int:
+    """Parse one command line and dispatch it against `ws`; return its exit code."""
+    try:
+        args = parser.parse_args(shlex.split(line))
+    except ValueError as exc:  # unbalanced quotes
+        print(f"Error: {exc}")
+        return EXIT_USER_ERROR
+    except SystemExit as exc:
+        # argparse already printed the problem (or --help)
+        return exc.code if isinstance(exc.code, int) else EXIT_USER_ERROR
+    if (args.cmd, getattr(args, "subcmd", None)) in not_allowed:
+        print(f"Error: '{line}' cannot run here")
+        return EXIT_USER_ERROR
+    return dispatch(parser, args, ws)
+
+
+def run_batch(
+    parser: argparse.ArgumentParser, lines, *, every: int = 0, stop_on_error: bool = False, workspace=None
+) -> int:
+    """Run each command in `lines` against one in-memory workspace.
+
+    Blank lines and ``#`` comments are skipped. Changes are saved once at the
+    end, and also after every `every` mutations when it is positive. Failing
+    lines are reported on stderr as ``line N: exit CODE: <command>``.
+    `workspace` defaults to a new `MemoryWorkspace`.
+    """
+    ws = MemoryWorkspace() if workspace is None else workspace
+    ok = failed = 0
+    try:
+        for lineno, raw in enumerate(lines, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            code = run_line(parser, line, ws)
+            if code == EXIT_OK:
+                ok += 1
+            else:
+                failed += 1
+                print(f"line {lineno}: exit {code}: {line}", file=sys.stderr)
+                if stop_on_error:
+                    break
+            if every > 0 and ws.pending >= every:
+                ws.flush()
+    except storage.StorageError as exc:
+        print(f"Storage error: {exc}")
+        return EXIT_STORAGE_ERROR
+    except BaseException:
+        # Keep what the finished lines changed, but let the error (or
+        # Ctrl-C) propagate
+        try:
+            ws.flush()
+        except storage.StorageError as exc:
+            print(f"Storage error: {exc}")
+        raise
+    try:
+        ws.flush()
+    except storage.StorageError as exc:
+        print(f"Storage error: {exc}")
+        return EXIT_STORAGE_ERROR
+    print(f"batch: {ok} ok, {failed} failed", file=sys.stderr)
+    return EXIT_OK if not failed else EXIT_USER_ERROR
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, wrap: Callable) -> int:
+    # `wrap` decorates the workspace (timing under --profile)
+    if args.cmd == "batch":
+        ws = wrap(MemoryWorkspace())
+        if args.file == "-":
+            return run_batch(parser, sys.stdin, every=args.every, stop_on_error=args.stop_on_error, workspace=ws)
+        try:
+            fh = open(args.file, "r", encoding="utf-8")
+        except OSError as exc:
+            print(f"Error: cannot read {args.file}: {exc.strerror}")
+            return EXIT_USER_ERROR
+        with fh:
+            return run_batch(parser, fh, every=args.every, stop_on_error=args.stop_on_error, workspace=ws)
+    if args.cmd == "shell":
+        from .shell import run_shell
+
+        return run_shell(parser, flush_interval=args.flush_interval, show_timing=args.timing)
+    return dispatch(parser, args, wrap(DirectWorkspace()))
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in {"1", "true", "yes", "on"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse CLI arguments and perform requested action.
+
+    Returns an exit code integer.
+    """
+    started = time.perf_counter()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    prof_path = args.profile_out or os.getenv("FINAL_PROJECT_PROFILE_OUT")
+    memory = args.profile_memory or _env_flag("FINAL_PROJECT_PROFILE_MEMORY")
+    if not (args.profile or prof_path or memory or _env_flag("FINAL_PROJECT_PROFILE")):
+        return _run(parser, args, lambda ws: ws)
+
+    from .profiling import Profiler, TimedWorkspace
+
+    profiler = Profiler(prof_path=prof_path, memory=memory)
+    profiler.record("import", _IMPORT_SECONDS)
+    profiler.record("argparse", time.perf_counter() - started)
+    profiler.start()
+    try:
+        return profiler.run(_run, parser, args, lambda ws: TimedWorkspace(ws, profiler))
+    finally:
+        profiler.stop()
+        profiler.report()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
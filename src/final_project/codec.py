@@ -0,0 +1,227 @@
+"""On-disk encodings for the JSON data files of final_project.
+
+`encode` turns a mapping into file bytes in one of three formats:
+
+- ``compact`` (default): JSON without indentation or spaces after separators
+- ``pretty``: the original 2-space indented JSON, handy for hand editing
+- ``gzip``: compact JSON, gzip-compressed
+
+`decode` detects the format from the first bytes of the file (the gzip magic
+number, otherwise JSON), so files written in any format, including the
+pretty-printed files from older versions, keep loading whatever format is
+configured for writing.
+
+`orjson` is used when installed and the standard library `json` module
+otherwise; both produce the same documents. `orjson` and `gzip` are imported
+on first use, so commands that never touch a data file do not pay for them.
+
+`iter_array` reads the records of one top-level array incrementally, holding
+only a small buffer and the current record in memory, for read-only
+commands over large files, and `read_key` fetches one top-level value (the
+version counter storage writes first) without parsing the rest.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
+
+FORMATS = ("compact", "pretty", "gzip")
+GZIP_MAGIC = b"\x1f\x8b"
+UTF8_BOM = b"\xef\xbb\xbf"
+# Level 6 is zlib's default balance of speed and size
+GZIP_LEVEL = 6
+# Characters read per refill by iter_array
+READ_CHARS = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+_UNSET: Any = object()
+# The optional fast encoder: the orjson module, None when it is not
+# installed, or _UNSET until the first encode/decode looks it up
+_orjson: Any = _UNSET
+
+
+def _fast_json() -> Any:
+    global _orjson
+    if _orjson is _UNSET:
+        try:
+            import orjson
+        except ImportError:  # pragma: no cover - depends on the environment
+            orjson = None
+        _orjson = orjson
+    return _orjson
+
+
+def _dumps(data: Any, pretty: bool) -> bytes:
+    orjson = _fast_json()
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            # e.g. integers beyond 64 bits or non-string keys: let json handle it
+            pass
+    if pretty:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def encode(data: Any, fmt: str = "compact") -> bytes:
+    """Return `data` serialized in format `fmt` (see `FORMATS`).
+
+    Raises ValueError for an unknown format.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown storage format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    raw = _dumps(data, fmt == "pretty")
+    if fmt == "gzip":
+        import gzip
+
+        # mtime=0 keeps the output identical for identical data
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    return raw
+
+
+def decode(raw: bytes) -> Any:
+    """Parse file bytes written by `encode` in any format."""
+    if raw.startswith(GZIP_MAGIC):
+        import gzip
+
+        raw = gzip.decompress(raw)
+    if raw.startswith(UTF8_BOM):
+        raw = raw[len(UTF8_BOM):]
+    orjson = _fast_json()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def open_text(path: Path) -> TextIO:
+    """Open a file written by `encode` for buffered text reading."""
+    with open(path, "rb") as fh:
+        gzipped = fh.read(2) == GZIP_MAGIC
+    if gzipped:
+        import gzip
+
+        return gzip.open(path, "rt", encoding="utf-8-sig")
+    return io.open(path, "r", encoding="utf-8-sig")
+
+
+class _Reader:
+    """Sliding text buffer over a file with JSON value parsing."""
+
+    def __init__(self, fh: TextIO) -> None:
+        self.fh = fh
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fh.read(READ_CHARS)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.buf) // 2:
+            # Drop consumed text so the buffer stays about one chunk long
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character (None at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Parse the next JSON value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(fh: TextIO, root_key: str) -> Iterator[Any]:
+    """Yield the items of ``document[root_key]`` (or of a top-level list).
+
+    Other top-level values are parsed and discarded. Yields nothing if the
+    document is a mapping without `root_key`. Raises ValueError on malformed
+    input.
+    """
+    r = _Reader(fh)
+    first = r.peek()
+    if first == "[":
+        yield from _items(r)
+        return
+    r.expect("{")
+    if r.peek() == "}":
+        return
+    while True:
+        key = r.value()
+        r.expect(":")
+        if key == root_key and r.peek() == "[":
+            yield from _items(r)
+            return
+        r.value()
+        if r.peek() == "}":
+            return
+        r.expect(",")
+
+
+def read_key(fh: TextIO, key: str) -> Any:
+    """Return ``document[key]`` for a top-level mapping, or None if absent.
+
+    Parsing stops at `key`, so a key written first costs one small read
+    whatever the size of the file. Raises ValueError on malformed input.
+    """
+    r = _Reader(fh)
+    if r.peek() != "{":
+        return None
+    r.expect("{")
+    if r.peek() == "}":
+        return None
+    while True:
+        name = r.value()
+        r.expect(":")
+        value = r.value()
+        if name == key:
+            return value
+        if r.peek() == "}":
+            return None
+        r.expect(",")
+
+
+def _items(r: _Reader) -> Iterator[Any]:
+    r.expect("[")
+    if r.peek() == "]":
+        return
+    while True:
+        yield r.value()
+        if r.peek() == "]":
+            return
+        r.expect(",")
@@ -0,0 +1,175 @@
+"""Local metrics log for the AI calls made by final_project.
+
+Every completion `chat.py` requests (or answers from the response cache)
+appends one JSON line to ``<data dir>/ai_metrics.jsonl``: when it happened,
+the call kind (``summary``, ``suggest``, ``chat``, ``fold``), the model, the
+latency, whether the cache answered it, the prompt/completion tokens the API
+reported in ``response.usage`` and, for failed calls, the error. Streamed
+calls also record the time to the first token.
+
+The log is append-only; once it passes ``FINAL_PROJECT_AI_METRICS_BYTES``
+(1 MiB) it is moved to ``ai_metrics.jsonl.1`` and a new one is started, so at
+most two files are kept. Set ``FINAL_PROJECT_AI_METRICS=0`` to stop
+recording. Writing is best effort: a metrics failure never fails the call.
+
+`load_calls` and `summarize` back ``final_project chat stats``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from . import storage
+
+METRICS_ENABLED = os.getenv("FINAL_PROJECT_AI_METRICS", "1").lower() not in {"0", "false", "no", "off"}
+MAX_BYTES = int(os.getenv("FINAL_PROJECT_AI_METRICS_BYTES", str(1024 * 1024)))
+METRICS_FILE = "ai_metrics.jsonl"
+ERROR_CHARS = 200
+
+_write_lock = threading.Lock()
+
+
+def metrics_path() -> Path:
+    return storage.DATA_DIR / METRICS_FILE
+
+
+def usage_tokens(usage: Any) -> Dict[str, Optional[int]]:
+    """Return the prompt/completion token counts of a ``response.usage``, if any."""
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+
+
+def error_text(exc: BaseException) -> str:
+    text = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+    return text[:ERROR_CHARS]
+
+
+def record(
+    kind: str,
+    *,
+    model: str,
+    latency_s: float,
+    cached: bool,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    error: Optional[str] = None,
+    first_token_s: Optional[float] = None,
+) -> None:
+    """Append one call to the metrics log (no-op when disabled)."""
+    if not METRICS_ENABLED:
+        return
+    entry: Dict[str, Any] = {
+        "ts": round(time.time(), 3),
+        "kind": kind,
+        "model": model,
+        "latency_ms": round(latency_s * 1000, 1),
+        "cached": cached,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "error": error,
+    }
+    if first_token_s is not None:
+        entry["first_token_ms"] = round(first_token_s * 1000, 1)
+    line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+    path = metrics_path()
+    try:
+        with _write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _rotate(path)
+            # One short write in append mode, so lines from several
+            # processes do not interleave
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+    except (OSError, storage.StorageError):
+        # Metrics are diagnostics; never fail a call because of them
+        pass
+
+
+def _rotate(path: Path) -> None:
+    try:
+        if path.stat().st_size < MAX_BYTES:
+            return
+    except FileNotFoundError:
+        return
+    with storage.commit_lock(path):
+        # Another process may have rotated while we waited
+        if path.exists() and path.stat().st_size >= MAX_BYTES:
+            os.replace(path, path.with_name(path.name + ".1"))
+
+
+def load_calls(since: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Return recorded calls at or after the timestamp `since`, oldest first.
+
+    Reads the rotated file too; lines that do not parse are skipped.
+    """
+    path = metrics_path()
+    calls = []
+    for p in (path.with_name(path.name + ".1"), path):
+        try:
+            fh = open(p, encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or not isinstance(entry.get("ts"), (int, float)):
+                    continue
+                if since is None or entry["ts"] >= since:
+                    calls.append(entry)
+    return calls
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class KindStats(NamedTuple):
+    """Aggregates for one call kind in `summarize`."""
+
+    calls: int
+    errors: int
+    cached: int
+    p50_ms: Optional[float]  # over API calls that succeeded
+    p95_ms: Optional[float]
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def summarize(calls: Iterable[Dict[str, Any]]) -> Dict[str, KindStats]:
+    """Group `calls` by kind; cache hits are counted but left out of latency."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for c in calls:
+        groups.setdefault(str(c.get("kind")), []).append(c)
+    out = {}
+    for kind in sorted(groups):
+        group = groups[kind]
+        latencies = [
+            float(c["latency_ms"])
+            for c in group
+            if not c.get("cached") and not c.get("error") and isinstance(c.get("latency_ms"), (int, float))
+        ]
+        out[kind] = KindStats(
+            calls=len(group),
+            errors=sum(1 for c in group if c.get("error")),
+            cached=sum(1 for c in group if c.get("cached")),
+            p50_ms=percentile(latencies, 50),
+            p95_ms=percentile(latencies, 95),
+            prompt_tokens=sum(c.get("prompt_tokens") or 0 for c in group),
+            completion_tokens=sum(c.get("completion_tokens") or 0 for c in group),
+        )
+    return out
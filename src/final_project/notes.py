@@ -2,7 +2,8 @@
 
 Functions operate on an in-memory ``data`` mapping with a ``"notes"`` key
 holding a list of note dicts. No file I/O is performed here; callers should
-persist via `storage.py` when needed.
+persist via `storage.py` when needed. Lookups by id go through the cached
+index in `store.py`.
 
 Note schema (dict):
   - id: str
@@ -10,31 +11,29 @@ Note schema (dict):
   - body: str
   - created_at: ISO 8601 str
   - tags: list[str]
+
+The mapping also carries a ``next_id`` integer counter used to allocate ids.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-from .utils import iso_now
-import uuid
+from typing import Any, Callable, Dict, List, Optional
+from .search import TagIndex, TrigramIndex, tag_predicate
+from .store import store_for
+from .utils import iso_now, next_numeric_id
 
 
 def _next_id(data: Dict[str, Any]) -> str:
-    """Generate the next numeric id if possible; otherwise use a uuid hex."""
-    notes = data.get("notes") or []
-    max_id = 0
-    for n in notes:
-        nid = n.get("id")
-        if isinstance(nid, str) and nid.isdigit():
-            try:
-                val = int(nid)
-                if val > max_id:
-                    max_id = val
-            except Exception:
-                pass
-    if max_id >= 0:
-        return str(max_id + 1)
-    return uuid.uuid4().hex
+    """Allocate the next numeric id from the ``next_id`` high-water mark.
+
+    Mappings without a counter (e.g. built by hand) are backfilled with one
+    scan. Ids are never reused, even after the highest note is removed.
+    """
+    nid = data.get("next_id")
+    if not isinstance(nid, int):
+        nid = next_numeric_id(store_for(data, "notes").records())
+    data["next_id"] = nid + 1
+    return str(nid)
 
 
 def create_note(data: Dict[str, Any], title: str, body: str, tags: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -49,9 +48,6 @@ def create_note(data: Dict[str, Any], title: str, body: str, tags: Optional[List
     Returns:
         The same ``data`` mapping (mutated).
     """
-    if "notes" not in data or data["notes"] is None:
-        data["notes"] = []
-
     note = {
         "id": _next_id(data),
         "title": title,
@@ -60,28 +56,35 @@ def create_note(data: Dict[str, Any], title: str, body: str, tags: Optional[List
         "tags": tags or [],
     }
 
-    data["notes"].append(note)
+    store_for(data, "notes").add(note)
     return data
 
 
-def list_notes(data: Dict[str, Any], tag: Optional[str] = None) -> List[Dict[str, Any]]:
+def list_notes(
+    data: Dict[str, Any], tag: Optional[str] = None, *, tags: Optional[List[str]] = None, match_all: bool = False
+) -> List[Dict[str, Any]]:
     """Return notes, optionally filtered by a tag.
 
-    Tag matching is case-insensitive and exact for tag entries.
+    Tag matching is case-insensitive and exact for tag entries. `tags` adds
+    more tags: notes must carry any of them, or all of them if `match_all`
+    is true. Filtering goes through the store's tag index.
     """
-    notes = list(data.get("notes") or [])
-    if tag:
-        tag_low = tag.lower()
-        notes = [n for n in notes if any((tg or "").lower() == tag_low for tg in n.get("tags", []))]
-    return notes
+    store = store_for(data, "notes")
+    wanted = [tg for tg in [tag, *(tags or [])] if tg]
+    if not wanted:
+        return list(store.records())
+    return store.ordered(store.ensure_index("tags", TagIndex).lookup(wanted, match_all=match_all))
+
+
+def note_filter(*, tags: Optional[List[str]] = None, match_all: bool = False) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Return a predicate selecting the notes `list_notes` would return (None: all)."""
+    wanted = [tg for tg in tags or [] if tg]
+    return tag_predicate(wanted, match_all=match_all) if wanted else None
 
 
 def get_note(data: Dict[str, Any], note_id: str) -> Optional[Dict[str, Any]]:
     """Return the note dict with `note_id` or None if not found."""
-    for n in data.get("notes", []):
-        if n.get("id") == note_id:
-            return n
-    return None
+    return store_for(data, "notes").get(note_id)
 
 
 def edit_note(
@@ -91,16 +94,12 @@ def edit_note(
 
     Raises KeyError if the note id does not exist.
     """
-    for n in data.get("notes", []):
-        if n.get("id") == note_id:
-            if title is not None:
-                n["title"] = title
-            if body is not None:
-                n["body"] = body
-            if tags is not None:
-                n["tags"] = tags
-            return data
-    raise KeyError(f"note id {note_id} not found")
+    store = store_for(data, "notes")
+    if store.get(note_id) is None:
+        raise KeyError(f"note id {note_id} not found")
+    fields = {"title": title, "body": body, "tags": tags}
+    store.update(note_id, {k: v for k, v in fields.items() if v is not None})
+    return data
 
 
 def remove_note(data: Dict[str, Any], note_id: str) -> Dict[str, Any]:
@@ -108,19 +107,36 @@ def remove_note(data: Dict[str, Any], note_id: str) -> Dict[str, Any]:
 
     Raises KeyError if the note id is not present.
     """
-    notes = data.get("notes", [])
-    new = [n for n in notes if n.get("id") != note_id]
-    if len(new) == len(notes):
+    if store_for(data, "notes").remove(note_id) is None:
         raise KeyError(f"note id {note_id} not found")
-    data["notes"] = new
     return data
 
 
+def enable_search_index(data: Dict[str, Any], index: Optional[TrigramIndex] = None) -> TrigramIndex:
+    """Attach a trigram index to ``data['notes']`` so searches can use it.
+
+    If `index` is given it must already reflect the notes (e.g. loaded from
+    the sidecar by `storage.load_search_index`); otherwise one is built.
+    Returns the attached index.
+    """
+    store = store_for(data, "notes")
+    if index is None:
+        return store.attach("trigram", TrigramIndex())
+    return store.attach("trigram", index, fresh=True)
+
+
 def search_notes(data: Dict[str, Any], query: str) -> List[Dict[str, Any]]:
-    """Return notes where `query` is a substring of the title or body (case-insensitive)."""
+    """Return notes where `query` is a substring of the title or body (case-insensitive).
+
+    When a trigram index is enabled only its candidates are checked.
+    """
     q = (query or "").lower()
+    store = store_for(data, "notes")
+    index = store.index("trigram")
+    ids = index.candidates(q) if index is not None else None
+    candidates = store.records() if ids is None else store.ordered(ids)
     results: List[Dict[str, Any]] = []
-    for n in data.get("notes", []):
+    for n in candidates:
         if q in (n.get("title") or "").lower() or q in (n.get("body") or "").lower():
             results.append(n)
     return results
@@ -0,0 +1,129 @@
+"""Opt-in per-phase timing for the final_project CLI.
+
+Enabled with ``--profile`` or ``FINAL_PROJECT_PROFILE=1``. `cli.main` then
+reports on stderr how long the command spent in each phase:
+
+- ``import``: importing the CLI and the modules it needs at start-up
+- ``argparse``: building the parser and parsing the arguments
+- ``load``: workspace reads (``storage.load_*``, listings, due queries)
+- ``operation``: everything else the command did, i.e. the pure functions
+  and printing
+- ``save``: workspace writes (``storage.save_*``)
+
+``--profile-out FILE`` (``FINAL_PROJECT_PROFILE_OUT``) additionally dumps a
+cProfile ``.prof`` file of the command for ``python -m pstats`` or snakeviz,
+and ``--profile-memory`` (``FINAL_PROJECT_PROFILE_MEMORY=1``) reports the
+tracemalloc peak. This module is only imported when profiling is on, so a
+normal run pays nothing for it.
+
+Listings that stream records (``task list`` on the JSON backend) read the
+file while printing, so that time shows up under ``operation``.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from .workspace import MemoryWorkspace
+
+PHASES = ("import", "argparse", "load", "operation", "save")
+
+
+class Profiler:
+    """Accumulates wall time per phase and runs the optional cProfile/tracemalloc."""
+
+    def __init__(self, *, prof_path: Optional[str] = None, memory: bool = False) -> None:
+        self.prof_path = prof_path
+        self.memory = memory
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._profile: Any = None
+        self._peak: Optional[int] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def run(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Call `fn`, booking the time not spent loading or saving as ``operation``."""
+        before = self.seconds.get("load", 0.0) + self.seconds.get("save", 0.0)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            io = self.seconds.get("load", 0.0) + self.seconds.get("save", 0.0) - before
+            self.record("operation", time.perf_counter() - start - io)
+
+    def start(self) -> None:
+        """Start tracemalloc and cProfile if requested."""
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        if self.prof_path:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop the collectors and write the cProfile dump."""
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.prof_path)
+        if self.memory:
+            import tracemalloc
+
+            self._peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def report(self, out: Optional[TextIO] = None) -> None:
+        """Print the phase table (default: to stderr)."""
+        out = sys.stderr if out is None else out
+        print("profile:", file=out)
+        for name in PHASES:
+            if name not in self.seconds:
+                continue
+            calls = self.calls[name]
+            suffix = f"  ({calls} calls)" if name in ("load", "save") and calls > 1 else ""
+            print(f"  {name:<10} {self.seconds[name] * 1000:>10.2f} ms{suffix}", file=out)
+        print(f"  {'total':<10} {sum(self.seconds.values()) * 1000:>10.2f} ms", file=out)
+        if self._peak is not None:
+            print(f"  peak memory {self._peak / (1024 * 1024):.2f} MiB (tracemalloc)", file=out)
+        if self._profile is not None:
+            print(f"  cProfile written to {self.prof_path}", file=out)
+
+
+class TimedWorkspace:
+    """Proxy for a workspace that books its reads and writes to a `Profiler`."""
+
+    _LOADS = frozenset({"load", "list_tasks", "list_notes", "due_tasks", "prepare_search"})
+
+    def __init__(self, ws: Any, profiler: Profiler) -> None:
+        self._ws = ws
+        self._profiler = profiler
+        # A MemoryWorkspace only writes to disk when flushed
+        self._saves = {"flush"} if isinstance(ws, MemoryWorkspace) else {"save"}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._ws, name)
+        phase = "load" if name in self._LOADS else "save" if name in self._saves else None
+        if phase is None:
+            return attr
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self._profiler.phase(phase):
+                return attr(*args, **kwargs)
+
+        return timed
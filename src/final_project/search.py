@@ -0,0 +1,227 @@
+"""Secondary indexes over task and note records.
+
+`TagIndex` maps each lowercased tag to the ids carrying it, so tag-filtered
+listing scales with the number of matches instead of the collection size.
+
+`DueIndex` keeps pending tasks that have a due date in a list sorted by their
+normalized due timestamp, so "due before/within" queries are a bisect plus
+the matches (O(log n + k)).
+
+`TrigramIndex` narrows `notes.search_notes` candidates. Every lowercase
+3-character window of a note's title and body maps to the set of note ids
+containing it. A note whose title or body contains a query of three or more
+characters must contain all of the query's trigrams, so intersecting their
+posting sets yields a superset of the matches. `search_notes` still runs the
+exact substring check on those candidates, so results are identical to a
+full scan.
+
+All three are attached to a `RecordStore` (see `store.py`), which keeps them
+up to date on create/edit/remove. `TagIndex` and `DueIndex` are built on the
+first query that needs them (``store.ensure_index``) and live only in memory.
+`TrigramIndex` is opt-in instead: `notes.enable_search_index` attaches it,
+and `storage.py` persists it in the ``notes.json.tri`` sidecar, so it
+outlives the process. Postings are stored there as space-joined strings and
+only decoded into sets when a query or update touches them, which keeps
+loading the sidecar cheap.
+
+Building the trigram index costs far more than a single scan, so it pays off
+in long-lived processes and for repeated queries, not for one-shot searches.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .utils import due_epoch
+
+FORMAT_VERSION = 1
+
+
+class TagIndex:
+    """Inverted index from lowercased tag to the ids of records carrying it."""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Set[Any]] = {}
+
+    @staticmethod
+    def _tags(record: Dict[str, Any]) -> Set[str]:
+        return {(tg or "").lower() for tg in record.get("tags") or []}
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> None:
+        self.postings = {}
+        for r in records:
+            self.add(r)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        rid = record.get("id")
+        for tg in self._tags(record):
+            self.postings.setdefault(tg, set()).add(rid)
+
+    def discard(self, record: Dict[str, Any]) -> None:
+        rid = record.get("id")
+        for tg in self._tags(record):
+            ids = self.postings.get(tg)
+            if ids is not None:
+                ids.discard(rid)
+                if not ids:
+                    del self.postings[tg]
+
+    def lookup(self, tags: Iterable[str], *, match_all: bool = False) -> Set[Any]:
+        """Return ids tagged with any (or, with `match_all`, every) of `tags`.
+
+        Tags are compared case-insensitively.
+        """
+        sets = [self.postings.get(tg.lower(), set()) for tg in tags]
+        if not sets:
+            return set()
+        if match_all:
+            sets.sort(key=len)
+            return set(sets[0]).intersection(*sets[1:])
+        return set().union(*sets)
+
+
+class DueIndex:
+    """Pending tasks with a due date, sorted by ``(due timestamp, id)``."""
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[float, Any]] = []
+
+    @staticmethod
+    def epoch(task: Dict[str, Any]) -> Optional[float]:
+        """The task's stored ``due_epoch``, or one computed from ``due``."""
+        value = task.get("due_epoch")
+        if isinstance(value, (int, float)):
+            return float(value)
+        return due_epoch(task.get("due"))
+
+    def _entry(self, task: Dict[str, Any]) -> Optional[Tuple[float, Any]]:
+        if task.get("completed"):
+            return None
+        value = self.epoch(task)
+        return None if value is None else (value, task.get("id"))
+
+    def rebuild(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        self.entries = sorted(e for e in map(self._entry, tasks) if e is not None)
+
+    def add(self, task: Dict[str, Any]) -> None:
+        entry = self._entry(task)
+        if entry is not None:
+            bisect.insort(self.entries, entry)
+
+    def discard(self, task: Dict[str, Any]) -> None:
+        entry = self._entry(task)
+        if entry is None:
+            return
+        i = bisect.bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+
+    def between(self, start: Optional[float], end: Optional[float]) -> List[Any]:
+        """Ids due in ``[start, end)`` in due order; None leaves a side open."""
+        lo = 0 if start is None else bisect.bisect_left(self.entries, (start,))
+        hi = len(self.entries) if end is None else bisect.bisect_left(self.entries, (end,))
+        return [rid for _value, rid in self.entries[lo:hi]]
+
+
+def tag_predicate(tags: Iterable[str], *, match_all: bool = False) -> Callable[[Dict[str, Any]], bool]:
+    """Return a per-record test equivalent to `TagIndex.lookup`.
+
+    Used where records are streamed and no index can be built.
+    """
+    wanted = {tg.lower() for tg in tags}
+
+    def matches(record: Dict[str, Any]) -> bool:
+        have = TagIndex._tags(record)
+        return wanted <= have if match_all else not wanted.isdisjoint(have)
+
+    return matches
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of 3-character windows of `text` (already lowercased)."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _note_grams(note: Dict[str, Any]) -> Set[str]:
+    return trigrams((note.get("title") or "").lower()) | trigrams((note.get("body") or "").lower())
+
+
+class TrigramIndex:
+    """Inverted index from trigram to the ids of notes containing it."""
+
+    def __init__(self, postings: Optional[Dict[str, Union[Set[Any], str, List[Any]]]] = None) -> None:
+        # Values are sets once decoded; encoded sidecar values are decoded lazily
+        self.postings: Dict[str, Union[Set[Any], str, List[Any]]] = postings or {}
+
+    def _ids(self, gram: str) -> Optional[Set[Any]]:
+        ids = self.postings.get(gram)
+        if ids is None or isinstance(ids, set):
+            return ids
+        decoded = set(ids.split(" ") if isinstance(ids, str) else ids)
+        self.postings[gram] = decoded
+        return decoded
+
+    def rebuild(self, notes: Iterable[Dict[str, Any]]) -> None:
+        # Appending to lists and converting once is much faster than set.add
+        lists: Dict[str, List[Any]] = defaultdict(list)
+        for n in notes:
+            nid = n.get("id")
+            for g in _note_grams(n):
+                lists[g].append(nid)
+        self.postings = {g: set(ids) for g, ids in lists.items()}
+
+    def add(self, note: Dict[str, Any]) -> None:
+        nid = note.get("id")
+        for g in _note_grams(note):
+            ids = self._ids(g)
+            if ids is None:
+                self.postings[g] = {nid}
+            else:
+                ids.add(nid)
+
+    def discard(self, note: Dict[str, Any]) -> None:
+        nid = note.get("id")
+        for g in _note_grams(note):
+            ids = self._ids(g)
+            if ids is not None:
+                ids.discard(nid)
+                if not ids:
+                    del self.postings[g]
+
+    def candidates(self, query: str) -> Optional[Set[Any]]:
+        """Return ids that may match lowercase `query`, or None if every note may.
+
+        Queries shorter than three characters carry no trigram and cannot be
+        narrowed.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return None
+        sets = sorted((self._ids(g) or set() for g in grams), key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": FORMAT_VERSION, "postings": {g: _encode(ids) for g, ids in self.postings.items()}}
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> Optional["TrigramIndex"]:
+        """Rebuild an index from `to_dict` output; None if the format differs."""
+        if raw.get("version") != FORMAT_VERSION or not isinstance(raw.get("postings"), dict):
+            return None
+        return cls(raw["postings"])
+
+
+def _encode(ids: Union[Set[Any], str, List[Any]]) -> Union[str, List[Any]]:
+    if isinstance(ids, str):
+        return ids
+    ids = list(ids)
+    if all(isinstance(i, str) and " " not in i for i in ids):
+        return " ".join(ids)
+    return ids
@@ -0,0 +1,121 @@
+"""Bounded multi-turn conversation state for `chat.chat_loop`.
+
+A `ChatSession` keeps the most recent exchanges verbatim plus a running
+summary of everything older. Once the estimated size of summary + turns
+grows past ``window`` tokens, the oldest turns are folded into the summary
+(by a caller-supplied summarizer, normally an API call in `chat.py`) until
+the history is back under half the window. Every request therefore carries
+at most about ``window`` tokens of history, however long the session runs.
+
+Sessions can be saved as JSON under ``<data dir>/sessions/<name>.json`` and
+resumed later with `load_session`.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from . import storage
+from .utils import estimate_tokens
+
+SESSION_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# Per-message overhead of the chat format
+MESSAGE_TOKENS = 4
+
+Turn = Dict[str, str]
+Summarizer = Callable[[str, List[Turn]], str]
+
+
+def _turn_tokens(turn: Turn) -> int:
+    return estimate_tokens(turn["user"]) + estimate_tokens(turn["assistant"]) + 2 * MESSAGE_TOKENS
+
+
+class ChatSession:
+    """Recent turns kept verbatim plus a rolling summary of older ones."""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        *,
+        window: int,
+        summary: str = "",
+        turns: Optional[List[Turn]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.system_prompt = system_prompt
+        self.window = window
+        self.summary = summary
+        self.turns: List[Turn] = list(turns or [])
+        self.name = name
+
+    def history_tokens(self) -> int:
+        """Estimated tokens of the summary and the verbatim turns."""
+        total = estimate_tokens(self.summary) + MESSAGE_TOKENS if self.summary else 0
+        return total + sum(_turn_tokens(t) for t in self.turns)
+
+    def messages(self, user_message: str) -> List[Dict[str, str]]:
+        """Return the request messages for the next `user_message`."""
+        msgs = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            msgs.append({"role": "system", "content": f"Summary of the conversation so far: {self.summary}"})
+        for t in self.turns:
+            msgs.append({"role": "user", "content": t["user"]})
+            msgs.append({"role": "assistant", "content": t["assistant"]})
+        msgs.append({"role": "user", "content": user_message})
+        return msgs
+
+    def record(self, user_message: str, reply: str, summarize: Summarizer) -> bool:
+        """Append a completed turn, folding old turns if over the window.
+
+        `summarize(previous_summary, turns)` must return the new summary.
+        Returns True if a fold happened.
+        """
+        self.turns.append({"user": user_message, "assistant": reply})
+        if self.history_tokens() <= self.window:
+            return False
+        # Fold the oldest turns until the history fits in half the window,
+        # always keeping the latest turn verbatim
+        target = self.window // 2
+        split = 0
+        remaining = self.history_tokens()
+        while split < len(self.turns) - 1 and remaining > target:
+            remaining -= _turn_tokens(self.turns[split])
+            split += 1
+        if split == 0:
+            return False
+        # Summarize first so a failed call leaves the session unchanged
+        self.summary = summarize(self.summary, self.turns[:split])
+        del self.turns[:split]
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary, "turns": self.turns}
+
+
+def session_path(name: str) -> Path:
+    """Return the file a session called `name` is saved to.
+
+    Raises ValueError for names that are not plain identifiers.
+    """
+    if not SESSION_NAME.match(name):
+        raise ValueError("session names may only contain letters, digits, '-' and '_'")
+    return storage.DATA_DIR / "sessions" / f"{name}.json"
+
+
+def load_session(name: str, system_prompt: str, *, window: int) -> ChatSession:
+    """Return the saved session `name`, or a new empty one."""
+    data = storage.load_json(session_path(name), "turns")
+    turns = [
+        {"user": str(t.get("user", "")), "assistant": str(t.get("assistant", ""))}
+        for t in data.get("turns") or []
+        if isinstance(t, dict)
+    ]
+    return ChatSession(system_prompt, window=window, summary=str(data.get("summary") or ""), turns=turns, name=name)
+
+
+def save_session(session: ChatSession) -> None:
+    """Persist a named session (unnamed sessions are not saved)."""
+    if session.name:
+        storage.save_json(session_path(session.name), session.to_dict())
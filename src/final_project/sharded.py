@@ -0,0 +1,300 @@
+"""Month-sharded task storage for final_project.
+
+Selected with ``FINAL_PROJECT_BACKEND=sharded`` (see `storage.py`). Tasks are
+split by the month of their ``created_at`` into ``<data dir>/tasks/YYYY-MM.json``
+(``undated.json`` for tasks without one). ``manifest.json`` keeps one small
+entry per shard: its counts, the due-date range of its pending tasks and the
+range of its numeric ids. It does not list the tasks themselves, so its size
+grows with the number of months, not of tasks, and:
+
+- saving a mutation rewrites only the shards it touches plus the manifest;
+- loading specific ids reads only the shards whose id range holds them
+  (ids follow creation order, so that is usually one shard);
+- `query` skips shards without matching tasks (e.g. months where everything
+  is done when listing pending tasks), and `due_between` skips shards whose
+  due range lies outside the requested window.
+
+Notes stay in the plain JSON files. Writers hold the manifest's commit lock
+(`storage.commit_lock`) while they read and rewrite shards, so each save
+applies to the current shard contents; new tasks whose ids another process
+already allocated are renumbered, as in the JSON backend.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import tasks
+from .search import DueIndex
+from .storage import LOADED_KEY, ConflictError, JsonBackend, StorageError, commit_json, commit_lock, load_json
+
+UNDATED = "undated"
+_MONTH = re.compile(r"^(\d{4})-(\d{2})")
+
+
+def shard_of(task: Dict[str, Any]) -> str:
+    """Return the shard name (``YYYY-MM`` of ``created_at``) for `task`."""
+    m = _MONTH.match(str(task.get("created_at") or ""))
+    return f"{m.group(1)}-{m.group(2)}" if m else UNDATED
+
+
+def _numeric(rid: Any) -> Optional[int]:
+    return int(rid) if isinstance(rid, str) and rid.isdigit() else None
+
+
+def _shard_stats(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    pending = [t for t in records if not t.get("completed")]
+    dues = [e for e in map(DueIndex.epoch, pending) if e is not None]
+    nums = [n for n in (_numeric(t.get("id")) for t in records) if n is not None]
+    return {
+        "count": len(records),
+        "pending": len(pending),
+        "due_min": min(dues, default=None),
+        "due_max": max(dues, default=None),
+        "id_min": min(nums, default=None),
+        "id_max": max(nums, default=None),
+        # Holds ids that are not numbers, so lookups of those must read it
+        "named": len(nums) < len(records),
+    }
+
+
+def _is_new(rid: Any, base_next_id: Optional[int]) -> Optional[bool]:
+    # Ids at or past the counter the data was loaded with were allocated
+    # since; without that counter only the shards can tell (None)
+    if isinstance(base_next_id, int) and _numeric(rid) is not None:
+        return int(rid) >= base_next_id
+    return None
+
+
+class ShardedBackend:
+    """Tasks in one JSON file per creation month; notes via `JsonBackend`."""
+
+    name = "sharded"
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.notes = JsonBackend()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / "manifest.json"
+
+    def shard_path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _manifest(self) -> Dict[str, Any]:
+        raw = load_json(self.manifest_path, "shards")
+        shards = raw.get("shards") if isinstance(raw.get("shards"), dict) else {}
+        next_id = raw.get("next_id")
+        if not isinstance(next_id, int):
+            next_id = max((st.get("id_max") or 0 for st in shards.values()), default=0) + 1
+        version = raw.get("version")
+        return {"version": version if isinstance(version, int) else 0, "next_id": next_id, "shards": shards}
+
+    def _read_shard(self, name: str) -> List[Dict[str, Any]]:
+        return [t for t in load_json(self.shard_path(name), "tasks").get("tasks") or [] if isinstance(t, dict)]
+
+    def _write_shard(self, manifest: Dict[str, Any], name: str, records: List[Dict[str, Any]]) -> None:
+        if records:
+            commit_json(self.shard_path(name), {"tasks": records})
+            manifest["shards"][name] = _shard_stats(records)
+        else:
+            self.shard_path(name).unlink(missing_ok=True)
+            manifest["shards"].pop(name, None)
+
+    @staticmethod
+    def _ordered(manifest: Dict[str, Any]) -> List[str]:
+        # Undated (legacy) tasks first, then months in creation order
+        return sorted(manifest["shards"], key=lambda name: (name != UNDATED, name))
+
+    @staticmethod
+    def _candidates(manifest: Dict[str, Any], rid: Any) -> List[str]:
+        """Shards that may hold the task `rid`, judged from their id ranges."""
+        num = _numeric(rid)
+        out = []
+        for name, stats in manifest["shards"].items():
+            if "id_min" not in stats:
+                # Written before id ranges were tracked
+                out.append(name)
+            elif num is None:
+                if stats.get("named"):
+                    out.append(name)
+            elif stats["id_min"] is not None and stats["id_min"] <= num <= stats["id_max"]:
+                out.append(name)
+        return out
+
+    def load(self, kind: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return ``{kind: [...], "next_id": int}``.
+
+        With `ids`, only the shards holding those tasks are read and only
+        those tasks returned (an empty list reads none).
+        """
+        if kind != "tasks":
+            return self.notes.load(kind, ids)
+        manifest = self._manifest()
+        if ids is None:
+            records = [t for name in self._ordered(manifest) for t in self._read_shard(name)]
+        else:
+            wanted = set(ids)
+            names = {name for rid in wanted for name in self._candidates(manifest, rid)}
+            records = [
+                t for name in self._ordered(manifest) if name in names for t in self._read_shard(name) if t.get("id") in wanted
+            ]
+        return {
+            "tasks": records,
+            "next_id": manifest["next_id"],
+            LOADED_KEY: {"version": manifest["version"], "next_id": manifest["next_id"], "partial": ids is not None},
+        }
+
+    def query(
+        self,
+        kind: str,
+        *,
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return filtered tasks, reading only shards that can contain matches."""
+        if kind != "tasks":
+            return self.notes.query(kind, status=status, tags=tags, match_all=match_all)
+        keep = tasks.task_filter(status=status, tags=tags, match_all=match_all)
+        manifest = self._manifest()
+        out: List[Dict[str, Any]] = []
+        for name in self._ordered(manifest):
+            stats = manifest["shards"][name]
+            if status == "pending" and stats.get("pending") == 0:
+                continue
+            if status == "completed" and stats.get("pending") == stats.get("count"):
+                continue
+            out.extend(self._read_shard(name) if keep is None else filter(keep, self._read_shard(name)))
+        return out
+
+    def stamp(self, kind: str) -> Any:
+        if kind != "tasks":
+            return self.notes.stamp(kind)
+        return self._manifest()["version"]
+
+    def due_between(self, start: Optional[float], end: Optional[float]) -> List[Dict[str, Any]]:
+        """Pending tasks due in ``[start, end)``, soonest first, like `tasks.due_between`."""
+        manifest = self._manifest()
+        found = []
+        for name in self._ordered(manifest):
+            stats = manifest["shards"][name]
+            lo, hi = stats.get("due_min"), stats.get("due_max")
+            if lo is None or (end is not None and lo >= end) or (start is not None and hi < start):
+                continue
+            for t in self._read_shard(name):
+                value = None if t.get("completed") else DueIndex.epoch(t)
+                if value is not None and (start is None or value >= start) and (end is None or value < end):
+                    found.append((value, t.get("id"), t))
+        found.sort(key=lambda entry: entry[:2])
+        return [t for _value, _rid, t in found]
+
+    def save(
+        self,
+        kind: str,
+        data: Dict[str, Any],
+        changed: Optional[Iterable[Dict[str, Any]]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Persist `data`; with `changed`/`removed` hints only their shards are rewritten.
+
+        A full save needs the complete, current task list: it raises
+        `StorageError` for data from ``load(ids=...)`` and `ConflictError`
+        if another process saved since `data` was loaded.
+        """
+        if kind != "tasks":
+            self.notes.save(kind, data, changed, removed)
+            return
+        loaded = data.get(LOADED_KEY) if isinstance(data.get(LOADED_KEY), dict) else None
+        with commit_lock(self.manifest_path):
+            manifest = self._manifest()
+            if changed is None and removed is None:
+                if loaded is not None and loaded.get("partial"):
+                    raise StorageError("a partially loaded task list can only be saved with changed/removed")
+                if loaded is not None and loaded.get("version") != manifest["version"]:
+                    raise ConflictError(f"{self.directory} was changed by another process since it was loaded; reload and retry")
+                self._replace_all(manifest, list(data.get("tasks") or []))
+            else:
+                self._apply(manifest, list(changed or []), list(removed or []), loaded)
+            manifest["next_id"] = max(manifest["next_id"], data.get("next_id") or 0)
+            manifest["version"] += 1
+            commit_json(self.manifest_path, {"next_id": manifest["next_id"], "shards": manifest["shards"]}, version=manifest["version"])
+        data["next_id"] = manifest["next_id"]
+        data[LOADED_KEY] = {
+            "version": manifest["version"],
+            "next_id": manifest["next_id"],
+            "partial": bool(loaded and loaded.get("partial")),
+        }
+
+    def _replace_all(self, manifest: Dict[str, Any], records: List[Dict[str, Any]]) -> None:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for t in records:
+            groups.setdefault(shard_of(t), []).append(t)
+        for name in set(manifest["shards"]) - set(groups):
+            self._write_shard(manifest, name, [])
+        for name, group in groups.items():
+            self._write_shard(manifest, name, group)
+        manifest["next_id"] = max(
+            [manifest["next_id"]] + [st["id_max"] + 1 for st in manifest["shards"].values() if st.get("id_max") is not None]
+        )
+
+    def _apply(
+        self,
+        manifest: Dict[str, Any],
+        changed: List[Dict[str, Any]],
+        removed: List[Any],
+        loaded: Optional[Dict[str, Any]],
+    ) -> None:
+        """Apply one mutation to the current shards (see `storage._merge` for the rules)."""
+        base = loaded.get("next_id") if loaded else None
+        # Shards read so far: name -> (records, {id: position}); removed
+        # records are set to None until the shard is written
+        read: Dict[str, Any] = {}
+        touched = set()
+
+        def shard(name: str) -> Any:
+            if name not in read:
+                records = self._read_shard(name) if name in manifest["shards"] else []
+                read[name] = (records, {t.get("id"): i for i, t in enumerate(records)})
+            return read[name]
+
+        def find(rid: Any) -> Optional[str]:
+            for name in self._candidates(manifest, rid):
+                if rid in shard(name)[1]:
+                    return name
+            return None
+
+        for rid in removed:
+            if _is_new(rid, base):
+                continue
+            name = find(rid)
+            if name is not None:
+                records, pos = shard(name)
+                records[pos.pop(rid)] = None
+                touched.add(name)
+        for rec in changed:
+            rid = rec.get("id")
+            new = _is_new(rid, base)
+            name = None if new else find(rid)
+            if new is False or name is not None:
+                if name is not None:
+                    records, pos = shard(name)
+                    records[pos[rid]] = rec
+                    touched.add(name)
+                # otherwise another process deleted it; its delete wins
+                continue
+            if _numeric(rid) is not None:
+                if base is not None and int(rid) < manifest["next_id"]:
+                    rid = rec["id"] = str(manifest["next_id"])
+                manifest["next_id"] = max(manifest["next_id"], int(rid) + 1)
+            name = shard_of(rec)
+            records, pos = shard(name)
+            pos[rid] = len(records)
+            records.append(rec)
+            touched.add(name)
+
+        for name in touched:
+            self._write_shard(manifest, name, [t for t in read[name][0] if t is not None])
@@ -0,0 +1,142 @@
+"""Interactive shell for final_project (``python -m final_project shell``).
+
+The shell parses each line with the normal CLI grammar (``task add "x"``,
+``note search foo``, ...) and dispatches it in-process against a
+`workspace.MemoryWorkspace`, so tasks and notes are loaded once and every
+command after the first runs without re-importing, re-parsing files or
+rewriting them.
+
+Changes are written behind: a background thread flushes dirty collections
+every ``flush_interval`` seconds, and the shell flushes again on ``exit``,
+end of input, ``SIGTERM``/``SIGHUP``, or an explicit ``flush`` command. A
+lock keeps the flusher from saving while a command is half-applied.
+"""
+
+from __future__ import annotations
+
+import argparse
+import signal
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+from . import storage
+from .cli import EXIT_OK, EXIT_STORAGE_ERROR, run_line
+from .workspace import MemoryWorkspace
+
+try:
+    # Imported only for its side effect: once loaded, input() gets line
+    # editing and history. Nothing here uses the module itself.
+    import readline  # noqa: F401
+except ImportError:  # pragma: no cover - e.g. Windows without pyreadline
+    pass
+else:
+    # Drop the name so pyflakes (which ignores noqa) sees it used
+    del readline
+
+PROMPT = "fp> "
+# Commands that would nest sessions or block the prompt
+_NOT_IN_SHELL = {("batch", None), ("shell", None)}
+
+
+class _Flusher(threading.Thread):
+    """Daemon thread that flushes `ws` every `interval` seconds while dirty."""
+
+    def __init__(self, ws: MemoryWorkspace, lock: threading.Lock, interval: float) -> None:
+        super().__init__(name="final_project-flusher", daemon=True)
+        self.ws = ws
+        self.lock = lock
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                if not self.ws.dirty:
+                    continue
+                try:
+                    self.ws.flush()
+                except storage.StorageError as exc:
+                    # Keep the changes pending; the next tick or exit retries
+                    print(f"\nStorage error during background save: {exc}", file=sys.stderr)
+
+
+def _flush(ws: MemoryWorkspace, lock: threading.Lock) -> bool:
+    with lock:
+        try:
+            ws.flush()
+            return True
+        except storage.StorageError as exc:
+            print(f"Storage error: {exc}")
+            return False
+
+
+def run_shell(
+    parser: argparse.ArgumentParser,
+    *,
+    flush_interval: float = 2.0,
+    show_timing: bool = False,
+    input_fn: Callable[[str], str] = input,
+    handle_signals: bool = True,
+) -> int:
+    """Run the interactive prompt until ``exit``/EOF; return an exit code.
+
+    `flush_interval` <= 0 disables background saves (changes are still
+    written on ``flush`` and on exit).
+    """
+    ws = MemoryWorkspace(search_index=True)
+    lock = threading.Lock()
+    flusher: Optional[_Flusher] = None
+    if flush_interval > 0:
+        flusher = _Flusher(ws, lock, flush_interval)
+        flusher.start()
+
+    previous: List[tuple] = []
+    if handle_signals:
+
+        def _terminate(signum, _frame):
+            # Unwind through the finally below, which flushes
+            raise SystemExit(128 + signum)
+
+        for name in ("SIGTERM", "SIGHUP"):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                previous.append((signum, signal.signal(signum, _terminate)))
+
+    print("final_project shell. Commands as on the command line; 'flush' saves, 'exit' quits.")
+    try:
+        while True:
+            try:
+                line = input_fn(PROMPT).strip()
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+            if not line or line.startswith("#"):
+                continue
+            if line in {"exit", "quit"}:
+                break
+            if line in {"flush", "save"}:
+                if _flush(ws, lock):
+                    print("Saved.")
+                continue
+
+            start = time.perf_counter()
+            with lock:
+                try:
+                    run_line(parser, line, ws, not_allowed=_NOT_IN_SHELL)
+                except KeyboardInterrupt:
+                    print("(interrupted)")
+            if show_timing:
+                print(f"({(time.perf_counter() - start) * 1000:.2f} ms)")
+    finally:
+        if flusher is not None:
+            flusher.stopped.set()
+            flusher.join()
+        for signum, handler in previous:
+            signal.signal(signum, handler)
+        saved = _flush(ws, lock)
+    return EXIT_OK if saved else EXIT_STORAGE_ERROR
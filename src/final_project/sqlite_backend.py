@@ -0,0 +1,296 @@
+"""SQLite storage backend for final_project.
+
+Selected with ``FINAL_PROJECT_BACKEND=sqlite`` (see `storage.py`). Records are
+kept one row per task/note in a single database file under the data
+directory, so single-record operations upsert or delete one row instead of
+rewriting every record. Only the standard library `sqlite3` module is used.
+
+Each row stores the full record as JSON in ``doc`` plus the columns needed for
+filtering (``completed``, ``due``) and a ``seq`` that preserves creation
+order. Tags live in a side table so tag filters can use an index. The
+database runs in WAL mode, so readers do not block the writer. ``meta`` keeps
+a per-collection ``version`` bumped by every save (see `stamp`).
+
+Writers serialize on ``BEGIN IMMEDIATE`` and apply the same rules as the JSON
+backend (`storage._merge`): ``load`` records the version and ``next_id`` it
+read under ``storage.LOADED_KEY``, and a save re-reads both inside its
+transaction. New records whose id another process took meanwhile get the
+next free one, updates to records deleted meanwhile are dropped, and a full
+save of stale (or partially loaded) data is refused with `ConflictError` /
+`StorageError` instead of overwriting the other writer.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from . import storage
+from .storage import LOADED_KEY, ConflictError, StorageError, _is_new
+from .utils import next_numeric_id
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+COLLECTIONS = ("tasks", "notes")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    collection TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS {c} (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    completed INTEGER NOT NULL DEFAULT 0,
+    due TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {c}_completed ON {c} (completed);
+CREATE INDEX IF NOT EXISTS {c}_due ON {c} (due);
+CREATE TABLE IF NOT EXISTS {c}_tags (
+    id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (id, tag)
+);
+CREATE INDEX IF NOT EXISTS {c}_tags_tag ON {c}_tags (tag);
+"""
+
+
+def _storage_errors(fn: F) -> F:
+    """Re-raise `sqlite3.Error` as `StorageError` so the CLI reports it."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return fn(*args, **kwargs)
+        except sqlite3.Error as exc:
+            raise StorageError(f"SQLite error: {exc}") from exc
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _check(kind: str) -> str:
+    if kind not in COLLECTIONS:
+        raise ValueError(f"unknown collection {kind!r}")
+    return kind
+
+
+class SQLiteBackend:
+    """Per-record storage of tasks and notes in one SQLite database."""
+
+    name = "sqlite"
+
+    @_storage_errors
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are managed explicitly (see `_write`); other writers
+        # are waited for up to the storage lock timeout
+        self.conn = sqlite3.connect(str(self.path), timeout=storage.LOCK_TIMEOUT, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self._write():
+            for c in COLLECTIONS:
+                for statement in _SCHEMA.format(c=c).split(";"):
+                    if statement.strip():
+                        self.conn.execute(statement)
+            # Databases created before the version column
+            if "version" not in {row[1] for row in self.conn.execute("PRAGMA table_info(meta)")}:
+                self.conn.execute("ALTER TABLE meta ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """Run the block in a write transaction, taking the write lock up front."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # -- reads ------------------------------------------------------------------
+
+    def _meta(self, kind: str) -> Tuple[int, int]:
+        """Return ``(next_id, version)`` of `kind`."""
+        row = self.conn.execute("SELECT next_id, version FROM meta WHERE collection = ?", (kind,)).fetchone()
+        return (row[0], row[1]) if row else (1, 0)
+
+    @_storage_errors
+    def stamp(self, kind: str) -> int:
+        """Return the collection's version, which every save increments."""
+        _check(kind)
+        row = self.conn.execute("SELECT version FROM meta WHERE collection = ?", (kind,)).fetchone()
+        return row[0] if row else 0
+
+    @_storage_errors
+    def load(self, kind: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return ``{kind: [...], "next_id": int}``.
+
+        With `ids`, only those records are fetched (an empty list fetches none,
+        which is enough to create a new record).
+        """
+        _check(kind)
+        # One read transaction, so the records and counters agree
+        self.conn.execute("BEGIN")
+        try:
+            next_id, version = self._meta(kind)
+            if ids is None:
+                rows = self.conn.execute(f"SELECT doc FROM {kind} ORDER BY seq").fetchall()
+            else:
+                ids = list(ids)
+                marks = ",".join("?" * len(ids))
+                sql = f"SELECT doc FROM {kind} WHERE id IN ({marks}) ORDER BY seq"
+                rows = self.conn.execute(sql, ids).fetchall() if ids else []
+        finally:
+            self.conn.execute("COMMIT")
+        return {
+            kind: [json.loads(r[0]) for r in rows],
+            "next_id": next_id,
+            LOADED_KEY: {"version": version, "next_id": next_id, "partial": ids is not None},
+        }
+
+    @_storage_errors
+    def query(
+        self,
+        kind: str,
+        *,
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Return records filtered by completion `status` and `tags` in SQL."""
+        _check(kind)
+        where: List[str] = []
+        params: List[Any] = []
+        if status == "pending":
+            where.append("completed = 0")
+        elif status == "completed":
+            where.append("completed = 1")
+        elif status not in (None, "all"):
+            raise ValueError("status must be one of 'all', 'pending', 'completed'")
+        wanted = sorted({tg.lower() for tg in tags or [] if tg})
+        if wanted:
+            marks = ",".join("?" * len(wanted))
+            sub = f"SELECT id FROM {kind}_tags WHERE tag IN ({marks})"
+            if match_all:
+                sub += f" GROUP BY id HAVING COUNT(*) = {len(wanted)}"
+            where.append(f"id IN ({sub})")
+            params.extend(wanted)
+        sql = f"SELECT doc FROM {kind}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.conn.execute(sql + " ORDER BY seq", params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    # -- writes -----------------------------------------------------------------
+
+    def _insert(self, kind: str, rec: Dict[str, Any]) -> None:
+        # A plain INSERT: an id collision raises instead of overwriting
+        self.conn.execute(
+            f"INSERT INTO {kind} (id, completed, due, doc) VALUES (?, ?, ?, ?)",
+            (rec.get("id"), 1 if rec.get("completed") else 0, rec.get("due"), json.dumps(rec, ensure_ascii=False)),
+        )
+        self._write_tags(kind, rec)
+
+    def _update(self, kind: str, rec: Dict[str, Any]) -> bool:
+        """Replace the stored record with `rec`'s id; return False if there is none."""
+        cur = self.conn.execute(
+            f"UPDATE {kind} SET completed = ?, due = ?, doc = ? WHERE id = ?",
+            (1 if rec.get("completed") else 0, rec.get("due"), json.dumps(rec, ensure_ascii=False), rec.get("id")),
+        )
+        if not cur.rowcount:
+            return False
+        self._write_tags(kind, rec)
+        return True
+
+    def _write_tags(self, kind: str, rec: Dict[str, Any]) -> None:
+        rid = rec.get("id")
+        self.conn.execute(f"DELETE FROM {kind}_tags WHERE id = ?", (rid,))
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO {kind}_tags (id, tag) VALUES (?, ?)",
+            [(rid, (tg or "").lower()) for tg in rec.get("tags") or []],
+        )
+
+    def _delete(self, kind: str, ids: Iterable[str]) -> None:
+        for rid in ids:
+            self.conn.execute(f"DELETE FROM {kind} WHERE id = ?", (rid,))
+            self.conn.execute(f"DELETE FROM {kind}_tags WHERE id = ?", (rid,))
+
+    def _apply(
+        self, kind: str, changed: List[Dict[str, Any]], removed: List[Any], base: Optional[int], next_id: int
+    ) -> int:
+        """Apply one mutation to the current rows (see `storage._merge`); return the new next_id."""
+        self._delete(kind, [rid for rid in removed if not _is_new(rid, base)])
+        for rec in changed:
+            rid = rec.get("id")
+            numeric = isinstance(rid, str) and rid.isdigit()
+            if _is_new(rid, base):
+                if int(rid) < next_id:
+                    rid = rec["id"] = str(next_id)
+                self._insert(kind, rec)
+            elif self._update(kind, rec):
+                continue
+            elif base is None or not numeric:
+                # Without a load marker a missing record is a new one
+                self._insert(kind, rec)
+            else:
+                # Another process deleted it; its delete wins
+                continue
+            if numeric:
+                next_id = max(next_id, int(rid) + 1)
+        return next_id
+
+    @_storage_errors
+    def save(
+        self,
+        kind: str,
+        data: Dict[str, Any],
+        changed: Optional[Iterable[Dict[str, Any]]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Persist `data`; with `changed`/`removed` hints only those rows are touched.
+
+        A full save needs the complete, current records: it raises
+        `StorageError` for data from ``load(ids=...)`` and `ConflictError` if
+        another process saved since `data` was loaded.
+        """
+        _check(kind)
+        loaded = data.get(LOADED_KEY) if isinstance(data.get(LOADED_KEY), dict) else None
+        with self._write():
+            next_id, version = self._meta(kind)
+            stale = loaded is not None and loaded.get("version") != version
+            if changed is None and removed is None:
+                if loaded is not None and loaded.get("partial"):
+                    raise StorageError(f"partially loaded {kind} can only be saved with changed/removed")
+                if stale:
+                    raise ConflictError(f"{self.path} was changed by another process since it was loaded; reload and retry")
+                records = list(data.get(kind) or [])
+                self.conn.execute(f"DELETE FROM {kind}")
+                self.conn.execute(f"DELETE FROM {kind}_tags")
+                for rec in records:
+                    self._insert(kind, rec)
+                next_id = max(next_id, next_numeric_id(records))
+            else:
+                base = loaded.get("next_id") if loaded else None
+                next_id = self._apply(kind, list(changed or []), list(removed or []), base, next_id)
+            if isinstance(data.get("next_id"), int):
+                next_id = max(next_id, data["next_id"])
+            self.conn.execute(
+                "INSERT INTO meta (collection, next_id, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET next_id = excluded.next_id, version = meta.version + 1",
+                (kind, next_id),
+            )
+        data["next_id"] = next_id
+        # After merging into newer rows, `data` no longer holds everything
+        # that is stored, so only hinted saves may follow
+        partial = bool(loaded and loaded.get("partial")) or stale
+        data[LOADED_KEY] = {"version": version + 1, "next_id": next_id, "partial": partial}
@@ -1,25 +1,89 @@
 """JSON storage helpers for final_project.
 
 This module manages JSON persistence under the `final_project/data/` folder.
-All functions use the standard library only and perform atomic writes where
-appropriate.
+All functions perform atomic writes where appropriate; `orjson` is used for
+encoding when it is installed.
+
+`load_tasks`/`save_tasks`/`load_notes`/`save_notes` go through a pluggable
+backend chosen with ``FINAL_PROJECT_BACKEND``: ``json`` (default, the files
+below), ``sqlite`` (one row per record in ``final_project.db``, see
+`sqlite_backend.py`) or ``sharded`` (tasks split into one file per creation
+month under ``tasks/``, see `sharded.py`). `migrate_to_sqlite` and
+`migrate_to_sharded` copy the JSON files over.
+
+Journal mode (``FINAL_PROJECT_JOURNAL=1``): single-record mutations are
+appended as one compact JSON line to ``<file>.log`` next to the snapshot
+instead of rewriting the whole file. ``load_json`` replays the log over the
+snapshot, and the log is folded back into the snapshot once it grows past
+``JOURNAL_COMPACT_BYTES``.
+
+Snapshots are written by `codec.py` in ``FINAL_PROJECT_STORAGE_FORMAT``:
+``compact`` JSON (default), ``pretty`` (indented) or ``gzip``. Loading detects
+the format from the file header, so switching formats needs no migration.
+
+The notes trigram search index is cached in ``notes.json.tri``; it records
+the backend's stamp of the notes it was built from (size and mtime of the
+JSON files, or the SQLite change counter) and is ignored once that changes.
+It is opt-in (``FINAL_PROJECT_SEARCH_INDEX=1``).
+
+Several processes may share a data directory. Writers take an advisory
+``fcntl`` lock on ``<file>.lock`` only while committing (backup, replace or
+journal append); readers never lock, since snapshots are swapped in with
+``os.replace``. Collection files carry a ``version`` counter, and a save from
+a mapping loaded at an older version merges its changes into the current
+file instead of overwriting it (see `_save_collection`).
 """
 
+from contextlib import contextmanager
 from pathlib import Path
 import json
 import os
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:  # advisory file locks; not available on Windows
+    import fcntl
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None
+
+from . import codec
+from .search import TrigramIndex
+from .utils import next_numeric_id
 
 # Data directory: <repo-root>/final_project/data
 DATA_DIR = Path(__file__).resolve().parents[2] / "final_project" / "data"
 TASKS_FILE = DATA_DIR / "tasks.json"
 NOTES_FILE = DATA_DIR / "notes.json"
+DB_FILE = DATA_DIR / "final_project.db"
+
+# Storage backend: "json" or "sqlite"
+BACKEND = os.getenv("FINAL_PROJECT_BACKEND", "json").lower()
+
+# Journal settings, read from the environment once at import. Functions look
+# these module attributes up when called, so tests override them by assignment.
+JOURNAL_MODE = os.getenv("FINAL_PROJECT_JOURNAL", "").lower() in {"1", "true", "yes", "on"}
+JOURNAL_COMPACT_BYTES = int(os.getenv("FINAL_PROJECT_JOURNAL_COMPACT_BYTES", str(1024 * 1024)))
+SEARCH_INDEX = os.getenv("FINAL_PROJECT_SEARCH_INDEX", "").lower() in {"1", "true", "yes", "on"}
+# Snapshot format for save_json: "compact", "pretty" or "gzip"
+STORAGE_FORMAT = os.getenv("FINAL_PROJECT_STORAGE_FORMAT", "compact").lower()
+# Seconds a writer waits for another process to finish committing
+LOCK_TIMEOUT = float(os.getenv("FINAL_PROJECT_LOCK_TIMEOUT", "10"))
+LOCK_POLL_SECONDS = 0.01
+
+# Version counter written as the first key of collection files
+VERSION_KEY = "version"
+# Set by JsonBackend.load: the file state a mapping was loaded from
+LOADED_KEY = "_loaded"
 
 
 class StorageError(RuntimeError):
     """Raised for fatal storage errors."""
 
 
+class ConflictError(StorageError):
+    """Raised when a full save would overwrite another process's changes."""
+
+
 def ensure_data_dir() -> Path:
     """Ensure the data directory exists and return its Path.
 
@@ -33,7 +97,65 @@ def ensure_data_dir() -> Path:
 
 
 def _read_json_text(p: Path) -> Any:
-    return json.loads(p.read_text(encoding="utf-8"))
+    # Any codec format; the header tells them apart
+    return codec.decode(p.read_bytes())
+
+
+def journal_path(path: Path) -> Path:
+    """Return the journal file that belongs to the snapshot at `path`."""
+    p = Path(path)
+    return p.with_suffix(p.suffix + ".log")
+
+
+def _replay_journal(path: Path, data: Dict[str, Any], root_key: str) -> Dict[str, Any]:
+    """Apply the operations logged next to `path` on top of `data`.
+
+    Operations are idempotent (``put`` replaces by id, ``del`` ignores missing
+    ids), so replaying a log that was already folded into the snapshot is
+    harmless. A torn trailing line from an interrupted append is skipped.
+    """
+    log = journal_path(path)
+    if not log.exists():
+        return data
+
+    records = list(data.get(root_key) or [])
+    pos = {r.get("id"): i for i, r in enumerate(records)}
+    next_id = data.get("next_id")
+    if not isinstance(next_id, int):
+        next_id = next_numeric_id(records)
+    removed = False
+    written = []
+    with log.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                op = json.loads(line)
+            except ValueError:
+                print(f"Warning: skipping corrupt journal entry in {log}")
+                continue
+            kind = op.get("op")
+            if kind == "put":
+                rec = op.get("record") or {}
+                written.append(rec)
+                i = pos.get(rec.get("id"))
+                if i is None:
+                    pos[rec.get("id")] = len(records)
+                    records.append(rec)
+                else:
+                    records[i] = rec
+            elif kind == "del":
+                i = pos.pop(op.get("id"), None)
+                if i is not None:
+                    records[i] = None
+                    removed = True
+
+    data[root_key] = [r for r in records if r is not None] if removed else records
+    # Records created since the last snapshot advance the counter, even if
+    # they were removed again before compaction
+    data["next_id"] = max(next_id, next_numeric_id(written))
+    return data
 
 
 def load_json(path: Path, root_key: str) -> Dict[str, Any]:
@@ -41,8 +163,13 @@ def load_json(path: Path, root_key: str) -> Dict[str, Any]:
 
     If the file does not exist, returns `{root_key: []}`. If the JSON is
     invalid, attempts to load a `.bak` backup file and prints a warning. If
-    that also fails, returns `{root_key: []}`.
+    that also fails, returns `{root_key: []}`. Any journal entries logged
+    next to `path` are replayed on top of the result.
     """
+    return _replay_journal(path, _load_snapshot(path, root_key), root_key)
+
+
+def _load_snapshot(path: Path, root_key: str) -> Dict[str, Any]:
     p = Path(path)
     if not p.exists():
         return {root_key: []}
@@ -71,31 +198,215 @@ def load_json(path: Path, root_key: str) -> Dict[str, Any]:
         return {root_key: []}
 
 
-def save_json(path: Path, data: Dict[str, Any]) -> None:
+def _journal_overlay(path: Path) -> Optional[tuple]:
+    """Summarize the journal of `path` for `iter_records`.
+
+    Returns ``(latest, dropped, appended)``: the last ``put`` record per id,
+    the ids whose snapshot record was deleted, and the ids that end up
+    appended after the snapshot records, in replay order. None without a
+    journal.
+    """
+    log = journal_path(path)
+    if not log.exists():
+        return None
+    latest: Dict[Any, Dict[str, Any]] = {}
+    first_put: Dict[Any, int] = {}
+    last_del: Dict[Any, int] = {}
+    with log.open("r", encoding="utf-8") as fh:
+        for n, line in enumerate(fh):
+            try:
+                op = json.loads(line) if line.strip() else {}
+            except ValueError:
+                continue
+            if op.get("op") == "put":
+                rec = op.get("record") or {}
+                rid = rec.get("id")
+                latest[rid] = rec
+                # Replay appends an id on its first put after its last delete
+                if rid not in first_put or first_put[rid] < last_del.get(rid, -1):
+                    first_put[rid] = n
+            elif op.get("op") == "del":
+                last_del[op.get("id")] = n
+                latest.pop(op.get("id"), None)
+    # Deleted ids that were put again, and ids new to the snapshot, are
+    # appended; iter_records skips the latter if the snapshot has them
+    appended = sorted(latest, key=lambda rid: first_put[rid])
+    return latest, set(last_del), appended
+
+
+def iter_records(
+    path: Path, root_key: str, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield the records of `path` one at a time, filtered by `predicate`.
+
+    Records are parsed incrementally (see `codec.iter_array`), so memory use
+    does not grow with the file. The result matches ``load_json(path,
+    root_key)[root_key]`` including any journal. If the snapshot cannot be
+    parsed before the first record, this falls back to `load_json` (and its
+    ``.bak`` recovery); corruption found later raises `StorageError`.
+    """
+    p = Path(path)
+    overlay = _journal_overlay(p)
+    latest, dropped, appended = overlay or ({}, set(), [])
+    seen = set()
+
+    def records() -> Iterator[Dict[str, Any]]:
+        if not p.exists():
+            return
+        started = False
+        try:
+            with codec.open_text(p) as fh:
+                for rec in codec.iter_array(fh, root_key):
+                    started = True
+                    yield rec
+        except (OSError, ValueError, EOFError) as exc:
+            if started:
+                raise StorageError(f"Failed to read {p}") from exc
+            yield from _load_snapshot(p, root_key).get(root_key) or []
+
+    for rec in records():
+        if not isinstance(rec, dict):
+            continue
+        if overlay is not None:
+            # Only journaled ids need tracking, so memory stays flat
+            rid = rec.get("id")
+            if rid in dropped:
+                continue
+            if rid in latest:
+                seen.add(rid)
+                rec = latest[rid]
+        if predicate is None or predicate(rec):
+            yield rec
+    for rid in appended:
+        if rid in seen:
+            continue
+        rec = latest[rid]
+        if predicate is None or predicate(rec):
+            yield rec
+
+
+def lock_path(path: Path) -> Path:
+    """Return the file whose advisory lock guards commits to `path`."""
+    p = Path(path)
+    return p.with_suffix(p.suffix + ".lock")
+
+
+@contextmanager
+def commit_lock(path: Path) -> Iterator[None]:
+    """Hold the exclusive write lock of `path` for the duration of the block.
+
+    Polls for up to ``LOCK_TIMEOUT`` seconds, then raises `StorageError`.
+    The lock is not reentrant. Without ``fcntl`` (Windows) this does nothing.
+    """
+    if fcntl is None:
+        yield
+        return
+    lp = lock_path(path)
+    lp.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lp), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise StorageError(f"Timed out waiting for the write lock on {path}")
+                time.sleep(LOCK_POLL_SECONDS)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def _encode(data: Dict[str, Any], version: Optional[int] = None) -> bytes:
+    if version is not None or LOADED_KEY in data:
+        # The version goes first so _disk_version finds it without parsing
+        # the records
+        doc: Dict[str, Any] = {VERSION_KEY: version} if version is not None else {}
+        doc.update((k, v) for k, v in data.items() if k not in (VERSION_KEY, LOADED_KEY))
+        data = doc
+    try:
+        return codec.encode(data, STORAGE_FORMAT)
+    except ValueError as exc:
+        raise StorageError(str(exc)) from exc
+
+
+def _disk_version(path: Path) -> int:
+    """Return the version counter of the snapshot at `path` (0 if none)."""
+    try:
+        with codec.open_text(Path(path)) as fh:
+            version = codec.read_key(fh, VERSION_KEY)
+    except (OSError, ValueError, EOFError):
+        return 0
+    return version if isinstance(version, int) else 0
+
+
+def _journal_size(path: Path) -> int:
+    try:
+        return journal_path(path).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _disk_state(path: Path) -> Tuple[int, int]:
+    """Snapshot version and journal size of `path`; any commit changes one of them."""
+    return _disk_version(path), _journal_size(path)
+
+
+def save_json(path: Path, data: Dict[str, Any], *, version: Optional[int] = None) -> None:
     """Atomically save `data` as JSON to `path` and write a `.bak` of previous file.
 
-    The operation writes to a temporary file in the same directory and then
-    replaces the target file using ``os.replace`` to ensure atomicity on most
-    platforms.
+    The encoding follows ``STORAGE_FORMAT`` (see `codec.py`). With `version`,
+    the mapping is written with that ``version`` counter as its first key.
+    The data is encoded first; the write lock (see `commit_lock`) is held
+    only while the backup and the new snapshot are put in place.
     """
     p = Path(path)
-    p.parent.mkdir(parents=True, exist_ok=True)
+    payload = _encode(data, version)
+    with commit_lock(p):
+        _commit_snapshot(p, payload)
 
-    # If existing file exists, write a backup
-    if p.exists():
+
+def commit_json(path: Path, data: Dict[str, Any], *, version: Optional[int] = None) -> None:
+    """`save_json` for callers that already hold the `commit_lock` of a group of files."""
+    _commit_snapshot(Path(path), _encode(data, version))
+
+
+def _backup(p: Path) -> None:
+    bak = p.with_suffix(p.suffix + ".bak")
+    tmp = bak.parent / (bak.name + ".tmp")
+    try:
+        tmp.unlink(missing_ok=True)
         try:
-            prev = p.read_text(encoding="utf-8")
-            bak = p.with_suffix(p.suffix + ".bak")
-            bak.write_text(prev, encoding="utf-8")
-        except Exception:
-            # Non-fatal: continue to attempt save
-            pass
+            # The snapshot is replaced by a new inode below, so a hard link
+            # keeps the previous contents without copying them
+            os.link(p, tmp)
+        except OSError:
+            tmp.write_bytes(p.read_bytes())
+        os.replace(str(tmp), str(bak))
+    except Exception:
+        # Non-fatal: continue to attempt save
+        pass
+
+
+def _commit_snapshot(p: Path, payload: bytes) -> None:
+    """Write `payload` to `p` via a temporary file; the caller holds the lock.
+
+    A full save supersedes the journal, so any log next to `p` is removed
+    once the new snapshot is in place.
+    """
+    p.parent.mkdir(parents=True, exist_ok=True)
+    if p.exists():
+        _backup(p)
 
     tmp = p.parent / (p.name + ".tmp")
     try:
-        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp.write_bytes(payload)
         # Atomic replace
         os.replace(str(tmp), str(p))
+        journal_path(p).unlink(missing_ok=True)
     except Exception as exc:  # pragma: no cover - IO error paths
         # Clean up tmp file if it exists
         try:
@@ -106,29 +417,388 @@ def save_json(path: Path, data: Dict[str, Any]) -> None:
         raise StorageError("Failed to save JSON") from exc
 
 
-def load_tasks() -> Dict[str, Any]:
-    """Convenience: load tasks file and return mapping {"tasks": [...] }.
+def append_journal(path: Path, ops: Iterable[Dict[str, Any]]) -> int:
+    """Append `ops` to the journal of `path`, one compact JSON line each.
+
+    Returns the journal size in bytes after the append.
     """
-    ensure_data_dir()
-    return load_json(TASKS_FILE, "tasks")
+    lines = "".join(json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n" for op in ops)
+    log = journal_path(path)
+    log.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with log.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+            return fh.tell()
+    except Exception as exc:  # pragma: no cover - IO error paths
+        raise StorageError("Failed to append to journal") from exc
+
+
+def compact_journal(path: Path, root_key: str) -> None:
+    """Fold the journal of `path` back into its snapshot."""
+    with commit_lock(path):
+        _compact(path, root_key)
+
 
+def _compact(path: Path, root_key: str) -> int:
+    # Caller holds the lock; returns the new snapshot version
+    version = _disk_version(path) + 1
+    _commit_snapshot(Path(path), _encode(load_json(path, root_key), version))
+    return version
 
-def save_tasks(data: Dict[str, Any]) -> None:
-    """Convenience: save the tasks mapping to disk.
+
+def _is_new(rid: Any, base_next_id: Optional[int]) -> bool:
+    # Ids at or past the loaded counter were allocated after loading
+    return isinstance(base_next_id, int) and isinstance(rid, str) and rid.isdigit() and int(rid) >= base_next_id
+
+
+def _merge(
+    current: Dict[str, Any],
+    data: Dict[str, Any],
+    root_key: str,
+    changed: List[Dict[str, Any]],
+    removed: List[Any],
+    base_next_id: Optional[int],
+) -> None:
+    """Re-apply one save's changes on top of `current` and adopt the result into `data`.
+
+    Changes apply per record, so the latest save of a record wins. Records
+    created since loading are appended; if another process allocated the
+    same ids they get fresh ones, renumbering the dicts in `changed` in
+    place so callers report the final ids. Updates to records another
+    process deleted are dropped, as are deletions of ids this save never
+    saw.
+    """
+    current = _with_counter(current, root_key)
+    records = list(current.get(root_key) or [])
+    pos = {r.get("id"): i for i, r in enumerate(records) if isinstance(r, dict)}
+    next_id = current["next_id"]
+    for rec in changed:
+        rid = rec.get("id")
+        if _is_new(rid, base_next_id):
+            if rid in pos or int(rid) < current["next_id"]:
+                rid = rec["id"] = str(next_id)
+            next_id = max(next_id, int(rid) + 1)
+            pos[rid] = len(records)
+            records.append(rec)
+        elif rid in pos:
+            records[pos[rid]] = rec
+        elif not (isinstance(rid, str) and rid.isdigit()):
+            pos[rid] = len(records)
+            records.append(rec)
+    dropped = {rid for rid in removed if not _is_new(rid, base_next_id)}
+    data[root_key] = [r for r in records if not (isinstance(r, dict) and r.get("id") in dropped)]
+    data["next_id"] = next_id
+
+
+def _save_collection(
+    path: Path,
+    root_key: str,
+    data: Dict[str, Any],
+    changed: Optional[Iterable[Dict[str, Any]]],
+    removed: Optional[Iterable[str]],
+) -> None:
+    """Persist `data`, merging with commits other processes made since it was loaded.
+
+    Mappings from `JsonBackend.load` remember (under ``LOADED_KEY``) the
+    snapshot version and journal size they were read at. If the file has
+    moved on, a save with `changed`/`removed` hints re-applies just those
+    changes to the current contents (see `_merge`), while a full save raises
+    `ConflictError` rather than discard the other writer's work. Mappings
+    without the marker are written unconditionally.
+    """
+    p = Path(path)
+    hinted = changed is not None or removed is not None
+    changed = list(changed or [])
+    removed = list(removed or [])
+    loaded = data.get(LOADED_KEY) if isinstance(data.get(LOADED_KEY), dict) else None
+    base = (loaded["version"], loaded["log"]) if loaded else _disk_state(p)
+    journal = JOURNAL_MODE and hinted
+    # Encode before locking so the lock only covers the commit
+    payload = None if journal else _encode(data, base[0] + 1)
+    with commit_lock(p):
+        current = _disk_state(p)
+        if current != base:
+            if loaded is not None:
+                if not hinted:
+                    raise ConflictError(f"{p} was changed by another process since it was loaded; reload and retry")
+                _merge(load_json(p, root_key), data, root_key, changed, removed, loaded.get("next_id"))
+            if not journal:
+                payload = _encode(data, current[0] + 1)
+        version, log = current
+        if journal:
+            ops = [{"op": "put", "record": rec} for rec in changed]
+            ops += [{"op": "del", "id": rid} for rid in removed]
+            if ops:
+                log = append_journal(p, ops)
+                if log >= JOURNAL_COMPACT_BYTES:
+                    version, log = _compact(p, root_key), 0
+        else:
+            version += 1
+            _commit_snapshot(p, payload)
+            log = 0
+    data[LOADED_KEY] = {"version": version, "log": log, "next_id": data.get("next_id")}
+
+
+def _with_counter(data: Dict[str, Any], root_key: str) -> Dict[str, Any]:
+    """Backfill the ``next_id`` counter for files written before it existed."""
+    if not isinstance(data.get("next_id"), int):
+        data["next_id"] = next_numeric_id(data.get(root_key) or [])
+    return data
+
+
+def _collection_file(kind: str) -> Path:
+    return {"tasks": TASKS_FILE, "notes": NOTES_FILE}[kind]
+
+
+class JsonBackend:
+    """Whole-file JSON storage (optionally journaled); the default backend."""
+
+    name = "json"
+
+    def load(self, kind: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        # The whole file is parsed anyway, so `ids` does not narrow anything
+        path = _collection_file(kind)
+        # Measured before reading: an append in between only causes a
+        # harmless extra merge on save, never a missed one
+        log = _journal_size(path)
+        data = _with_counter(load_json(path, kind), kind)
+        version = data.get(VERSION_KEY)
+        data[LOADED_KEY] = {
+            "version": version if isinstance(version, int) else 0,
+            "log": log,
+            "next_id": data["next_id"],
+        }
+        return data
+
+    def query(self, kind: str, **filters: Any) -> None:
+        # No filtering below the pure functions; callers filter in memory
+        return None
+
+    def stamp(self, kind: str) -> list:
+        return _file_signature(_collection_file(kind))
+
+    def save(
+        self,
+        kind: str,
+        data: Dict[str, Any],
+        changed: Optional[Iterable[Dict[str, Any]]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ) -> None:
+        _save_collection(_collection_file(kind), kind, data, changed, removed)
+
+
+_SQLITE_BACKENDS: Dict[Path, Any] = {}
+
+
+def _sqlite_backend(path: Path) -> Any:
+    from .sqlite_backend import SQLiteBackend
+
+    backend = _SQLITE_BACKENDS.get(path)
+    if backend is None:
+        backend = _SQLITE_BACKENDS[path] = SQLiteBackend(path)
+    return backend
+
+
+def _sharded_backend() -> Any:
+    from .sharded import ShardedBackend
+
+    return ShardedBackend(DATA_DIR / "tasks")
+
+
+def get_backend() -> Any:
+    """Return the backend selected by ``BACKEND``.
+
+    Backends provide ``load(kind, ids=None)``, ``save(kind, data, changed,
+    removed)`` and ``query(kind, status=, tags=, match_all=)``, where `kind`
+    is ``"tasks"`` or ``"notes"``, and optionally ``due_between(start, end)``
+    for tasks (see `query_due_tasks`) and ``stamp(kind)``, a JSON-serializable
+    value that changes whenever the collection does (see `load_search_index`).
     """
     ensure_data_dir()
-    save_json(TASKS_FILE, data)
+    if BACKEND == "json":
+        return JsonBackend()
+    if BACKEND == "sqlite":
+        return _sqlite_backend(DB_FILE)
+    if BACKEND == "sharded":
+        return _sharded_backend()
+    raise StorageError(f"Unknown storage backend {BACKEND!r} (expected 'json', 'sqlite' or 'sharded')")
+
+
+def load_tasks(ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Convenience: load tasks and return mapping {"tasks": [...], "next_id": int}.
+
+    `ids` is a hint: backends that can fetch single records (SQLite) return
+    only those tasks, the JSON backend always returns every task. Pass an
+    empty list when only ``next_id`` is needed.
+    """
+    return get_backend().load("tasks", ids)
+
 
+def save_tasks(
+    data: Dict[str, Any],
+    *,
+    changed: Optional[Iterable[Dict[str, Any]]] = None,
+    removed: Optional[Iterable[str]] = None,
+) -> None:
+    """Convenience: save the tasks mapping.
 
-def load_notes() -> Dict[str, Any]:
-    """Convenience: load notes file and return mapping {"notes": [...] }.
+    `changed` (records created or updated) and `removed` (ids) describe the
+    mutation that produced `data`. SQLite and journal mode persist just those
+    records; otherwise the whole mapping is written. Always pass them when
+    `data` came from a narrowed `load_tasks(ids=...)`.
+    """
+    get_backend().save("tasks", data, changed, removed)
+
+
+def iter_tasks(
+    path: Optional[Path] = None, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Stream tasks from `path` (default ``TASKS_FILE``) that satisfy `predicate`.
+
+    For read-only listing of large JSON files; see `iter_records`.
+    """
+    return iter_records(TASKS_FILE if path is None else path, "tasks", predicate)
+
+
+def query_tasks(
+    *, status: Optional[str] = None, tags: Optional[List[str]] = None, match_all: bool = False
+) -> Optional[List[Dict[str, Any]]]:
+    """Return filtered tasks from the backend, or None if it cannot filter.
+
+    On None callers should fall back to `tasks.list_tasks` over `load_tasks()`.
+    """
+    return get_backend().query("tasks", status=status, tags=tags, match_all=match_all)
+
+
+def query_due_tasks(start: Optional[float], end: Optional[float]) -> Optional[List[Dict[str, Any]]]:
+    """Return pending tasks due in ``[start, end)`` from the backend, or None.
+
+    On None callers should fall back to `tasks.due_between` over `load_tasks()`.
+    """
+    due_between = getattr(get_backend(), "due_between", None)
+    return None if due_between is None else due_between(start, end)
+
+
+def load_notes(ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Convenience: load notes and return mapping {"notes": [...], "next_id": int}.
+
+    See `load_tasks` for the meaning of `ids`.
+    """
+    return get_backend().load("notes", ids)
+
+
+def save_notes(
+    data: Dict[str, Any],
+    *,
+    changed: Optional[Iterable[Dict[str, Any]]] = None,
+    removed: Optional[Iterable[str]] = None,
+) -> None:
+    """Convenience: save the notes mapping.
+
+    See `save_tasks` for the meaning of `changed` and `removed`.
+    """
+    get_backend().save("notes", data, changed, removed)
+
+
+def iter_notes(
+    path: Optional[Path] = None, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Stream notes from `path` (default ``NOTES_FILE``); see `iter_tasks`."""
+    return iter_records(NOTES_FILE if path is None else path, "notes", predicate)
+
+
+def query_notes(*, tags: Optional[List[str]] = None, match_all: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """Return tag-filtered notes from the backend, or None if it cannot filter."""
+    return get_backend().query("notes", tags=tags, match_all=match_all)
+
+
+def migrate_to_sqlite() -> Dict[str, int]:
+    """Copy ``tasks.json``/``notes.json`` (and journals) into the SQLite database.
+
+    Existing rows in the database are replaced. Returns the number of records
+    migrated per collection.
     """
     ensure_data_dir()
-    return load_json(NOTES_FILE, "notes")
+    backend = _sqlite_backend(DB_FILE)
+    counts = {}
+    for kind in ("tasks", "notes"):
+        data = JsonBackend().load(kind)
+        # Not a save of data loaded from the database
+        data.pop(LOADED_KEY, None)
+        backend.save(kind, data)
+        counts[kind] = len(data[kind])
+    return counts
+
 
+def migrate_to_sharded() -> int:
+    """Copy ``tasks.json`` (and its journal) into month shards under ``tasks/``.
 
-def save_notes(data: Dict[str, Any]) -> None:
-    """Convenience: save the notes mapping to disk.
+    Existing shards are replaced. Returns the number of tasks migrated.
+    Notes are shared with the JSON backend and need no migration.
     """
     ensure_data_dir()
-    save_json(NOTES_FILE, data)
+    data = JsonBackend().load("tasks")
+    # Not a save of data loaded from the shards
+    data.pop(LOADED_KEY, None)
+    _sharded_backend().save("tasks", data)
+    return len(data["tasks"])
+
+
+def search_index_path() -> Path:
+    """Return the sidecar file holding the persisted notes search index."""
+    return NOTES_FILE.with_suffix(NOTES_FILE.suffix + ".tri")
+
+
+def _file_signature(path: Path) -> list:
+    """Size/mtime of `path` and its journal, used to detect stale sidecars."""
+    sig = []
+    for p in (Path(path), journal_path(path)):
+        try:
+            st = p.stat()
+            sig.append([st.st_size, st.st_mtime_ns])
+        except FileNotFoundError:
+            sig.append(None)
+    return sig
+
+
+def _notes_stamp() -> Optional[list]:
+    """Identify the current notes for the sidecar, or None if the backend cannot."""
+    backend = get_backend()
+    stamp = getattr(backend, "stamp", None)
+    return None if stamp is None else [backend.name, stamp("notes")]
+
+
+def load_search_index() -> Optional[TrigramIndex]:
+    """Load the persisted notes search index, or None if missing or stale."""
+    p = search_index_path()
+    if not p.exists():
+        return None
+    try:
+        raw = _read_json_text(p)
+    except Exception:
+        return None
+    if not isinstance(raw, dict) or raw.get("signature") is None or raw.get("signature") != _notes_stamp():
+        return None
+    return TrigramIndex.from_dict(raw)
+
+
+def save_search_index(index: TrigramIndex) -> None:
+    """Persist `index` as the sidecar for the current notes files.
+
+    The sidecar is only a cache, so failures to write it are ignored.
+    """
+    signature = _notes_stamp()
+    if signature is None:
+        return
+    p = search_index_path()
+    raw = index.to_dict()
+    raw["signature"] = signature
+    tmp = p.parent / (p.name + ".tmp")
+    try:
+        tmp.write_bytes(codec.encode(raw))
+        os.replace(str(tmp), str(p))
+    except Exception:  # pragma: no cover - IO error paths
+        try:
+            tmp.unlink(missing_ok=True)
+        except Exception:
+            pass
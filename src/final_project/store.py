@@ -0,0 +1,234 @@
+"""Indexed in-memory record store for final_project.
+
+`RecordStore` wraps the plain ``data`` mapping used by `tasks.py` and
+`notes.py` (``{"tasks": [...]}`` / ``{"notes": [...]}``) and keeps an
+id -> position map next to it, so lookups and updates by id are O(1).
+
+The record list stays the single source of truth and is what gets saved by
+`storage.py`. Inside ``store.batch()`` removals only leave a tombstone
+(``None``) in the list and the list is compacted lazily, which keeps bulk
+removals O(1) amortized; outside a batch the list is cleaned up right away so
+callers never observe tombstones. The id map is not rebuilt after such a
+removal: the removed positions are remembered instead and lookups shift by
+the number of earlier removals, until enough accumulate to be worth a
+rebuild. Removing many records one call at a time is therefore not quadratic.
+
+Secondary indexes (e.g. the tag and trigram indexes in `search.py`) can be attached
+with `attach()`. They are objects with ``rebuild(records)``, ``add(record)``
+and ``discard(record)`` methods and are kept up to date by `add`, `update`
+and `remove`; if the list is changed behind the store's back they are rebuilt
+the next time they are requested.
+
+Use `store_for(data, key)` rather than constructing stores directly: it
+returns a cached store for the mapping so the index survives across calls to
+the pure functions.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+# Compact once tombstones outnumber live records (and at least this many)
+COMPACT_MIN = 32
+# Rebuild the id map once removed positions exceed this fraction of it
+HOLES_FRACTION = 8
+# Number of mappings whose stores are kept warm by `store_for`
+CACHE_SIZE = 8
+
+_CACHE: Dict[tuple, "RecordStore"] = {}
+
+
+class RecordStore:
+    """Indexed view over the list of records stored at ``data[key]``."""
+
+    def __init__(self, data: Dict[str, Any], key: str) -> None:
+        self.data = data
+        self.key = key
+        self._records: List[Optional[Dict[str, Any]]] = []
+        self._pos: Optional[Dict[Any, int]] = None
+        # Positions (as numbered in _pos) of records deleted since _pos was built
+        self._holes: List[int] = []
+        self._size = 0
+        self._dead = 0
+        self._batch_depth = 0
+        self._indexes: Dict[str, Any] = {}
+        self._indexes_stale = False
+        self._sync()
+
+    # -- internal bookkeeping -------------------------------------------------
+
+    def _sync(self) -> None:
+        """Re-attach to ``data[key]`` if it was replaced or resized externally."""
+        records = self.data.get(self.key)
+        if records is None:
+            records = self.data[self.key] = []
+        if records is not self._records:
+            self._records = records
+            self._dead = 0
+            self._pos = None
+            self._indexes_stale = bool(self._indexes)
+        elif len(records) != self._size:
+            self._pos = None
+            self._indexes_stale = bool(self._indexes)
+        self._size = len(records)
+
+    def _index(self) -> Dict[Any, int]:
+        if self._pos is None:
+            self._pos = {r.get("id"): i for i, r in enumerate(self._records) if r is not None}
+            self._holes = []
+        return self._pos
+
+    def _actual(self, pos: int) -> int:
+        """Map a position from the id map to the current list position."""
+        return pos - bisect_left(self._holes, pos) if self._holes else pos
+
+    def _locate(self, rid: Any) -> Optional[int]:
+        self._sync()
+        pos = self._index().get(rid)
+        if pos is None:
+            return None
+        i = self._actual(pos)
+        rec = self._records[i]
+        if rec is not None and rec.get("id") == rid:
+            return i
+        # The list was edited in place behind our back: rebuild once
+        self._pos = None
+        self._indexes_stale = bool(self._indexes)
+        return self._index().get(rid)
+
+    def _notify(self, method: str, record: Dict[str, Any]) -> None:
+        if not self._indexes_stale:
+            for index in self._indexes.values():
+                getattr(index, method)(record)
+
+    def _refresh_indexes(self) -> None:
+        self._sync()
+        if self._indexes_stale:
+            records = self.records()
+            for idx in self._indexes.values():
+                idx.rebuild(records)
+            self._indexes_stale = False
+
+    def compact(self) -> None:
+        """Drop tombstones from the record list and rebuild the index."""
+        if self._dead:
+            self._records[:] = [r for r in self._records if r is not None]
+            self._dead = 0
+            self._size = len(self._records)
+            self._pos = None
+
+    # -- public API -------------------------------------------------------------
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return the live record list (compacting pending tombstones first)."""
+        self._sync()
+        self.compact()
+        return self._records  # type: ignore[return-value]
+
+    def get(self, rid: Any) -> Optional[Dict[str, Any]]:
+        """Return the record with id `rid` or None."""
+        i = self._locate(rid)
+        return None if i is None else self._records[i]
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Append `record` and index it."""
+        self._sync()
+        self._records.append(record)
+        self._size += 1
+        if self._pos is not None:
+            # Every hole lies before the end, so undo their shift
+            self._pos[record.get("id")] = self._size - 1 + len(self._holes)
+        self._notify("add", record)
+        return record
+
+    def update(self, rid: Any, changes: Mapping[str, Any]) -> Dict[str, Any]:
+        """Apply `changes` to the record with id `rid` and return it.
+
+        Raises KeyError if the id is not present.
+        """
+        rec = self.get(rid)
+        if rec is None:
+            raise KeyError(rid)
+        self._notify("discard", rec)
+        rec.update(changes)
+        self._notify("add", rec)
+        return rec
+
+    def remove(self, rid: Any) -> Optional[Dict[str, Any]]:
+        """Remove the record with id `rid`; return it, or None if missing."""
+        i = self._locate(rid)
+        if i is None:
+            return None
+        rec = self._records[i]
+        self._notify("discard", rec)
+        if self._batch_depth:
+            self._records[i] = None
+            del self._pos[rid]  # type: ignore[union-attr]
+            self._dead += 1
+            if self._dead >= COMPACT_MIN and self._dead > self._size - self._dead:
+                self.compact()
+        else:
+            del self._records[i]
+            self._size -= 1
+            insort(self._holes, self._pos.pop(rid))  # type: ignore[union-attr]
+            if len(self._holes) > max(COMPACT_MIN, self._size // HOLES_FRACTION):
+                self._pos = None
+        return rec
+
+    def ordered(self, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Return the records for `ids` in list order, skipping unknown ids."""
+        self._sync()
+        index = self._index()
+        positions = sorted(index[rid] for rid in ids if rid in index)
+        return [self._records[self._actual(i)] for i in positions]  # type: ignore[misc]
+
+    def attach(self, name: str, index: Any, *, fresh: bool = False) -> Any:
+        """Attach a secondary index under `name` and return it.
+
+        The index is rebuilt from the current records unless `fresh` says it
+        already reflects them (e.g. it was loaded from a valid sidecar file).
+        """
+        self._refresh_indexes()
+        if not fresh:
+            index.rebuild(self.records())
+        self._indexes[name] = index
+        return index
+
+    def index(self, name: str) -> Any:
+        """Return the secondary index attached as `name` (or None)."""
+        self._refresh_indexes()
+        return self._indexes.get(name)
+
+    def ensure_index(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the index attached as `name`, attaching ``factory()`` if needed."""
+        index = self.index(name)
+        return index if index is not None else self.attach(name, factory())
+
+    @contextmanager
+    def batch(self) -> Iterator["RecordStore"]:
+        """Defer list compaction until the block exits.
+
+        While a batch is open ``data[key]`` may contain ``None`` tombstones;
+        read the list through `records()` instead of directly.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.compact()
+
+
+def store_for(data: Dict[str, Any], key: str) -> RecordStore:
+    """Return the (cached) `RecordStore` for ``data[key]``."""
+    cache_key = (id(data), key)
+    store = _CACHE.pop(cache_key, None)
+    if store is None or store.data is not data:
+        store = RecordStore(data, key)
+    _CACHE[cache_key] = store
+    while len(_CACHE) > CACHE_SIZE:
+        _CACHE.pop(next(iter(_CACHE)))
+    return store
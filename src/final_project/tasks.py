@@ -2,7 +2,8 @@
 
 This module implements pure functions that operate on an in-memory `data`
 structure (a mapping containing a `"tasks"` list). Functions do not perform
-file I/O; callers are responsible for persisting via `storage.py`.
+file I/O; callers are responsible for persisting via `storage.py`. Lookups by
+id go through the cached index in `store.py`.
 
 Task schema (dict):
   - id: str
@@ -10,40 +11,40 @@ Task schema (dict):
   - description: str | None
   - created_at: ISO 8601 str
   - due: ISO 8601 str | None
+  - due_epoch: float | None (``due`` normalized by `utils.due_epoch`)
   - completed: bool
   - completed_at: ISO 8601 str | None
   - tags: list[str]
 
+The mapping also carries a ``next_id`` integer counter used to allocate ids.
+
 All functions mutate and return the `data` mapping for convenience.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-from .utils import iso_now
-import uuid
+import heapq
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .search import DueIndex, TagIndex, tag_predicate
+from .store import store_for
+from .utils import due_epoch, iso_now, next_numeric_id
+
+SORT_FIELDS = ("due", "created", "title")
 
 
 def _next_id(data: Dict[str, Any]) -> str:
-    """Generate a numeric-ish id as a string when possible, fallback to uuid.
+    """Allocate the next numeric id from the ``next_id`` high-water mark.
 
-    Uses existing task ids that parse as integers to pick the next number.
+    Mappings without a counter (e.g. built by hand) are backfilled with one
+    scan. Ids are never reused, even after the highest task is removed.
     """
-    tasks = data.get("tasks") or []
-    max_id = 0
-    for t in tasks:
-        tid = t.get("id")
-        if isinstance(tid, str) and tid.isdigit():
-            try:
-                n = int(tid)
-                if n > max_id:
-                    max_id = n
-            except Exception:
-                pass
-    if max_id >= 0:
-        return str(max_id + 1)
-    # fallback
-    return uuid.uuid4().hex
+    nid = data.get("next_id")
+    if not isinstance(nid, int):
+        nid = next_numeric_id(store_for(data, "tasks").records())
+    data["next_id"] = nid + 1
+    return str(nid)
 
 
 def create_task(
@@ -68,36 +69,50 @@ def create_task(
     Returns:
         The same ``data`` mapping passed in (mutated) for convenience.
     """
-    if "tasks" not in data or data["tasks"] is None:
-        data["tasks"] = []
-
     new_task: Dict[str, Any] = {
         "id": _next_id(data),
         "title": title,
         "description": description or "",
         "created_at": iso_now(),
         "due": due,
+        "due_epoch": due_epoch(due),
         "completed": False,
         "completed_at": None,
         "tags": tags or [],
     }
 
-    data["tasks"].append(new_task)
+    store_for(data, "tasks").add(new_task)
     return data
 
 
 def list_tasks(
-    data: Dict[str, Any], *, status: Optional[str] = None, tag: Optional[str] = None
+    data: Dict[str, Any],
+    *,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match_all: bool = False,
 ) -> List[Dict[str, Any]]:
-    """Return tasks filtered by `status` and/or `tag`.
+    """Return tasks filtered by `status` and/or tags.
+
+    Tag filters go through the store's tag index, so their cost scales with
+    the number of matching tasks.
 
     Args:
         data: mapping with `tasks` list.
         status: one of "all", "pending", "completed". If None, treated as
             "all".
         tag: if provided, only return tasks that contain this tag.
+        tags: several tags (combined with `tag`); tasks must carry any of
+            them, or all of them if `match_all` is true.
     """
-    tasks = list(data.get("tasks") or [])
+    store = store_for(data, "tasks")
+    wanted = [tg for tg in [tag, *(tags or [])] if tg]
+    if wanted:
+        ids = store.ensure_index("tags", TagIndex).lookup(wanted, match_all=match_all)
+        tasks = store.ordered(ids)
+    else:
+        tasks = list(store.records())
     if not status or status == "all":
         filtered = tasks
     elif status == "pending":
@@ -107,25 +122,92 @@ def list_tasks(
     else:
         raise ValueError("status must be one of 'all', 'pending', 'completed'")
 
-    if tag:
-        tag_low = tag.lower()
-        filtered = [t for t in filtered if any(tag_low == (tg or "").lower() for tg in t.get("tags", []))]
-
     return filtered
 
 
+def task_filter(
+    *, status: Optional[str] = None, tags: Optional[List[str]] = None, match_all: bool = False
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Return a predicate selecting the tasks `list_tasks` would return.
+
+    For streamed listing (`storage.iter_tasks`); None means every task.
+    """
+    wanted = [tg for tg in tags or [] if tg]
+    checks: List[Callable[[Dict[str, Any]], bool]] = []
+    if wanted:
+        checks.append(tag_predicate(wanted, match_all=match_all))
+    if status == "pending":
+        checks.append(lambda t: not t.get("completed"))
+    elif status == "completed":
+        checks.append(lambda t: bool(t.get("completed")))
+    elif status not in (None, "all"):
+        raise ValueError("status must be one of 'all', 'pending', 'completed'")
+    if not checks:
+        return None
+    return lambda t: all(check(t) for check in checks)
+
+
+def due_key(task: Dict[str, Any]) -> tuple:
+    """Sort key ordering tasks by due date, undated (or unparseable) last."""
+    value = DueIndex.epoch(task)
+    if value is None:
+        return (1, 0.0)
+    return (0, value)
+
+
+def _sort_key(field: str) -> Callable[[Dict[str, Any]], Any]:
+    if field == "due":
+        return due_key
+    if field == "created":
+        # iso_now() timestamps are all UTC, so they compare as strings
+        return lambda t: t.get("created_at") or ""
+    if field == "title":
+        return lambda t: (t.get("title") or "").casefold()
+    raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+
+
+def page_tasks(
+    tasks: Iterable[Dict[str, Any]],
+    *,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    """Return one page of `tasks`, optionally sorted by `sort`.
+
+    With a `limit`, only the first ``offset + limit`` tasks are selected with
+    a bounded heap (O(n log k)) instead of sorting everything; without a
+    sort, iteration stops as soon as the page is full. Ties keep their input
+    order.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("limit and offset must not be negative")
+    if sort is None:
+        stop = None if limit is None else offset + limit
+        return list(islice(tasks, offset, stop))
+    key = _sort_key(sort)
+    if limit is None:
+        return sorted(tasks, key=key)[offset:]
+    return heapq.nsmallest(offset + limit, tasks, key=key)[offset:]
+
+
+def get_task(data: Dict[str, Any], task_id: str) -> Optional[Dict[str, Any]]:
+    """Return the task dict with `task_id` or None if not found."""
+    return store_for(data, "tasks").get(task_id)
+
+
 def mark_done(data: Dict[str, Any], task_id: str) -> Dict[str, Any]:
     """Mark the task with `task_id` as completed and set `completed_at`.
 
     Returns the mutated `data` mapping.
     """
-    for t in data.get("tasks", []):
-        if t.get("id") == task_id:
-            if not t.get("completed"):
-                t["completed"] = True
-                t["completed_at"] = iso_now()
-            return data
-    raise KeyError(f"task id {task_id} not found")
+    store = store_for(data, "tasks")
+    t = store.get(task_id)
+    if t is None:
+        raise KeyError(f"task id {task_id} not found")
+    if not t.get("completed"):
+        store.update(task_id, {"completed": True, "completed_at": iso_now()})
+    return data
 
 
 def edit_task(
@@ -141,18 +223,37 @@ def edit_task(
 
     Only provided keyword arguments are updated.
     """
-    for t in data.get("tasks", []):
-        if t.get("id") == task_id:
-            if title is not None:
-                t["title"] = title
-            if description is not None:
-                t["description"] = description
-            if due is not None:
-                t["due"] = due
-            if tags is not None:
-                t["tags"] = tags
-            return data
-    raise KeyError(f"task id {task_id} not found")
+    store = store_for(data, "tasks")
+    if store.get(task_id) is None:
+        raise KeyError(f"task id {task_id} not found")
+    fields = {"title": title, "description": description, "due": due, "tags": tags}
+    changes = {k: v for k, v in fields.items() if v is not None}
+    if due is not None:
+        changes["due_epoch"] = due_epoch(due)
+    store.update(task_id, changes)
+    return data
+
+
+def due_between(data: Dict[str, Any], start: Optional[float], end: Optional[float]) -> List[Dict[str, Any]]:
+    """Return pending tasks due in ``[start, end)`` (POSIX timestamps), soonest first.
+
+    Goes through the store's sorted due index, so the cost is O(log n + k)
+    once the index is built. None leaves that side of the range open.
+    """
+    store = store_for(data, "tasks")
+    index = store.ensure_index("due", DueIndex)
+    return [t for t in (store.get(rid) for rid in index.between(start, end)) if t is not None]
+
+
+def upcoming_tasks(data: Dict[str, Any], within: float, *, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Return pending tasks due in the next `within` seconds, soonest first."""
+    now = time.time() if now is None else now
+    return due_between(data, now, now + within)
+
+
+def overdue_tasks(data: Dict[str, Any], *, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Return pending tasks whose due date has passed, most overdue first."""
+    return due_between(data, None, time.time() if now is None else now)
 
 
 def remove_task(data: Dict[str, Any], task_id: str) -> Dict[str, Any]:
@@ -160,11 +261,8 @@ def remove_task(data: Dict[str, Any], task_id: str) -> Dict[str, Any]:
 
     Returns the mutated `data` mapping.
     """
-    tasks = data.get("tasks", [])
-    new_tasks = [t for t in tasks if t.get("id") != task_id]
-    if len(new_tasks) == len(tasks):
+    if store_for(data, "tasks").remove(task_id) is None:
         raise KeyError(f"task id {task_id} not found")
-    data["tasks"] = new_tasks
     return data
 
 
@@ -6,9 +6,11 @@ TODOs:
 - `parse_date(text)` - lightweight date parser
 """
 
-from datetime import datetime, timezone
+from datetime import datetime, time, timezone
+import math
+import re
 import uuid
-from typing import Optional
+from typing import Any, Dict, Iterable, Optional
 
 
 def generate_id(prefix: str = "t") -> str:
@@ -19,6 +21,28 @@ def generate_id(prefix: str = "t") -> str:
     return f"{prefix}_{uuid.uuid4().hex[:8]}"
 
 
+def next_numeric_id(records: Iterable[Optional[Dict[str, Any]]]) -> int:
+    """Return one past the highest numeric string id in `records` (1 if none).
+
+    Used to backfill the ``next_id`` counter of mappings that predate it.
+    """
+    max_id = 0
+    for r in records:
+        rid = r.get("id") if r else None
+        if isinstance(rid, str) and rid.isdigit():
+            max_id = max(max_id, int(rid))
+    return max_id + 1
+
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a rough token count for `text` (about 4 characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
 def iso_now() -> str:
     """Return current time as an ISO 8601 string in UTC (timezone-aware).
 
@@ -39,3 +63,33 @@ def parse_date(text: str) -> Optional[datetime]:
         return datetime.fromisoformat(text)
     except Exception:
         return None
+
+
+_DATE_ONLY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.IGNORECASE)
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400, "": 86400}
+
+
+def due_epoch(text: Optional[str]) -> Optional[float]:
+    """Normalize a due string to a POSIX timestamp, or None if unparseable.
+
+    A bare date (``2025-03-01``) means the end of that day, so a task due
+    today is not overdue before the day is over. Naive values are local time.
+    """
+    dt = parse_date(text or "")
+    if dt is None:
+        return None
+    if _DATE_ONLY.match(text.strip()):
+        dt = datetime.combine(dt.date(), time.max)
+    return dt.timestamp()
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Parse ``90s``, ``30m``, ``12h``, ``7d`` or ``2w`` into seconds.
+
+    A bare number counts days. Returns None if `text` is not a duration.
+    """
+    m = _DURATION.match(text or "")
+    if not m:
+        return None
+    return float(m.group(1)) * _UNIT_SECONDS[m.group(2).lower()]
@@ -0,0 +1,152 @@
+"""Where CLI commands read and write their data.
+
+`cli.dispatch` runs one parsed command against a workspace instead of
+calling `storage.py` directly:
+
+- `DirectWorkspace` (one-shot ``python -m final_project ...``) loads only
+  what each command needs and saves right after every mutation;
+- `MemoryWorkspace` (``batch`` and ``shell``) loads each collection once,
+  applies every command to that in-memory mapping and writes the accumulated
+  changes when `flush()` is called, so N mutations cost one save instead of N.
+
+Both expose ``load(kind, ids=None)``, ``save(kind, data, changed=,
+removed=)``, ``list_tasks(...)``, ``list_notes(...)``, ``due_tasks(start,
+end)``, ``prepare_search(data)`` and ``flush()``, where `kind` is
+``"tasks"`` or ``"notes"``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from . import notes, storage, tasks
+from .store import store_for
+
+_LOADERS = {"tasks": storage.load_tasks, "notes": storage.load_notes}
+_SAVERS = {"tasks": storage.save_tasks, "notes": storage.save_notes}
+
+
+class DirectWorkspace:
+    """Load per command and save after every mutation."""
+
+    def load(self, kind: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return _LOADERS[kind](ids)
+
+    def save(
+        self,
+        kind: str,
+        data: Dict[str, Any],
+        *,
+        changed: Optional[Iterable[Dict[str, Any]]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ) -> None:
+        _SAVERS[kind](data, changed=changed, removed=removed)
+
+    def list_tasks(self, *, status: Optional[str], tags: Optional[List[str]], match_all: bool) -> Iterable[Dict[str, Any]]:
+        items = storage.query_tasks(status=status, tags=tags, match_all=match_all)
+        if items is None:
+            # Stream the file instead of loading every task at once. This
+            # also applies to tag filters: the JSON file is parsed in full
+            # either way, and building the store's tag index for a single
+            # query would cost that same scan plus memory for every task.
+            # The index pays off in `MemoryWorkspace`, where it is kept.
+            items = storage.iter_tasks(predicate=tasks.task_filter(status=status, tags=tags, match_all=match_all))
+        return items
+
+    def list_notes(self, *, tags: Optional[List[str]], match_all: bool) -> Iterable[Dict[str, Any]]:
+        items = storage.query_notes(tags=tags, match_all=match_all)
+        if items is None:
+            items = storage.iter_notes(predicate=notes.note_filter(tags=tags, match_all=match_all))
+        return items
+
+    def due_tasks(self, start: Optional[float], end: Optional[float]) -> List[Dict[str, Any]]:
+        items = storage.query_due_tasks(start, end)
+        if items is None:
+            items = tasks.due_between(self.load("tasks"), start, end)
+        return items
+
+    def prepare_search(self, data: Dict[str, Any]) -> None:
+        """Attach the persisted notes search index (if enabled), rebuilding it if stale."""
+        if not storage.SEARCH_INDEX:
+            return
+        index = storage.load_search_index()
+        if index is not None:
+            notes.enable_search_index(data, index)
+            return
+        index = notes.enable_search_index(data)
+        storage.save_search_index(index)
+
+    def flush(self) -> None:
+        # Every mutation was saved when it happened
+        pass
+
+
+class MemoryWorkspace:
+    """Keep collections in memory and persist accumulated changes on `flush`."""
+
+    def __init__(self, *, search_index: Optional[bool] = None) -> None:
+        # Long-lived sessions build the notes trigram index even when the
+        # on-disk sidecar is not enabled
+        self.search_index = storage.SEARCH_INDEX if search_index is None else search_index
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._changed: Dict[str, Dict[Any, Dict[str, Any]]] = {"tasks": {}, "notes": {}}
+        self._removed: Dict[str, Set[Any]] = {"tasks": set(), "notes": set()}
+        self._full: Set[str] = set()
+        self.pending = 0
+
+    def load(self, kind: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        # Later commands may touch any record, so always load everything
+        data = self._data.get(kind)
+        if data is None:
+            data = self._data[kind] = _LOADERS[kind]()
+        return data
+
+    def save(
+        self,
+        kind: str,
+        data: Dict[str, Any],
+        *,
+        changed: Optional[Iterable[Dict[str, Any]]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ) -> None:
+        self._data[kind] = data
+        if changed is None and removed is None:
+            self._full.add(kind)
+        for rec in changed or []:
+            self._changed[kind][rec.get("id")] = rec
+        for rid in removed or []:
+            self._changed[kind].pop(rid, None)
+            self._removed[kind].add(rid)
+        self.pending += 1
+
+    def list_tasks(self, *, status: Optional[str], tags: Optional[List[str]], match_all: bool) -> Iterable[Dict[str, Any]]:
+        # Tag filters go through the store's tag index, kept across commands
+        return tasks.list_tasks(self.load("tasks"), status=status, tags=tags, match_all=match_all)
+
+    def list_notes(self, *, tags: Optional[List[str]], match_all: bool) -> Iterable[Dict[str, Any]]:
+        return notes.list_notes(self.load("notes"), tags=tags, match_all=match_all)
+
+    def due_tasks(self, start: Optional[float], end: Optional[float]) -> List[Dict[str, Any]]:
+        return tasks.due_between(self.load("tasks"), start, end)
+
+    def prepare_search(self, data: Dict[str, Any]) -> None:
+        # The sidecar describes the files on disk, not unsaved changes, so
+        # build the index in memory; the store keeps it current afterwards
+        if self.search_index and store_for(data, "notes").index("trigram") is None:
+            notes.enable_search_index(data)
+
+    @property
+    def dirty(self) -> bool:
+        return self.pending > 0
+
+    def flush(self) -> None:
+        """Write every collection changed since the last flush."""
+        for kind, data in self._data.items():
+            if kind in self._full:
+                _SAVERS[kind](data)
+            elif self._changed[kind] or self._removed[kind]:
+                _SAVERS[kind](data, changed=list(self._changed[kind].values()), removed=list(self._removed[kind]))
+            self._full.discard(kind)
+            self._changed[kind].clear()
+            self._removed[kind].clear()
+        self.pending = 0
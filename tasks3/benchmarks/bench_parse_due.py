@@ -0,0 +1,81 @@
+"""Throughput of `tasks3.core.parse_due` against the old strptime loop.
+
+Generates N due strings in the formats the old parser accepted and times
+both parsers over them, once with every string distinct and once with the
+repetition typical of imported task lists (a few thousand distinct values),
+which the memoized parser answers from its cache. Run from tasks3/:
+
+    python benchmarks/bench_parse_due.py --count 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tasks3 import core  # noqa: E402
+
+_OLD_FORMATS = [
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %I:%M %p",
+    "%b %d, %Y %I:%M %p",
+    "%B %d, %Y %I:%M %p",
+]
+
+
+def old_parse_due(s):
+    # The previous implementation, kept here as the baseline
+    s = (s or "").strip()
+    if not s:
+        return ""
+    for fmt in _OLD_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%dT%H:%M")
+        except ValueError:
+            continue
+    raise ValueError("Invalid date format.")
+
+
+def make_inputs(count, distinct, seed):
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    pool = []
+    for _ in range(distinct):
+        dt = base + timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+        fmt = rng.choice(_OLD_FORMATS)
+        pool.append(dt.strftime(fmt))
+    return [pool[i % distinct] for i in range(count)] if distinct < count else pool
+
+
+def run(label, parse, inputs):
+    start = time.perf_counter()
+    for s in inputs:
+        parse(s)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f} s  {len(inputs) / elapsed:>12,.0f} dates/s")
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=1_000_000)
+    ap.add_argument("--distinct", type=int, default=5_000, help="distinct strings in the repeated run")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for title, distinct in (("all distinct", args.count), (f"{args.distinct} distinct", args.distinct)):
+        inputs = make_inputs(args.count, distinct, args.seed)
+        assert all(core.parse_due(s) == old_parse_due(s) for s in inputs[:10_000])
+        print(f"{args.count:,} strings, {title}:")
+        core._parse_absolute.cache_clear()
+        old = run("  strptime loop (old)", old_parse_due, inputs)
+        new = run("  compiled dispatcher (new)", core.parse_due, inputs)
+        print(f"  speedup {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
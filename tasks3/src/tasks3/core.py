@@ -1,6 +1,7 @@
 # src/tasks3/core.py
 import json, os, re, time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 DEFAULT_DB = "tasks.json"
 
@@ -20,24 +21,126 @@ def save_db(path: str, data):
 def gen_id(prefix: str="t") -> str:
     return f"{prefix}_{int(time.time()*1000)}"
 
-_DUE_FORMATS = [
-    "%Y-%m-%d %H:%M",
-    "%Y-%m-%d %I:%M %p",
-    "%b %d, %Y %I:%M %p",
-    "%B %d, %Y %I:%M %p",
-]
+# --- Due date parsing ---
+# One compiled pattern per input family; the first character picks the
+# family, so each string is matched once instead of trying every strptime
+# format. Accepted inputs:
+#   2025-11-20 15:00, 2025-11-20 3:00 pm, 2025-11-20 (end of day),
+#   2025-11-20T15:00:00+02:00 (ISO with Z/offset, converted to local time),
+#   Nov 20, 2025 3:00 pm / November 20 2025 15:00,
+#   today/tonight/tomorrow/yesterday [at] 3pm, monday 9am, next fri,
+#   in 3 days, in 2 hours
+_TIME = r"(?:(?P<h>\d{1,2})(?::(?P<mi>\d{1,2}))?\s*(?P<ap>[ap])\.?m\.?|(?P<h24>\d{1,2}):(?P<mi24>\d{1,2}))"
+_ISO_RE = re.compile(
+    r"(?P<y>\d{4})-(?P<mo>\d{1,2})-(?P<d>\d{1,2})"
+    r"(?:[ T]+(?:(?P<ih>\d{1,2}):(?P<imi>\d{1,2})(?::\d{2}(?:\.\d+)?)?\s*(?:(?P<iap>[ap])\.?m\.?)?)"
+    r"\s*(?P<tz>Z|[+-]\d{2}:?\d{2})?)?$",
+    re.IGNORECASE,
+)
+_MONTH_RE = re.compile(
+    r"(?P<mon>[a-z]{3,9})\.?\s+(?P<d>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<y>\d{4})(?:,?\s+(?:at\s+)?" + _TIME + r")?$",
+    re.IGNORECASE,
+)
+_RELATIVE_RE = re.compile(
+    r"(?:(?P<day>today|tonight|tomorrow|yesterday)|(?P<next>next\s+)?(?P<wd>[a-z]{3,9})"
+    r"|in\s+(?P<n>\d+)\s+(?P<unit>minute|hour|day|week)s?)"
+    r"(?:\s+(?:at\s+)?" + _TIME + r")?$",
+    re.IGNORECASE,
+)
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+           "august", "september", "october", "november", "december"]
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_UNITS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+_DUE_ERROR = "Invalid date format. Try '2025-11-20 15:00', 'Nov 20, 2025 3:00 pm' or 'tomorrow 3pm'."
 
-def parse_due(s: str) -> str:
-    s = (s or "").strip()
+def _name_index(names, word):
+    # Full names or any prefix of at least three letters ("Nov", "Sept", "wed")
+    word = word.lower()
+    for i, name in enumerate(names):
+        if name.startswith(word):
+            return i
+    return None
+
+def _clock(h, mi, ap):
+    h, mi = int(h), int(mi or 0)
+    if ap:
+        if not 1 <= h <= 12:
+            raise ValueError(_DUE_ERROR)
+        h = h % 12 + (12 if ap.lower() == "p" else 0)
+    return h, mi
+
+def _match_clock(m):
+    if m.group("h24"):
+        return _clock(m.group("h24"), m.group("mi24"), None)
+    if m.group("h"):
+        return _clock(m.group("h"), m.group("mi"), m.group("ap"))
+    return None
+
+def _fmt(dt):
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}"
+
+@lru_cache(maxsize=65536)
+def _parse_absolute(s: str) -> str:
+    # Absolute dates do not depend on the clock, so repeats are memoized
+    if s[0].isdigit():
+        m = _ISO_RE.match(s)
+        if not m:
+            raise ValueError(_DUE_ERROR)
+        y, mo, d, ih, imi, iap, tz = m.groups()
+        # A bare date is due by the end of that day
+        h, mi = (23, 59) if ih is None else _clock(ih, imi, iap)
+        dt = datetime(int(y), int(mo), int(d), h, mi)
+        if tz:
+            offset = timezone.utc if tz.upper() == "Z" else datetime.strptime(tz.replace(":", ""), "%z").tzinfo
+            dt = dt.replace(tzinfo=offset).astimezone().replace(tzinfo=None)
+        return _fmt(dt)
+    m = _MONTH_RE.match(s)
+    month = _name_index(_MONTHS, m.group("mon")) if m else None
+    if month is None:
+        raise ValueError(_DUE_ERROR)
+    _mon, d, y, h, mi, ap, h24, mi24 = m.groups()
+    h, mi = _clock(h24, mi24, None) if h24 else _clock(h, mi, ap) if h else (23, 59)
+    return _fmt(datetime(int(y), month + 1, int(d), h, mi))
+
+def _parse_relative(s: str, now: datetime):
+    m = _RELATIVE_RE.match(s)
+    if not m:
+        return None
+    clock = _match_clock(m)
+    if m.group("n"):
+        if clock:
+            return None
+        return _fmt(now + timedelta(seconds=int(m.group("n")) * _UNITS[m.group("unit").lower()]))
+    day = (m.group("day") or "").lower()
+    if day:
+        date = now.date() + timedelta(days={"yesterday": -1, "tomorrow": 1}.get(day, 0))
+        default = (21, 0) if day == "tonight" else (23, 59)
+    else:
+        wd = _name_index(_WEEKDAYS, m.group("wd"))
+        if wd is None:
+            return None
+        # "friday" is the coming Friday (today if it is Friday); "next friday" skips today
+        ahead = (wd - now.weekday()) % 7
+        if m.group("next") and ahead == 0:
+            ahead = 7
+        date = now.date() + timedelta(days=ahead)
+        default = (23, 59)
+    h, mi = clock or default
+    return _fmt(datetime(date.year, date.month, date.day, h, mi))
+
+def parse_due(s: str, now: datetime = None) -> str:
+    s = " ".join((s or "").split())
     if not s:
         return ""
-    for fmt in _DUE_FORMATS:
-        try:
-            dt = datetime.strptime(s, fmt)
-            return dt.strftime("%Y-%m-%dT%H:%M")
-        except ValueError:
-            continue
-    raise ValueError("Invalid date format. Try '2025-11-20 15:00' or 'Nov 20, 2025 3:00 pm'.")
+    if s[0].isalpha():
+        rel = _parse_relative(s, now or datetime.now())
+        if rel is not None:
+            return rel
+    try:
+        return _parse_absolute(s)
+    except ValueError:
+        # Out-of-range fields (e.g. Feb 30) surface with the same message
+        raise ValueError(_DUE_ERROR) from None
 
 def pretty_due(iso: str) -> str:
     if not iso:
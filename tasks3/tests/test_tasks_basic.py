@@ -17,3 +17,24 @@ def test_add_task_with_due_and_sort(tmp_path):
 def test_parse_due_formats():
     assert parse_due("2025-11-20 15:00") == "2025-11-20T15:00"
     assert parse_due("Nov 20, 2025 3:00 pm") == "2025-11-20T15:00"
+
+def test_parse_due_more_formats():
+    from datetime import datetime
+    now = datetime(2025, 11, 19, 10, 30)  # a Wednesday
+    assert parse_due("2025-11-20 3:00 pm") == "2025-11-20T15:00"
+    assert parse_due("November 20, 2025 03:00 PM") == "2025-11-20T15:00"
+    assert parse_due("2025-11-20") == "2025-11-20T23:59"
+    # Single-digit minutes, as strptime's %M allowed
+    assert parse_due("2025-11-20 15:5") == "2025-11-20T15:05"
+    assert parse_due("Nov 20, 2025 3:5 pm") == "2025-11-20T15:05"
+    assert parse_due("2025-11-20T15:00Z") == parse_due(
+        datetime.fromisoformat("2025-11-20T15:00+00:00").astimezone().strftime("%Y-%m-%d %H:%M"))
+    assert parse_due("tomorrow 3pm", now) == "2025-11-20T15:00"
+    assert parse_due("next wed", now) == "2025-11-26T23:59"
+    assert parse_due("in 2 hours", now) == "2025-11-19T12:30"
+
+def test_parse_due_rejects_bad_input():
+    import pytest
+    for bad in ["2025-02-30 10:00", "someday", "2025-11-20 13:00 pm"]:
+        with pytest.raises(ValueError):
+            parse_due(bad)